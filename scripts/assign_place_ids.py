@@ -23,6 +23,17 @@ from typing import Dict, List, Optional, Tuple
 import logging
 from pathlib import Path
 
+from shared.adaptive import format_rates
+from shared.call_planner import CallPlan
+from shared.candidate_scorer import get_candidate_scorer
+from shared.coalescer import get_coalescer
+from shared.datasets import dataset_for_file
+from shared.google_api import PLACES_BASE_URL, get_json
+from shared.metrics import get_metrics
+from shared.negative_cache import record_fingerprint
+from shared.rate_limiter import QuotaExceededError
+from shared.review_queue import get_review_queue, review_key_for
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -38,12 +49,30 @@ class PlaceIDAssigner:
     def __init__(self, api_key: str, data_dir: str = "public/data"):
         self.api_key = api_key
         self.data_dir = Path(data_dir)
-        self.base_url = "https://maps.googleapis.com/maps/api/place"
-        self.session = requests.Session()
-        self.rate_limit_delay = 0.1  # 100ms between requests
+        self.base_url = PLACES_BASE_URL
         self.max_retries = 3
         
-    def search_place(self, name: str, location: str = None, lat: float = None, lng: float = None) -> Optional[Dict]:
+    def search_params(self, name: str, location: str = None, lat: float = None, lng: float = None) -> Dict:
+        """Text Search parameters for a place (shared by search_place and the dry-run planner)"""
+        # Build search query
+        query_parts = [name]
+        if location:
+            query_parts.append(location)
+        
+        params = {
+            'query': " ".join(query_parts),
+            'key': self.api_key,
+            'fields': 'place_id,formatted_address,name,geometry'
+        }
+        
+        # Add location bias if coordinates are available
+        if lat is not None and lng is not None:
+            params['locationbias'] = f"point:{lat},{lng}"
+        
+        return params
+    
+    def search_place(self, name: str, location: str = None, lat: float = None, lng: float = None,
+                     fingerprint: str = None, record_type: str = None, review_key: str = None) -> Optional[Dict]:
         """
         Search for a place using Google Places API.
         
@@ -52,44 +81,35 @@ class PlaceIDAssigner:
             location: Address or location string
             lat: Latitude (optional)
             lng: Longitude (optional)
+            fingerprint: record_fingerprint of the entry, so a remembered miss lapses when it is edited
+            record_type: Registry record type, used to score the candidates' place types
+            review_key: Review queue key for a match the candidate scorer is unsure about
             
         Returns:
             Dict with place_id, formatted_address, and google_maps_url, or None if not found
+            or not confident enough (then queued for review)
         """
-        # Build search query
-        query_parts = [name]
-        if location:
-            query_parts.append(location)
-        
-        query = " ".join(query_parts)
-        
-        # Add location bias if coordinates are available
-        location_bias = None
-        if lat is not None and lng is not None:
-            location_bias = f"point:{lat},{lng}"
-        
-        params = {
-            'query': query,
-            'key': self.api_key,
-            'fields': 'place_id,formatted_address,name,geometry'
-        }
-        
-        if location_bias:
-            params['locationbias'] = location_bias
+        params = self.search_params(name, location, lat, lng)
+        query = params['query']
         
         for attempt in range(self.max_retries):
             try:
-                response = self.session.get(
-                    f"{self.base_url}/textsearch/json",
-                    params=params,
-                    timeout=10
-                )
-                response.raise_for_status()
-                
-                data = response.json()
+                data = get_json(f"{self.base_url}/textsearch/json", params, timeout=10, fingerprint=fingerprint)
                 
                 if data.get('status') == 'OK' and data.get('results'):
-                    result = data['results'][0]  # Take the first result
+                    # Score every candidate instead of trusting the first one
+                    decision = get_candidate_scorer().decide(data['results'], name=name, lat=lat, lng=lng,
+                                                            record_type=record_type, address=location)
+                    if not decision.accepted:
+                        if decision.best and review_key:
+                            get_review_queue().add(review_key, name, query, decision)
+                            logger.warning(f"Unsure match for {query} ({decision.reason}), queued for review")
+                        else:
+                            logger.warning(f"No acceptable match for {query} ({decision.reason})")
+                        return None
+                    if review_key:
+                        get_review_queue().discard(review_key)
+                    result = decision.best.result
                     place_id = result.get('place_id')
                     formatted_address = result.get('formatted_address')
                     
@@ -102,11 +122,18 @@ class PlaceIDAssigner:
                         }
                 
                 elif data.get('status') == 'ZERO_RESULTS':
-                    logger.warning(f"No results found for: {query}")
+                    if data.get('negative_cache'):
+                        logger.info(f"No results found for: {query} (remembered miss, not re-queried)")
+                    else:
+                        logger.warning(f"No results found for: {query}")
                     return None
                     
                 elif data.get('status') == 'OVER_QUERY_LIMIT':
+                    # The shared limiter and adaptive pacer have already backed off; retry after them
                     logger.error("API quota exceeded")
+                    if attempt < self.max_retries - 1:
+                        get_metrics().retry('textsearch')
+                        continue
                     return None
                     
                 else:
@@ -116,7 +143,10 @@ class PlaceIDAssigner:
             except requests.exceptions.RequestException as e:
                 logger.error(f"Request failed (attempt {attempt + 1}): {e}")
                 if attempt < self.max_retries - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
+                    wait = 2 ** attempt
+                    get_metrics().retry('textsearch')
+                    get_metrics().slept('textsearch', wait, "backoff")
+                    time.sleep(wait)  # Exponential backoff
                 else:
                     return None
         
@@ -144,6 +174,8 @@ class PlaceIDAssigner:
         
         successful_updates = 0
         total_entries = len(data)
+        dataset = dataset_for_file(file_path)
+        record_type = dataset.record_type if dataset else None
         
         for i, entry in enumerate(data):
             if not isinstance(entry, dict):
@@ -167,7 +199,12 @@ class PlaceIDAssigner:
             logger.info(f"Searching for place: {name} in {location}")
             
             # Search for the place
-            place_info = self.search_place(name, location, lat, lng)
+            try:
+                place_info = self.search_place(name, location, lat, lng, record_fingerprint(entry),
+                                               record_type, review_key_for(file_path, entry))
+            except QuotaExceededError as e:
+                logger.error(f"{e} - saving progress and stopping")
+                break
             
             if place_info:
                 # Update the entry
@@ -182,9 +219,6 @@ class PlaceIDAssigner:
                 logger.info(f"✓ Updated entry {i+1}: {name} -> {place_info['place_id']}")
             else:
                 logger.warning(f"✗ Failed to find place_id for: {name}")
-            
-            # Rate limiting
-            time.sleep(self.rate_limit_delay)
         
         # Save the updated file
         try:
@@ -197,6 +231,39 @@ class PlaceIDAssigner:
         
         return successful_updates, total_entries
     
+    def plan_json_file(self, plan: CallPlan, file_path: Path) -> None:
+        """
+        Account for the searches process_json_file would make for one file, without calling the API.
+        """
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to read {file_path}: {e}")
+            return
+        
+        if not isinstance(data, list):
+            return
+        
+        plan.start_dataset(file_path.name)
+        for entry in data:
+            if not isinstance(entry, dict):
+                continue
+            needs_lookup = not (entry.get('place_id') and entry.get('place_id') != 'null') and bool(entry.get('name'))
+            plan.record(needs_lookup)
+            if needs_lookup:
+                location = entry.get('location') or entry.get('address', '')
+                plan.lookup('textsearch', self.search_params(entry['name'], location, entry.get('lat'), entry.get('lng')),
+                            fingerprint=record_fingerprint(entry))
+    
+    def plan_files(self, file_paths: List[Path]) -> CallPlan:
+        """Projected calls, cost and time for processing ``file_paths``"""
+        plan = CallPlan()
+        for file_path in file_paths:
+            self.plan_json_file(plan, file_path)
+        plan.report(logger.info)
+        return plan
+    
     def process_all_files(self, file_patterns: List[str] = None) -> Dict[str, Tuple[int, int]]:
         """
         Process all JSON files in the data directory.
@@ -242,7 +309,15 @@ def main():
     
     if args.dry_run:
         logger.info("DRY RUN MODE - No changes will be made")
-        # TODO: Implement dry run functionality
+        if args.files:
+            file_paths = [Path(args.data_dir) / filename for filename in args.files]
+            for file_path in file_paths:
+                if not file_path.exists():
+                    logger.error(f"File not found: {file_path}")
+            file_paths = [file_path for file_path in file_paths if file_path.exists()]
+        else:
+            file_paths = [file_path for file_path in sorted(Path(args.data_dir).glob('*.json')) if file_path.is_file()]
+        assigner.plan_files(file_paths)
         return
     
     # Process files
@@ -274,6 +349,9 @@ def main():
         
         logger.info(f"\nOverall: {total_successful}/{total_entries} successful")
         logger.info(f"Success rate: {total_successful/total_entries*100:.1f}%" if total_entries > 0 else "No entries processed")
+        logger.info(f"Text Search calls saved by coalescing: {get_coalescer().saved}")
+        logger.info(f"Matches awaiting review: {len(get_review_queue().pending())} (python shared/review_queue.py)")
+        logger.info(f"Adaptive request rate: {format_rates()}")
 
 if __name__ == "__main__":
     main()
@@ -7,10 +7,20 @@ import json
 import os
 import time
 import requests
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Optional, Tuple
 import logging
 from pathlib import Path
 
+from shared.adaptive import format_rates
+from shared.candidate_scorer import get_candidate_scorer
+from shared.checkpoint import Checkpointer
+from shared.coalescer import get_coalescer
+from shared.google_api import PLACES_BASE_URL, get_json
+from shared.metrics import get_metrics
+from shared.negative_cache import record_fingerprint
+from shared.rate_limiter import QuotaExceededError
+from shared.review_queue import get_review_queue, review_key_for
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -26,14 +36,14 @@ class TrailheadPlaceIDAssigner:
     def __init__(self, api_key: str, data_dir: str = "public/data"):
         self.api_key = api_key
         self.data_dir = Path(data_dir)
-        self.base_url = "https://maps.googleapis.com/maps/api/place"
-        self.session = requests.Session()
-        self.rate_limit_delay = 0.1  # 100ms between requests
+        self.base_url = PLACES_BASE_URL
         self.max_retries = 3
 
-    def search_place(self, name: str, location: str = None, lat: float = None, lng: float = None) -> Optional[Dict]:
+    def search_place(self, name: str, location: str = None, lat: float = None, lng: float = None,
+                     fingerprint: str = None, review_key: str = None) -> Optional[Dict]:
         """
         Search for a place using Google Places API.
+        A match the candidate scorer is unsure about is queued for review under ``review_key``.
         """
         # Build search query
         query_parts = [name]
@@ -58,13 +68,22 @@ class TrailheadPlaceIDAssigner:
         
         for attempt in range(self.max_retries):
             try:
-                response = self.session.get(f"{self.base_url}/textsearch/json", params=params)
-                response.raise_for_status()
-                
-                data = response.json()
+                data = get_json(f"{self.base_url}/textsearch/json", params, fingerprint=fingerprint)
                 
                 if data.get('status') == 'OK' and data.get('results'):
-                    result = data['results'][0]  # Take the first result
+                    # Score every candidate instead of trusting the first one
+                    decision = get_candidate_scorer().decide(data['results'], name=name, lat=lat, lng=lng,
+                                                            record_type='trailhead', address=location)
+                    if not decision.accepted:
+                        if decision.best and review_key:
+                            get_review_queue().add(review_key, name, query, decision)
+                            logger.warning(f"Unsure match for {query} ({decision.reason}), queued for review")
+                        else:
+                            logger.warning(f"No acceptable match for {query} ({decision.reason})")
+                        return None
+                    if review_key:
+                        get_review_queue().discard(review_key)
+                    result = decision.best.result
                     place_id = result.get('place_id')
                     formatted_address = result.get('formatted_address')
                     
@@ -82,7 +101,10 @@ class TrailheadPlaceIDAssigner:
             except requests.exceptions.RequestException as e:
                 logger.warning(f"Request failed (attempt {attempt + 1}/{self.max_retries}): {e}")
                 if attempt < self.max_retries - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
+                    wait = 2 ** attempt
+                    get_metrics().retry('textsearch')
+                    get_metrics().slept('textsearch', wait, "backoff")
+                    time.sleep(wait)  # Exponential backoff
                 else:
                     logger.error(f"All retry attempts failed for query: {query}")
                     return None
@@ -108,70 +130,97 @@ class TrailheadPlaceIDAssigner:
         
         successful_updates = 0
         total_entries = 0
+        quota_exhausted = False
         
-        # Process each region
-        for region_idx, region in enumerate(data):
-            if not isinstance(region, dict) or 'trails' not in region:
-                continue
-                
-            region_name = region.get('region', f'Region {region_idx + 1}')
-            trails = region.get('trails', [])
-            
-            logger.info(f"Processing region: {region_name} with {len(trails)} trails")
-            
-            # Process each trail in the region
-            for trail_idx, trail in enumerate(trails):
-                if not isinstance(trail, dict):
+        # Trails are numbered across regions; the checkpoint cursor counts them
+        checkpoint = Checkpointer(file_path)
+        start = checkpoint.resume()
+        if start:
+            logger.info(f"Resuming after trail {start} from an interrupted run")
+        position = -1
+        completed = False
+        
+        try:
+            # Process each region
+            for region_idx, region in enumerate(data):
+                if quota_exhausted:
+                    break
+                if not isinstance(region, dict) or 'trails' not in region:
                     continue
                     
-                total_entries += 1
+                region_name = region.get('region', f'Region {region_idx + 1}')
+                trails = region.get('trails', [])
                 
-                # Skip if place_id already exists and is not null
-                if trail.get('place_id') and trail.get('place_id') != 'null':
-                    logger.info(f"Trail {trail_idx+1} in {region_name} already has place_id: {trail.get('place_id')}")
+                if position + len(trails) < start:
+                    position += len(trails)
                     continue
+                logger.info(f"Processing region: {region_name} with {len(trails)} trails")
                 
-                # Extract location information
-                name = trail.get('name', '')
-                location = trail.get('location', '')
-                lat = trail.get('lat')
-                lng = trail.get('lng')
-                place_query = trail.get('place_query', '')
-                
-                if not name:
-                    logger.warning(f"Trail {trail_idx+1} in {region_name} has no name, skipping")
-                    continue
-                
-                # Use place_query if available, otherwise use name + location
-                search_query = place_query if place_query else f"{name} {location}".strip()
-                
-                logger.info(f"Searching for trail: {name} in {region_name}")
-                logger.info(f"Search query: {search_query}")
-                
-                # Search for the place
-                place_info = self.search_place(name, location, lat, lng)
-                
-                if place_info:
-                    # Update the trail entry
-                    trail['place_id'] = place_info['place_id']
-                    trail['google_maps_url'] = place_info['google_maps_url']
+                # Process each trail in the region
+                for trail_idx, trail in enumerate(trails):
+                    position += 1
+                    if position < start:
+                        continue
+                    if checkpoint.advance(position, data):
+                        logger.info(f"Checkpoint saved after {position} trails")
+                    if not isinstance(trail, dict):
+                        continue
+                        
+                    total_entries += 1
                     
-                    # Update formatted address if available
-                    if place_info.get('formatted_address'):
-                        trail['formatted_address'] = place_info['formatted_address']
+                    # Skip if place_id already exists and is not null
+                    if trail.get('place_id') and trail.get('place_id') != 'null':
+                        logger.info(f"Trail {trail_idx+1} in {region_name} already has place_id: {trail.get('place_id')}")
+                        continue
                     
-                    successful_updates += 1
-                    logger.info(f"✓ Updated trail {trail_idx+1} in {region_name}: {name} -> {place_info['place_id']}")
-                else:
-                    logger.warning(f"✗ Failed to find place_id for trail: {name} in {region_name}")
-                
-                # Rate limiting
-                time.sleep(self.rate_limit_delay)
+                    # Extract location information
+                    name = trail.get('name', '')
+                    location = trail.get('location', '')
+                    lat = trail.get('lat')
+                    lng = trail.get('lng')
+                    place_query = trail.get('place_query', '')
+                    
+                    if not name:
+                        logger.warning(f"Trail {trail_idx+1} in {region_name} has no name, skipping")
+                        continue
+                    
+                    # Use place_query if available, otherwise use name + location
+                    search_query = place_query if place_query else f"{name} {location}".strip()
+                    
+                    logger.info(f"Searching for trail: {name} in {region_name}")
+                    logger.info(f"Search query: {search_query}")
+                    
+                    # Search for the place
+                    try:
+                        place_info = self.search_place(name, location, lat, lng, record_fingerprint(trail),
+                                                       review_key_for(file_path, trail))
+                    except QuotaExceededError as e:
+                        logger.error(f"{e} - saving progress and stopping")
+                        quota_exhausted = True
+                        break
+                    
+                    if place_info:
+                        # Update the trail entry
+                        trail['place_id'] = place_info['place_id']
+                        trail['google_maps_url'] = place_info['google_maps_url']
+                        
+                        # Update formatted address if available
+                        if place_info.get('formatted_address'):
+                            trail['formatted_address'] = place_info['formatted_address']
+                        
+                        successful_updates += 1
+                        logger.info(f"✓ Updated trail {trail_idx+1} in {region_name}: {name} -> {place_info['place_id']}")
+                    else:
+                        logger.warning(f"✗ Failed to find place_id for trail: {name} in {region_name}")
+            completed = not quota_exhausted
+        except KeyboardInterrupt:
+            logger.warning(f"Interrupted - checkpointing {file_path} so the next run resumes at trail {checkpoint.position + 1}")
+            checkpoint.finish(data, completed=False)
+            raise
         
-        # Save the updated file
+        # Save the updated file; a quota stop keeps the resume cursor
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            checkpoint.finish(data, completed=completed)
             logger.info(f"Saved updated file: {file_path}")
         except Exception as e:
             logger.error(f"Failed to save {file_path}: {e}")
@@ -232,6 +281,9 @@ def main():
     if total > 0:
         success_rate = (successful / total) * 100
         print(f"Success rate: {success_rate:.1f}%")
+    print(f"Text Search calls saved by coalescing: {get_coalescer().saved}")
+    print(f"Matches awaiting review: {len(get_review_queue().pending())} (python shared/review_queue.py)")
+    print(f"Adaptive request rate: {format_rates()}")
     
     print("="*50)
 
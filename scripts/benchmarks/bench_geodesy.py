@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Scalar vs vectorized geodesic distance benchmarks
+
+Times the shapes of distance work the scripts do, once with the scalar
+haversine the scripts used to copy (one math call per pair in a Python loop)
+and once with the NumPy kernels in shared/geodesy.py:
+    rank        one point against N candidates (Text Search result ranking)
+    pairwise    N stored points against N Google points (coordinate verification)
+    all_pairs   every pair of N points closer than 100 m (duplicate coordinate check)
+
+Each case also reports the largest difference between the two results, which
+should stay at floating-point noise.
+
+Usage:
+    python benchmarks/bench_geodesy.py                      # 10, 1k and 10k points
+    python benchmarks/bench_geodesy.py --sizes 100 5000 --repeat 5
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(SCRIPTS_DIR))
+
+from shared.geodesy import distance_m, distances_from, haversine_m, pairs_within
+
+DEFAULT_SIZES = (10, 1000, 10000)
+CASES = ("rank", "pairwise", "all_pairs")
+# The scalar all-pairs loop is quadratic; above this size it is skipped
+MAX_SCALAR_ALL_PAIRS = 5000
+CLOSE_RADIUS_M = 100
+
+
+def synthetic_points(size: int, seed: int = 0) -> List[Tuple[float, float]]:
+    """Points spread over upstate New York"""
+    rng = random.Random(seed)
+    return [(rng.uniform(41.0, 45.0), rng.uniform(-79.5, -73.5)) for _ in range(size)]
+
+
+def best_time(fn: Callable[[], object], repeat: int) -> Tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def scalar_all_pairs(points: List[Tuple[float, float]]) -> List[Tuple[int, int, float]]:
+    pairs = []
+    for i, (lat1, lng1) in enumerate(points):
+        for j in range(i + 1, len(points)):
+            distance = haversine_m(lat1, lng1, *points[j])
+            if distance < CLOSE_RADIUS_M:
+                pairs.append((i, j, distance))
+    return sorted(pairs, key=lambda pair: (pair[2], pair[0], pair[1]))
+
+
+def run_case(case: str, size: int, repeat: int) -> Tuple[float, float, float]:
+    """(scalar seconds, vectorized seconds, max abs difference in meters); scalar is nan when skipped"""
+    points = synthetic_points(size)
+    lats, lngs = [p[0] for p in points], [p[1] for p in points]
+
+    if case == "rank":
+        origin = (42.5, -76.5)
+        scalar_s, scalar = best_time(lambda: [haversine_m(*origin, lat, lng) for lat, lng in points], repeat)
+        vector_s, vector = best_time(lambda: distances_from(*origin, lats, lngs), repeat)
+        return scalar_s, vector_s, max((abs(a - b) for a, b in zip(scalar, vector)), default=0.0)
+
+    if case == "pairwise":
+        others = synthetic_points(size, seed=1)
+        other_lats, other_lngs = [p[0] for p in others], [p[1] for p in others]
+        scalar_s, scalar = best_time(
+            lambda: [haversine_m(a[0], a[1], b[0], b[1]) for a, b in zip(points, others)], repeat)
+        vector_s, vector = best_time(lambda: distance_m(lats, lngs, other_lats, other_lngs), repeat)
+        return scalar_s, vector_s, max((abs(a - b) for a, b in zip(scalar, vector)), default=0.0)
+
+    # Move every tenth point ~45 m north of its predecessor so there are close pairs to find
+    for i in range(1, size, 10):
+        points[i] = (points[i - 1][0] + 0.0004, points[i - 1][1])
+    lats, lngs = [p[0] for p in points], [p[1] for p in points]
+    vector_s, vector = best_time(lambda: pairs_within(lats, lngs, CLOSE_RADIUS_M), repeat)
+    if size > MAX_SCALAR_ALL_PAIRS:
+        return float("nan"), vector_s, 0.0
+    scalar_s, scalar = best_time(lambda: scalar_all_pairs(points), 1)
+    # Compared as sets: equal distances may sort differently at floating-point noise
+    scalar_pairs = {pair[:2]: pair[2] for pair in scalar}
+    vector_pairs = {pair[:2]: pair[2] for pair in vector}
+    if scalar_pairs.keys() != vector_pairs.keys():
+        raise AssertionError(f"all_pairs({size}): scalar and vectorized pairs differ")
+    return scalar_s, vector_s, max((abs(d - vector_pairs[ij]) for ij, d in scalar_pairs.items()), default=0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scalar and vectorized geodesic distance kernels")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=3, help="Best of this many runs per case (default: 3)")
+    args = parser.parse_args()
+
+    print(f"📐 Geodesic distance benchmarks (best of {args.repeat})")
+    for case in args.cases:
+        for size in args.sizes:
+            scalar_s, vector_s, error_m = run_case(case, size, args.repeat)
+            if scalar_s != scalar_s:  # nan: scalar run skipped
+                comparison = "scalar skipped"
+            else:
+                comparison = f"scalar {scalar_s * 1000:>9.3f} ms, {scalar_s / vector_s:>6.1f}x faster"
+            print(f"  {case:<10} {size:>7,} points: vectorized {vector_s * 1000:>9.3f} ms, {comparison}, "
+                  f"max diff {error_m:.2e} m")
+
+
+if __name__ == "__main__":
+    main()
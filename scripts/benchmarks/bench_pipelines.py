@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmarks for the enrichment and place-ID pipelines
+
+Runs EnhancedGoogleMapsEnricher.enrich_dataset, PlaceIDAssigner.process_json_file
+and TrailheadPlaceIDAssigner.process_trailheads_file end to end against the
+local mock API (shared/mock_api_server.py) with a fixed latency, on synthetic
+datasets. Each pipeline/size pair runs in its own worker process with a fresh
+response cache and an unthrottled rate limiter. It records:
+    wall_s        total wall time
+    calls_per_s   HTTP requests the mock served per second
+    peak_rss_mb   peak resident set size of the worker
+    json_write_s  time spent serializing the dataset back to disk
+
+Results are compared with benchmarks/baseline.json when it exists.
+
+Usage:
+    python benchmarks/bench_pipelines.py                           # 1k, 10k, 100k records
+    python benchmarks/bench_pipelines.py --sizes 1000 --latency 5
+    python benchmarks/bench_pipelines.py --sizes 1000 --save-baseline
+    python benchmarks/bench_pipelines.py --fail-on-regression 20   # exit 1 if >20% slower
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(SCRIPTS_DIR))
+
+BENCH_DIR = Path(__file__).resolve().parent
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+
+PIPELINES = ("enhanced_enricher", "place_id_assigner", "trailhead_assigner")
+DEFAULT_SIZES = (1000, 10000, 100000)
+TRAILS_PER_REGION = 100
+
+# Lower is better for every metric except throughput
+HIGHER_IS_BETTER = {"calls_per_s"}
+
+
+# ------------------------------
+# Synthetic data
+# ------------------------------
+
+def synthetic_records(size: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Records placed a few hundred meters from where the mock server puts the place
+    its Text Search query resolves to, so distance validation and Details calls run as in production.
+    """
+    from shared.mock_api_server import synthetic_place
+
+    rng = random.Random(seed)
+    records = []
+    for i in range(size):
+        name = f"Synthetic Place {i:06d}"
+        location = synthetic_place(f"{name}, NY, USA")["geometry"]["location"]
+        records.append({
+            "name": name,
+            "location": "Hudson Valley",
+            "lat": round(location["lat"] + rng.uniform(-0.003, 0.003), 6),
+            "lng": round(location["lng"] + rng.uniform(-0.003, 0.003), 6),
+            "description": "Synthetic benchmark record",
+        })
+    return records
+
+
+def write_dataset(pipeline: str, size: int, workdir: Path) -> Path:
+    records = synthetic_records(size)
+    path = workdir / f"{pipeline}_{size}.json"
+    if pipeline == "trailhead_assigner":
+        data = [
+            {"region": f"Region {start // TRAILS_PER_REGION}", "trails": records[start:start + TRAILS_PER_REGION]}
+            for start in range(0, len(records), TRAILS_PER_REGION)
+        ]
+    else:
+        data = records
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return path
+
+
+# ------------------------------
+# Worker (one pipeline, one size, fresh process)
+# ------------------------------
+
+def mock_stats(base_url: str) -> Dict[str, Any]:
+    with urllib.request.urlopen(f"{base_url}/__stats", timeout=5) as response:
+        return json.load(response)
+
+
+def run_worker(pipeline: str, size: int, base_url: str, workdir: Path) -> Dict[str, Any]:
+    from shared import checkpoint, metrics, places_cache, rate_limiter
+    from shared.endpoints import set_base_url
+
+    set_base_url(base_url)
+    os.environ.setdefault("GOOGLE_MAPS_API_KEY", "benchmark-key")
+    # Fresh cache and an unthrottled limiter: measure the pipeline, not the pacing
+    places_cache._shared_cache = places_cache.PlacesCache(workdir / "places_cache.sqlite")
+    rate_limiter._shared_limiter = rate_limiter.SharedRateLimiter(
+        workdir / "api_state.sqlite", rates={api: {"qps": 0} for api in rate_limiter.DEFAULT_RATES},
+    )
+    # Collected in memory only: the last stdout line must stay the JSON result
+    metrics._shared_metrics = metrics.RunMetrics(f"bench_{pipeline}")
+
+    dataset = write_dataset(pipeline, size, workdir)
+    # assign_place_ids.py opens its log file relative to the working directory
+    os.chdir(workdir)
+    logging.basicConfig(level=logging.WARNING, handlers=[logging.NullHandler()])
+
+    # Time every dataset write-back: plain json.dump and checkpointed writes
+    write_time = [0.0]
+    original_dump = json.dump
+    original_checkpoint_dump = checkpoint.dump_json
+    original_atomic_write = checkpoint.atomic_write_bytes
+
+    def timed(function):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                write_time[0] += time.perf_counter() - start
+        return wrapper
+
+    json.dump = timed(original_dump)
+    checkpoint.dump_json = timed(original_checkpoint_dump)
+    checkpoint.atomic_write_bytes = timed(original_atomic_write)
+
+    before = mock_stats(base_url)
+    start = time.perf_counter()
+
+    if pipeline == "enhanced_enricher":
+        from maintenance.enrich_with_google_maps_enhanced import EnhancedGoogleMapsEnricher
+
+        class QuietEnricher(EnhancedGoogleMapsEnricher):
+            def setup_logging(self):
+                self.logger = logging.getLogger("benchmark.enhanced_enricher")
+
+        config_path = workdir / "enricher_config.json"
+        config_path.write_text(json.dumps({"backup_files": False}), encoding="utf-8")
+        QuietEnricher(config_file=str(config_path)).enrich_dataset(dataset)
+    elif pipeline == "place_id_assigner":
+        from assign_place_ids import PlaceIDAssigner
+        PlaceIDAssigner(os.environ["GOOGLE_MAPS_API_KEY"], str(workdir)).process_json_file(dataset)
+    else:
+        from assign_trailhead_place_ids import TrailheadPlaceIDAssigner
+        TrailheadPlaceIDAssigner(os.environ["GOOGLE_MAPS_API_KEY"], str(workdir)).process_trailheads_file(dataset)
+
+    wall = time.perf_counter() - start
+    places_cache._shared_cache.flush()
+    calls = mock_stats(base_url)["requests"] - before["requests"]
+    json.dump = original_dump
+    checkpoint.dump_json = original_checkpoint_dump
+    checkpoint.atomic_write_bytes = original_atomic_write
+
+    return {
+        "pipeline": pipeline,
+        "size": size,
+        "wall_s": round(wall, 3),
+        "calls": calls,
+        "calls_per_s": round(calls / wall, 1) if wall > 0 else 0.0,
+        # ru_maxrss is reported in kilobytes on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "json_write_s": round(write_time[0], 3),
+    }
+
+
+# ------------------------------
+# Harness
+# ------------------------------
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_mock(latency_ms: float) -> Tuple[subprocess.Popen, str]:
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, str(SCRIPTS_DIR / "shared" / "mock_api_server.py"),
+         "--port", str(port), "--latency", str(latency_ms), "--fixtures", os.devnull],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            mock_stats(base_url)
+            return process, base_url
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Mock API server did not start")
+
+
+def run_case(pipeline: str, size: int, base_url: str) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="bench_") as workdir:
+        output = subprocess.run(
+            [sys.executable, __file__, "--worker", pipeline, str(size), base_url, workdir],
+            capture_output=True, text=True, check=True,
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, float]:
+    """Percentage change per metric, signed so that positive means worse"""
+    reference = baseline.get(result["pipeline"], {}).get(str(result["size"]))
+    if not reference:
+        return {}
+    deltas = {}
+    for metric in ("wall_s", "calls_per_s", "peak_rss_mb", "json_write_s"):
+        old, new = reference.get(metric), result.get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old * 100
+        deltas[metric] = -change if metric in HIGHER_IS_BETTER else change
+    return deltas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the enrichment and place-ID pipelines against the mock API")
+    parser.add_argument("--pipelines", nargs="+", choices=PIPELINES, default=list(PIPELINES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    parser.add_argument("--latency", type=float, default=5, help="Mock API latency per request in ms (default: 5)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--fail-on-regression", type=float, default=None, metavar="PCT",
+                        help="Exit non-zero if any metric is more than PCT percent worse than the baseline")
+    parser.add_argument("--output", type=Path, default=None, help="Also write the results to this JSON file")
+    parser.add_argument("--worker", nargs=4, metavar=("PIPELINE", "SIZE", "BASE_URL", "WORKDIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        pipeline, size, base_url, workdir = args.worker
+        print(json.dumps(run_worker(pipeline, int(size), base_url, Path(workdir))))
+        return
+
+    baseline = {}
+    if args.baseline.exists():
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(f"🏁 Pipeline benchmarks (mock latency {args.latency:g} ms)")
+    process, base_url = start_mock(args.latency)
+    results = []
+    regressions = []
+    try:
+        for pipeline in args.pipelines:
+            for size in args.sizes:
+                result = run_case(pipeline, size, base_url)
+                results.append(result)
+                deltas = compare(result, baseline)
+                delta_text = ", ".join(f"{metric} {change:+.0f}%" for metric, change in deltas.items())
+                print(f"  {pipeline:<20} {size:>7,} records: {result['wall_s']:>8.2f}s wall, "
+                      f"{result['calls_per_s']:>7.1f} calls/s, {result['peak_rss_mb']:>6.1f} MB RSS, "
+                      f"{result['json_write_s']:.3f}s JSON write"
+                      + (f"  [vs baseline: {delta_text}]" if delta_text else ""))
+                if args.fail_on_regression is not None:
+                    regressions += [(pipeline, size, metric, change) for metric, change in deltas.items()
+                                    if change > args.fail_on_regression]
+    finally:
+        process.terminate()
+        process.wait()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        for result in results:
+            baseline.setdefault(result["pipeline"], {})[str(result["size"])] = {
+                key: value for key, value in result.items() if key not in ("pipeline", "size")
+            }
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+
+    if regressions:
+        for pipeline, size, metric, change in regressions:
+            print(f"❌ {pipeline} ({size:,}): {metric} {change:+.0f}% vs baseline")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
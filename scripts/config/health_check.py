@@ -10,11 +10,13 @@ import requests
 from pathlib import Path
 from typing import Dict, List, Tuple, Any
 
-# Add the config directory to the path
+# Add the config directory to the path, and the scripts directory for the shared modules
 sys.path.append(str(Path(__file__).parent))
+sys.path.append(str(Path(__file__).parent.parent))
 
 from loader import load_script_config, get_api_key, validate_environment, CONFIG_DIR
 from schemas import validate_config, SCHEMAS
+from shared.metrics import get_metrics
 
 class ConfigHealthChecker:
     """Health checker for configuration system"""
@@ -132,8 +134,11 @@ class ConfigHealthChecker:
                 'key': api_key
             }
             
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
+            # A direct probe of the key, recorded like every other outbound request
+            with get_metrics().track('geocode') as call:
+                response = requests.get(url, params=params, timeout=10)
+                data = response.json()
+                call.status = data.get('status')
             
             return data.get('status') == 'OK'
         except Exception:
@@ -12,7 +12,91 @@ API_SCHEMA = {
             "properties": {
                 "geocoding_endpoint": {"type": "string", "format": "uri"},
                 "timeout": {"type": "number", "minimum": 1, "maximum": 300},
-                "rate_limit_delay": {"type": "number", "minimum": 0, "maximum": 10}
+                "rate_limit_delay": {"type": "number", "minimum": 0, "maximum": 10},
+                "shared_rate_limit": {
+                    "type": "object",
+                    "properties": {
+                        "state_file": {"type": "string"},
+                        "rates": {
+                            "type": "object",
+                            "additionalProperties": {
+                                "type": "object",
+                                "properties": {
+                                    "qps": {"type": "number", "minimum": 0, "maximum": 1000},
+                                    "burst": {"type": "number", "minimum": 1, "maximum": 1000}
+                                },
+                                "required": ["qps"]
+                            }
+                        },
+                        "daily_quota": {
+                            "type": "object",
+                            "additionalProperties": {"type": "integer", "minimum": 0}
+                        }
+                    }
+                },
+                "response_cache": {
+                    "type": "object",
+                    "properties": {
+                        "path": {"type": "string"},
+                        "cache_ttl_days": {"type": "number", "minimum": 0},
+                        "verify_ttl_days": {"type": "number", "minimum": 0},
+                        "ttl_days": {
+                            "type": "object",
+                            "additionalProperties": {"type": "number", "minimum": 0}
+                        },
+                        "max_entries": {"type": "integer", "minimum": 1},
+                        "max_mb": {"type": "number", "minimum": 1},
+                        "commit_every": {"type": "integer", "minimum": 1, "maximum": 10000},
+                        "negative": {
+                            "type": "object",
+                            "properties": {
+                                "enabled": {"type": "boolean"},
+                                "retry_days": {"type": "number", "exclusiveMinimum": 0},
+                                "backoff_factor": {"type": "number", "minimum": 1},
+                                "max_retry_days": {"type": "number", "exclusiveMinimum": 0}
+                            }
+                        }
+                    }
+                },
+                "adaptive": {
+                    "type": "object",
+                    "properties": {
+                        "enabled": {"type": "boolean"},
+                        "initial_fraction": {"type": "number", "exclusiveMinimum": 0, "maximum": 1},
+                        "min_qps": {"type": "number", "exclusiveMinimum": 0},
+                        "increase_fraction": {"type": "number", "exclusiveMinimum": 0, "maximum": 1},
+                        "decrease_factor": {"type": "number", "exclusiveMinimum": 0, "exclusiveMaximum": 1},
+                        "window": {"type": "integer", "minimum": 1},
+                        "latency_target_ms": {"type": "number", "minimum": 0}
+                    }
+                },
+                "pricing": {
+                    "type": "object",
+                    "properties": {
+                        "usd_per_1000": {
+                            "type": "object",
+                            "additionalProperties": {"type": "number", "minimum": 0}
+                        }
+                    }
+                },
+                "matching": {
+                    "type": "object",
+                    "properties": {
+                        "weights": {
+                            "type": "object",
+                            "properties": {
+                                "distance": {"type": "number", "minimum": 0},
+                                "name": {"type": "number", "minimum": 0},
+                                "types": {"type": "number", "minimum": 0},
+                                "address": {"type": "number", "minimum": 0}
+                            },
+                            "additionalProperties": False
+                        },
+                        "min_confidence": {"type": "number", "minimum": 0, "maximum": 1},
+                        "margin": {"type": "number", "minimum": 0, "maximum": 1},
+                        "top_k": {"type": "integer", "minimum": 1}
+                    }
+                }
             },
             "required": ["geocoding_endpoint", "timeout", "rate_limit_delay"]
         },
@@ -24,6 +108,13 @@ API_SCHEMA = {
                 "max_retries": {"type": "integer", "minimum": 1, "maximum": 10}
             },
             "required": ["default_model", "timeout", "max_retries"]
+        },
+        "metrics": {
+            "type": "object",
+            "properties": {
+                "enabled": {"type": "boolean"},
+                "keep_runs": {"type": "integer", "minimum": 0}
+            }
         }
     }
 }
@@ -113,6 +204,8 @@ MAINTENANCE_SCHEMA = {
             "properties": {
                 "months_ahead": {"type": "integer", "minimum": 1, "maximum": 12},
                 "sleep_between_regions": {"type": "number", "minimum": 0, "maximum": 10},
+                "concurrency": {"type": "integer", "minimum": 1, "maximum": 32},
+                "call_timeout": {"type": "number", "minimum": 1, "maximum": 3600},
                 "geocode_delay_base": {"type": "number", "minimum": 0, "maximum": 10},
                 "geocode_delay_progressive": {
                     "type": "object",
@@ -151,6 +244,47 @@ MAINTENANCE_SCHEMA = {
             },
             "required": ["months_ahead", "sleep_between_regions", "filters", "output"]
         },
+        "verify_coordinates": {
+            "type": "object",
+            "properties": {
+                "concurrency": {"type": "integer", "minimum": 1, "maximum": 64},
+                "qps": {"type": "number", "minimum": 0, "maximum": 100},
+                "timeout": {"type": "number", "minimum": 1, "maximum": 300},
+                "reverify_ttl_days": {"type": "number", "minimum": 0},
+                "response_ttl_days": {"type": "number", "minimum": 0},
+                "max_checks_per_run": {"type": "integer", "minimum": 0}
+            }
+        },
+        "tag_regions": {
+            "type": "object",
+            "properties": {
+                "regions_file": {"type": "string", "minLength": 1}
+            }
+        },
+        "refresh_place_ids": {
+            "type": "object",
+            "properties": {
+                "max_age_days": {"type": "number", "exclusiveMinimum": 0},
+                "max_ids_per_run": {"type": "integer", "minimum": 0},
+                "concurrency": {"type": "integer", "minimum": 1, "maximum": 64},
+                "qps": {"type": "number", "minimum": 0, "maximum": 100},
+                "timeout": {"type": "number", "minimum": 1, "maximum": 300}
+            }
+        },
+        "restaurant_status": {
+            "type": "object",
+            "properties": {
+                "check_interval_days": {"type": "number", "exclusiveMinimum": 0},
+                "daily_budget": {"type": "integer", "minimum": 0},
+                "early_check_fraction": {"type": "number", "minimum": 0},
+                "status_weights": {
+                    "type": "object",
+                    "additionalProperties": {"type": "number", "exclusiveMinimum": 0}
+                },
+                "recent_change_days": {"type": "number", "minimum": 0},
+                "recent_change_weight": {"type": "number", "exclusiveMinimum": 0}
+            }
+        },
         "data_cleanup": {
             "type": "object",
             "properties": {
@@ -221,6 +355,36 @@ UTILITIES_SCHEMA = {
 GEOCODING_SCHEMA = {
     "type": "object",
     "properties": {
+        "service": {
+            "type": "object",
+            "properties": {
+                "chain": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": ["gazetteer", "google", "nominatim"]},
+                    "minItems": 1,
+                    "uniqueItems": True
+                },
+                "cache_ttl_days": {"type": "number", "minimum": 0},
+                "region": {"type": "string"},
+                "timeout": {"type": "number", "minimum": 1, "maximum": 300},
+                "concurrency": {"type": "integer", "minimum": 1, "maximum": 64},
+                "qps": {"type": "number", "minimum": 0, "maximum": 100},
+                "nominatim": {
+                    "type": "object",
+                    "properties": {
+                        "user_agent": {"type": "string", "minLength": 1},
+                        "countrycodes": {"type": "string"}
+                    }
+                }
+            }
+        },
+        "gazetteer": {
+            "type": "object",
+            "properties": {
+                "path": {"type": "string", "minLength": 1},
+                "name_conflict_m": {"type": "number", "minimum": 0}
+            }
+        },
         "rate_limiting": {
             "type": "object",
             "properties": {
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Apply a coordinate correction patch written by verify_coordinates_google.py
+
+Corrections are matched by place_id (or the record's stable key), grouped by
+dataset file and applied with one load and one atomic write per file.
+Corrections whose record has moved since verification, or that disagree with
+another correction for the same record, are reported and left out.
+
+Usage:
+    python maintenance/apply_coordinate_corrections.py coordinate_corrections.json --dry-run   # diff only
+    python maintenance/apply_coordinate_corrections.py coordinate_corrections.json
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.corrections import apply_corrections, load_patch
+from shared.datasets import DATA_DIR
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Apply a coordinate correction patch to the datasets")
+    parser.add_argument('patch', type=Path, nargs='?', default=Path('coordinate_corrections.json'),
+                        help='Correction patch (default: coordinate_corrections.json)')
+    parser.add_argument('--data-dir', type=Path, default=DATA_DIR)
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Print the changes as a diff without writing any file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not args.patch.exists():
+        print(f"❌ Correction patch not found: {args.patch}")
+        print("   Run maintenance/verify_coordinates_google.py first")
+        sys.exit(1)
+
+    corrections = load_patch(args.patch)
+    print(f"🔧 {len(corrections)} corrections from {args.patch}" + (" (dry run)" if args.dry_run else ""))
+    result = apply_corrections(corrections, args.data_dir, dry_run=args.dry_run)
+
+    print(f"\n📊 {result.summary()}")
+    for path in result.files_written:
+        print(f"💾 Wrote {path}")
+    if args.dry_run:
+        print("🔍 DRY RUN - no files were changed")
+    if result.count("conflict"):
+        print("⚠️  Conflicting corrections were skipped; re-run the verification to refresh them")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,16 @@ Restaurant status maintenance script
     - business_status: 'OPERATIONAL' | 'CLOSED_TEMPORARILY' | 'CLOSED_PERMANENTLY'
     - closed_flag: null | 'temporary' | 'permanent'
     - status_last_checked: ISO8601 timestamp of last check
-- Only checks entries not checked in the last 30 days (unless --force)
+    - status_changed_at: ISO8601 timestamp of the last status change
+- Checks a daily budget of restaurants, most valuable first: ranked by how stale the
+  last check is and how likely the status is to have changed (recently closed or
+  changed places are re-checked sooner), so the load is spread across the month
+  instead of every restaurant falling due on the same day (--force checks all)
 - Uses place_id when available; otherwise attempts a Find Place search
+- Paced by the shared cross-process rate limiter (stops cleanly when the daily quota is reached)
 
 Usage:
-  python check_restaurant_status.py [--force]
+  python check_restaurant_status.py [--force] [--budget N] [--dry-run]
 
 Requires:
   - scripts/.env with GOOGLE_MAPS_API_KEY
@@ -22,24 +27,40 @@ import argparse
 import json
 import os
 import sys
-import time
 from datetime import datetime, timedelta, timezone
 
-import requests
 from dotenv import load_dotenv
 
-GOOGLE_FIND_PLACE_URL = "https://maps.googleapis.com/maps/api/place/findplacefromtext/json"
-GOOGLE_PLACE_DETAILS_URL = "https://maps.googleapis.com/maps/api/place/details/json"
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
-RESTAURANTS_PATH = os.path.join(os.path.dirname(__file__), "..", "public", "data", "restaurants.json")
+from config.loader import load_script_config
+from shared.datasets import get_dataset
+from shared.endpoints import add_base_url_argument, apply_base_url
+from shared.google_api import PLACES_BASE_URL, get_json
+from shared.negative_cache import record_fingerprint
+from shared.place_snapshots import get_snapshot
+from shared.rate_limiter import QuotaExceededError
+from shared.refresh_scheduler import StalenessScheduler, parse_timestamp
 
-CHECK_INTERVAL_DAYS = 30
-RATE_LIMIT_DELAY_SEC = 0.12  # gentle pacing
+GOOGLE_FIND_PLACE_URL = f"{PLACES_BASE_URL}/findplacefromtext/json"
+
+RESTAURANTS_PATH = str(get_dataset("restaurants").path())
+
+STATUS_CONFIG = load_script_config("maintenance", __file__).get("restaurant_status", {})
+
+CHECK_INTERVAL_DAYS = STATUS_CONFIG.get("check_interval_days", 30)
+# A place snapshot (see maintenance/refresh_place_snapshots.py) at most this old is trusted for business_status
+BUSINESS_STATUS_MAX_AGE_DAYS = 7
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Check restaurant status via Google Places")
     parser.add_argument("--force", action="store_true", help="Force re-check all restaurants regardless of last check date")
+    parser.add_argument("--budget", type=int, default=STATUS_CONFIG.get("daily_budget", 0),
+                        help="Checks per day (default: config; 0 = every restaurant once per check interval)")
+    parser.add_argument("--dry-run", action="store_true", help="Only show which restaurants would be checked today")
+    add_base_url_argument(parser)
     return parser.parse_args()
 
 
@@ -66,17 +87,24 @@ def iso_now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def needs_check(item: dict, force: bool) -> bool:
-    if force:
-        return True
-    last = item.get("status_last_checked")
-    if not last:
-        return True
-    try:
-        last_dt = datetime.fromisoformat(last)
-    except Exception:
-        return True
-    return (datetime.now(timezone.utc) - last_dt) >= timedelta(days=CHECK_INTERVAL_DAYS)
+def change_likelihood(item: dict) -> float:
+    """Weight on staleness: how much more likely than usual this restaurant's status has changed"""
+    weights = STATUS_CONFIG.get("status_weights", {})
+    weight = weights.get(item.get("business_status") or "UNKNOWN", 1.0)
+    changed_at = parse_timestamp(item.get("status_changed_at"))
+    recent_days = STATUS_CONFIG.get("recent_change_days", 60)
+    if changed_at and datetime.now(timezone.utc) - changed_at < timedelta(days=recent_days):
+        weight *= STATUS_CONFIG.get("recent_change_weight", 2.0)
+    return weight
+
+
+def make_scheduler(budget: int) -> StalenessScheduler:
+    return StalenessScheduler(
+        CHECK_INTERVAL_DAYS,
+        daily_budget=budget,
+        early_fraction=STATUS_CONFIG.get("early_check_fraction", 0.5),
+        weight=change_likelihood,
+    )
 
 
 def map_business_status_to_flag(status: str):
@@ -106,29 +134,24 @@ def ensure_place_id(api_key: str, restaurant: dict) -> str | None:
         "key": api_key,
     }
     try:
-        r = requests.get(GOOGLE_FIND_PLACE_URL, params=params, timeout=20)
-        r.raise_for_status()
-        data = r.json()
+        # A restaurant Google cannot find is remembered and retried at growing intervals
+        data = get_json(GOOGLE_FIND_PLACE_URL, params, timeout=20, fingerprint=record_fingerprint(restaurant))
         if data.get("status") == "OK" and data.get("candidates"):
             return data["candidates"][0].get("place_id")
+    except QuotaExceededError:
+        raise
     except Exception:
         return None
     return None
 
 
 def fetch_business_status(api_key: str, place_id: str) -> str | None:
-    params = {
-        "place_id": place_id,
-        "fields": "business_status",
-        "key": api_key,
-    }
     try:
-        r = requests.get(GOOGLE_PLACE_DETAILS_URL, params=params, timeout=20)
-        r.raise_for_status()
-        data = r.json()
-        if data.get("status") == "OK":
-            result = data.get("result", {})
-            return result.get("business_status")
+        snapshot = get_snapshot(api_key, place_id, ttl_days=BUSINESS_STATUS_MAX_AGE_DAYS)
+        if snapshot:
+            return snapshot.get("business_status")
+    except QuotaExceededError:
+        raise
     except Exception:
         return None
     return None
@@ -136,7 +159,7 @@ def fetch_business_status(api_key: str, place_id: str) -> str | None:
 
 def main() -> None:
     args = parse_args()
-    api_key = load_api_key()
+    apply_base_url(args)
 
     try:
         restaurants = read_json(RESTAURANTS_PATH)
@@ -147,28 +170,47 @@ def main() -> None:
         print(f"❌ Failed to read restaurants.json: {e}", file=sys.stderr)
         sys.exit(1)
 
-    to_check = [r for r in restaurants if needs_check(r, args.force)]
+    scheduler = make_scheduler(args.budget)
+    if args.force:
+        to_check = restaurants
+    else:
+        schedule = scheduler.schedule(restaurants)
+        to_check = schedule.selected
+        print(f"🗓️  {schedule.summary()}")
     print(f"🍽️  Checking {len(to_check)} of {len(restaurants)} restaurants (force={args.force})")
 
+    if args.dry_run:
+        for r in to_check:
+            age = scheduler.age_days(r)
+            last = "never checked" if age is None else f"checked {age:.0f}d ago"
+            print(f"  • {r.get('name', '<unnamed>')} ({r.get('business_status') or 'UNKNOWN'}, {last})")
+        return
+
+    api_key = load_api_key()
+
     checked = 0
     updated = 0
 
     for r in to_check:
         name = r.get("name", "<unnamed>")
-        place_id = ensure_place_id(api_key, r)
+        try:
+            place_id = ensure_place_id(api_key, r)
+            status = fetch_business_status(api_key, place_id) if place_id else None
+        except QuotaExceededError as e:
+            print(f"  🛑 {e}; saving progress and stopping")
+            break
+
         if not place_id:
             print(f"  ⚠️  Skipping (no place_id found): {name}")
-            # still update last checked to avoid hammering if truly unresolvable? choose not to.
+            # The negative cache keeps an unresolvable name from being searched again on every run
             r["status_last_checked"] = iso_now()
             checked += 1
             continue
 
-        status = fetch_business_status(api_key, place_id)
         if status is None:
             print(f"  ⚠️  No status for: {name}")
             r["status_last_checked"] = iso_now()
             checked += 1
-            time.sleep(RATE_LIMIT_DELAY_SEC)
             continue
 
         # Map to closed_flag
@@ -182,6 +224,8 @@ def main() -> None:
         r["business_status"] = status
         r["closed_flag"] = closed_flag
         r["status_last_checked"] = iso_now()
+        if before_status is not None and status != before_status:
+            r["status_changed_at"] = r["status_last_checked"]
 
         if status != before_status or closed_flag != before_flag:
             updated += 1
@@ -190,7 +234,6 @@ def main() -> None:
         print(f"  ✅ {name}: {state_msg}")
 
         checked += 1
-        time.sleep(RATE_LIMIT_DELAY_SEC)
 
     # Save
     try:
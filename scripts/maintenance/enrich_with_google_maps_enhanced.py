@@ -13,35 +13,64 @@ This enhanced version addresses the issues with the original script:
 
 Usage:
     python enrich_with_google_maps_enhanced.py [--dry-run] [--config config.json]
+    python enrich_with_google_maps_enhanced.py --plan    # projected calls, cost and time only
+    python enrich_with_google_maps_enhanced.py --resolution details    # always confirm matches with Place Details
 
 Requirements:
-    pip install requests python-dotenv
+    pip install requests python-dotenv numpy
 """
 
 import json
 import os
+import sys
 import requests
-import time
-import math
 import shutil
+import time
 import logging
 import argparse
 from pathlib import Path
 from dotenv import load_dotenv
 from datetime import datetime
 
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.adaptive import format_rates
+from shared.call_planner import CallPlan
+from shared.candidate_scorer import get_candidate_scorer
+from shared.checkpoint import Checkpointer
+from shared.coalescer import get_coalescer
+from shared.datasets import DATASETS, get_dataset
+from shared.endpoints import add_base_url_argument, apply_base_url
+from shared.google_api import PLACES_BASE_URL, endpoint_for_url, get_json
+from shared.metrics import get_metrics
+from shared.negative_cache import record_fingerprint
+from shared.place_resolution import RESOLUTION_MODES, PlaceResolver
+from shared.place_snapshots import SNAPSHOT_FIELDS
+from shared.rate_limiter import QuotaExceededError
+from shared.review_queue import get_review_queue, review_key_for
+
 # Load environment variables from .env file
 load_dotenv()
 
+def item_coordinates(item):
+    lat, lng = item.get('lat'), item.get('lng')
+    return None if lat is None or lng is None else (lat, lng)
+
+def city_coordinates(city):
+    coords = city.get('coordinates')
+    return tuple(coords) if coords and len(coords) == 2 else None
+
 class EnhancedGoogleMapsEnricher:
-    def __init__(self, config_file=None, dry_run=False):
+    def __init__(self, config_file=None, dry_run=False, resolution_mode=None):
         self.api_key = os.getenv('GOOGLE_MAPS_API_KEY')
         if not self.api_key:
             raise ValueError("GOOGLE_MAPS_API_KEY environment variable not set")
         
-        self.base_url = "https://maps.googleapis.com/maps/api/place"
+        self.base_url = PLACES_BASE_URL
         self.dry_run = dry_run
         self.used_place_ids = set()  # Track used place IDs to prevent duplicates
+        self.quota_exhausted = False  # Set once the daily quota is used up; run() stops there
         
         # Load configuration
         self.config = self.load_config(config_file)
@@ -49,6 +78,9 @@ class EnhancedGoogleMapsEnricher:
         # Setup logging
         self.setup_logging()
         
+        # "single_call" takes the place fields from Text Search; "details" always asks Place Details
+        self.resolver = PlaceResolver(resolution_mode or self.config.get('resolution_mode', 'single_call'))
+        
         # Statistics tracking
         self.stats = {
             'total_processed': 0,
@@ -57,20 +89,24 @@ class EnhancedGoogleMapsEnricher:
             'skipped': 0,
             'errors': 0,
             'duplicates_prevented': 0,
-            'api_calls_made': 0
+            'queued_for_review': 0,
+            'api_calls_made': 0,
+            'over_query_limit': 0
         }
         
     def load_config(self, config_file):
         """Load configuration from file or use defaults"""
         default_config = {
-            "rate_limit_delay": 0.1,
             "max_distance_city": 10000,
             "max_distance_other": 3000,
             "coordinate_threshold": 0.0001,
             "backup_files": True,
             "max_retries": 3,
             "retry_delay": 2,
-            "api_timeout": 10
+            "api_timeout": 10,
+            "checkpoint_every": 0,
+            "checkpoint_interval": 60,
+            "resolution_mode": "single_call"
         }
         
         if config_file and Path(config_file).exists():
@@ -121,21 +157,21 @@ class EnhancedGoogleMapsEnricher:
         except Exception as e:
             self.logger.error(f"❌ Failed to create backup: {e}")
     
-    def make_api_request_with_retry(self, url, params, max_retries=None):
-        """Make API request with exponential backoff retry"""
+    def make_api_request_with_retry(self, url, params, max_retries=None, fingerprint=None):
+        """
+        Make API request with exponential backoff retry; pacing comes from the shared rate limiter
+        and the adaptive pacer, which has already slowed down when OVER_QUERY_LIMIT comes back
+        """
         if max_retries is None:
             max_retries = self.config.get('max_retries', 3)
             
+        metrics = get_metrics()
+        endpoint = endpoint_for_url(url)
         for attempt in range(max_retries):
+            # Only requests that went out count; cache, negative-cache and coalesced answers do not
+            sent = metrics.endpoint(endpoint).requests
             try:
-                self.stats['api_calls_made'] += 1
-                response = requests.get(
-                    url, 
-                    params=params, 
-                    timeout=self.config.get('api_timeout', 10)
-                )
-                response.raise_for_status()
-                return response
+                data = get_json(url, params, timeout=self.config.get('api_timeout', 10), fingerprint=fingerprint)
             except requests.exceptions.RequestException as e:
                 if attempt == max_retries - 1:
                     self.logger.error(f"❌ API request failed after {max_retries} attempts: {e}")
@@ -143,20 +179,73 @@ class EnhancedGoogleMapsEnricher:
                 
                 wait_time = self.config.get('retry_delay', 2) ** attempt
                 self.logger.warning(f"🔄 Attempt {attempt + 1} failed, retrying in {wait_time}s...")
+                metrics.retry(endpoint)
+                metrics.slept(endpoint, wait_time, "backoff")
                 time.sleep(wait_time)
+                continue
+            finally:
+                self.stats['api_calls_made'] += metrics.endpoint(endpoint).requests - sent
+            
+            if data.get('status') == 'OVER_QUERY_LIMIT' and attempt < max_retries - 1:
+                self.stats['over_query_limit'] += 1
+                self.logger.warning(f"🐢 OVER_QUERY_LIMIT on attempt {attempt + 1}, retrying at a lower rate...")
+                metrics.retry(endpoint)
+                continue
+            return data
+    
+    def details_params(self, place_id):
+        """Details request for ``place_id``"""
+        # Union field mask, so this response also serves as the place's shared snapshot
+        return {
+            'place_id': place_id,
+            'fields': SNAPSHOT_FIELDS,
+            'key': self.api_key
+        }
+    
+    def text_search_params(self, name, lat, lng, location_context="", state="NY", country="USA",
+                           is_city=False, custom_query=None):
+        """Text Search request used to find a record's place"""
+        # Use custom query if provided, otherwise construct one
+        if custom_query:
+            query = custom_query
+        elif is_city:
+            # For cities, use "City Name, NY" format
+            query = f"{name}, {state}"
+        else:
+            # For other locations, include context
+            query = f"{name}"
+            if location_context:
+                query += f" {location_context}"
+            query += f", {state}, {country}"
+        
+        return {
+            'query': query,
+            'location': f"{lat},{lng}",
+            'radius': 2000,  # 2km radius for better results
+            'key': self.api_key
+        }
+    
+    def best_match(self, results, lat, lng, is_city=False, name=None, location_context="", address=None):
+        """
+        Score every result within the allowed distance of our coordinates on distance,
+        name, place types and address (shared/candidate_scorer.py).
+        Returns (MatchDecision, max distance)
+        """
+        # For cities, be more lenient with distance (up to 10km)
+        # For other locations, be stricter (up to 3km)
+        max_distance = self.config.get('max_distance_city' if is_city else 'max_distance_other')
+        
+        decision = get_candidate_scorer().decide(
+            results, name=name, lat=lat, lng=lng, address=address, max_distance_m=max_distance,
+            record_type='city' if is_city else location_context,
+        )
+        return decision, max_distance
     
     def get_place_details(self, place_id):
         """Get detailed information about a place using its place ID"""
         try:
             url = f"{self.base_url}/details/json"
-            params = {
-                'place_id': place_id,
-                'fields': 'geometry,name,formatted_address',
-                'key': self.api_key
-            }
-            
-            response = self.make_api_request_with_retry(url, params)
-            data = response.json()
+            data = self.make_api_request_with_retry(url, self.details_params(place_id))
             
             if data['status'] == 'OK':
                 result = data['result']
@@ -171,82 +260,41 @@ class EnhancedGoogleMapsEnricher:
                 self.logger.error(f"❌ Place details failed: {data.get('status', 'Unknown error')}")
                 return None
                 
+        except QuotaExceededError:
+            raise
         except Exception as e:
             self.logger.error(f"❌ Unexpected error getting place details: {e}")
             return None
     
-    def calculate_distance(self, lat1, lng1, lat2, lng2):
-        """Calculate distance between two coordinates in meters"""
-        R = 6371000  # Earth's radius in meters
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        delta_lat = math.radians(lat2 - lat1)
-        delta_lng = math.radians(lng2 - lng1)
-        
-        a = (math.sin(delta_lat/2) * math.sin(delta_lat/2) + 
-             math.cos(lat1_rad) * math.cos(lat2_rad) * 
-             math.sin(delta_lng/2) * math.sin(delta_lng/2))
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        
-        return R * c
-    
-    def find_place_id(self, name, lat, lng, location_context="", state="NY", country="USA", is_city=False, custom_query=None):
+    def find_place_id(self, name, lat, lng, location_context="", state="NY", country="USA", is_city=False, custom_query=None,
+                      fingerprint=None, address=None, review_key=None):
         """
-        Find Google Maps place ID with improved accuracy
+        Find Google Maps place ID with improved accuracy.
+        A match the scorer is unsure about goes to the review queue under ``review_key``.
         """
         try:
-            # Use custom query if provided, otherwise construct one
+            params = self.text_search_params(name, lat, lng, location_context, state, country,
+                                             is_city=is_city, custom_query=custom_query)
             if custom_query:
-                query = custom_query
-                self.logger.info(f"🔍 Using custom query: '{query}'")
+                self.logger.info(f"🔍 Using custom query: '{params['query']}'")
             else:
-                # Create more specific search query
-                if is_city:
-                    # For cities, use "City Name, NY" format
-                    query = f"{name}, {state}"
-                else:
-                    # For other locations, include context
-                    query = f"{name}"
-                    if location_context:
-                        query += f" {location_context}"
-                    query += f", {state}, {country}"
-                
-                self.logger.info(f"🔍 Searching: '{query}'")
+                self.logger.info(f"🔍 Searching: '{params['query']}'")
             
             # Use Places Text Search API
             url = f"{self.base_url}/textsearch/json"
-            params = {
-                'query': query,
-                'location': f"{lat},{lng}",
-                'radius': 2000,  # 2km radius for better results
-                'key': self.api_key
-            }
-            
-            response = self.make_api_request_with_retry(url, params)
-            data = response.json()
+            data = self.make_api_request_with_retry(url, params, fingerprint=fingerprint)
             
             if data['status'] == 'OK' and data['results']:
-                # Find the best match by validating coordinates
-                best_match = None
-                min_distance = float('inf')
+                # Rank the candidates; only a confident, clear winner is written
+                decision, max_distance = self.best_match(data['results'], lat, lng, is_city,
+                                                         name, location_context, address)
                 
-                for result in data['results']:
-                    result_lat = result['geometry']['location']['lat']
-                    result_lng = result['geometry']['location']['lng']
-                    
-                    # Calculate distance from our target coordinates
-                    distance = self.calculate_distance(lat, lng, result_lat, result_lng)
-                    
-                    # For cities, be more lenient with distance (up to 10km)
-                    # For other locations, be stricter (up to 3km)
-                    max_distance = self.config.get('max_distance_city' if is_city else 'max_distance_other')
-                    
-                    if distance < max_distance and distance < min_distance:
-                        min_distance = distance
-                        best_match = result
-                
-                if best_match:
+                if decision.accepted:
+                    best_match = decision.best.result
                     place_id = best_match['place_id']
+                    min_distance = decision.best.distance_m
+                    if review_key:
+                        get_review_queue().discard(review_key)
                     
                     # Check for duplicates
                     if place_id in self.used_place_ids:
@@ -256,27 +304,21 @@ class EnhancedGoogleMapsEnricher:
                         return None
                     
                     self.used_place_ids.add(place_id)
-                    self.logger.info(f"✅ Found place ID: {place_id} ({min_distance:.0f}m away)")
+                    self.logger.info(f"✅ Found place ID: {place_id} ({min_distance:.0f}m away, {decision.reason})")
                     
-                    # Get authoritative coordinates from place details
-                    place_details = self.get_place_details(place_id)
-                    if place_details:
-                        self.logger.info(f"🔄 Coordinates: {lat:.6f},{lng:.6f} -> {place_details['lat']:.6f},{place_details['lng']:.6f}")
-                        return {
-                            'place_id': place_id,
-                            'lat': place_details['lat'],
-                            'lng': place_details['lng'],
-                            'name': place_details['name'],
-                            'address': place_details['address']
-                        }
-                    else:
-                        return {
-                            'place_id': place_id,
-                            'lat': lat,  # Keep original if details fail
-                            'lng': lng,
-                            'name': name,
-                            'address': ''
-                        }
+                    # Authoritative fields from the search result, Details only where it is lacking
+                    # (original values are kept if Details fails)
+                    place, path = self.resolver.resolve(best_match, self.get_place_details,
+                                                        {'lat': lat, 'lng': lng, 'name': name, 'address': ''})
+                    if path != 'details_failed':
+                        self.logger.info(f"🔄 Coordinates: {lat:.6f},{lng:.6f} -> {place['lat']:.6f},{place['lng']:.6f}")
+                    return {'place_id': place_id, **place}
+                elif decision.best:
+                    if review_key and get_review_queue().add(review_key, name, params['query'], decision):
+                        self.stats['queued_for_review'] += 1
+                    self.logger.warning(f"🔎 Unsure match ({decision.reason}), queued for review: "
+                                        f"{decision.best.result.get('name')} ({decision.best.distance_m:.0f}m away)")
+                    return None
                 else:
                     self.logger.error(f"❌ No suitable match found within {max_distance/1000:.1f}km")
                     return None
@@ -284,6 +326,8 @@ class EnhancedGoogleMapsEnricher:
                 self.logger.error(f"❌ No place found: {data.get('status', 'Unknown error')}")
                 return None
                 
+        except QuotaExceededError:
+            raise
         except Exception as e:
             self.logger.error(f"❌ Unexpected error: {e}")
             return None
@@ -317,63 +361,90 @@ class EnhancedGoogleMapsEnricher:
         
         self.logger.info(f"📊 Processing {total_count} items...")
         
-        for i, item in enumerate(data):
-            name = item.get('name', 'Unknown')
-            self.logger.info(f"🔄 Processing {i+1}/{total_count}: {name}")
-            
-            # Check if already enriched (has valid place_id)
-            if 'place_id' in item and item['place_id'] is not None and 'google_maps_url' in item:
-                self.logger.info(f"⏭️ Already enriched, skipping")
-                continue
-            
-            # Get coordinates
-            lat = item.get('lat')
-            lng = item.get('lng')
-            
-            if lat is None or lng is None:
-                self.logger.warning(f"⚠️ No coordinates found, skipping")
-                skipped_count += 1
-                continue
-            
-            # Check for custom place query in the JSON object
-            custom_query = item.get('place_query')
-            
-            # Find place ID and get updated coordinates
-            result = self.find_place_id(
-                name, 
-                lat, 
-                lng, 
-                location_context,
-                state,
-                is_city=is_city,
-                custom_query=custom_query
-            )
-            
-            if result:
-                # Update with place ID and Google Maps URL
-                item['place_id'] = result['place_id']
-                item['google_maps_url'] = self.create_google_maps_url(result['place_id'])
+        checkpoint = Checkpointer(
+            file_path,
+            every=self.config.get('checkpoint_every', 0),
+            interval=self.config.get('checkpoint_interval', 60),
+            enabled=not self.dry_run,
+        )
+        start = checkpoint.resume()
+        if start:
+            self.logger.info(f"⏩ Resuming at item {start + 1}/{total_count} from an interrupted run")
+        
+        completed = False
+        try:
+            for i, item in enumerate(data):
+                if i < start:
+                    continue
+                if checkpoint.advance(i, data):
+                    self.logger.info(f"💾 Checkpoint saved after {i}/{total_count} items")
+                
+                name = item.get('name', 'Unknown')
+                self.logger.info(f"🔄 Processing {i+1}/{total_count}: {name}")
+                
+                # Check if already enriched (has valid place_id)
+                if 'place_id' in item and item['place_id'] is not None and 'google_maps_url' in item:
+                    self.logger.info(f"⏭️ Already enriched, skipping")
+                    continue
                 
-                # Update coordinates if they changed significantly
-                threshold = self.config.get('coordinate_threshold', 0.0001)
-                if abs(result['lat'] - lat) > threshold or abs(result['lng'] - lng) > threshold:
-                    item['lat'] = result['lat']
-                    item['lng'] = result['lng']
-                    updated_coords_count += 1
-                    self.logger.info(f"🔄 Updated coordinates for {name}")
+                # Get coordinates
+                lat = item.get('lat')
+                lng = item.get('lng')
                 
-                enriched_count += 1
+                if lat is None or lng is None:
+                    self.logger.warning(f"⚠️ No coordinates found, skipping")
+                    skipped_count += 1
+                    continue
+                
+                # Check for custom place query in the JSON object
+                custom_query = item.get('place_query')
+                
+                # Find place ID and get updated coordinates
+                try:
+                    result = self.find_place_id(
+                        name, 
+                        lat, 
+                        lng, 
+                        location_context,
+                        state,
+                        is_city=is_city,
+                        custom_query=custom_query,
+                        fingerprint=record_fingerprint(item),
+                        address=item.get('address') or item.get('location'),
+                        review_key=review_key_for(file_path, item)
+                    )
+                except QuotaExceededError as e:
+                    self.logger.error(f"🛑 {e} - saving progress and stopping")
+                    self.quota_exhausted = True
+                    break
+                
+                if result:
+                    # Update with place ID and Google Maps URL
+                    item['place_id'] = result['place_id']
+                    item['google_maps_url'] = self.create_google_maps_url(result['place_id'])
+                
+                    # Update coordinates if they changed significantly
+                    threshold = self.config.get('coordinate_threshold', 0.0001)
+                    if abs(result['lat'] - lat) > threshold or abs(result['lng'] - lng) > threshold:
+                        item['lat'] = result['lat']
+                        item['lng'] = result['lng']
+                        updated_coords_count += 1
+                        self.logger.info(f"🔄 Updated coordinates for {name}")
+                
+                    enriched_count += 1
+                else:
+                    self.logger.error(f"❌ No place ID found for {name}")
+                    skipped_count += 1
             else:
-                self.logger.error(f"❌ No place ID found for {name}")
-                skipped_count += 1
-            
-            # Rate limiting
-            time.sleep(self.config.get('rate_limit_delay', 0.1))
+                completed = True
+        except KeyboardInterrupt:
+            self.logger.warning(f"⏸️ Interrupted - checkpointing {file_path} so the next run resumes at item {checkpoint.position + 1}")
+            checkpoint.finish(data, completed=False)
+            raise
         
-        # Save enriched data (only if not in dry run mode)
+        # Save enriched data (only if not in dry run mode); an early stop keeps the resume cursor
         if not self.dry_run:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            checkpoint.finish(data, completed=completed)
             self.logger.info(f"💾 Saved enriched data to {file_path}")
         
         # Update statistics
@@ -411,62 +482,88 @@ class EnhancedGoogleMapsEnricher:
         
         self.logger.info(f"📊 Processing {total_count} cities...")
         
-        for i, city in enumerate(cities):
-            name = city.get('name', 'Unknown')
-            self.logger.info(f"🔄 Processing {i+1}/{total_count}: {name}")
-            
-            # Check if already enriched (has valid place_id)
-            if 'place_id' in city and city['place_id'] is not None and 'google_maps_url' in city:
-                self.logger.info(f"⏭️ Already enriched, skipping")
-                continue
-            
-            # Get coordinates
-            coords = city.get('coordinates')
-            if not coords or len(coords) != 2:
-                self.logger.warning(f"⚠️ No valid coordinates found, skipping")
-                skipped_count += 1
-                continue
-            
-            lat, lng = coords
-            
-            # Check for custom place query in the city object
-            custom_query = city.get('place_query')
-            
-            # Find place ID with city-specific search
-            result = self.find_place_id(
-                name, 
-                lat, 
-                lng, 
-                "",  # No additional context for cities
-                "NY",
-                is_city=True,  # Use city-specific search
-                custom_query=custom_query
-            )
-            
-            if result:
-                # Update with place ID and Google Maps URL
-                city['place_id'] = result['place_id']
-                city['google_maps_url'] = self.create_google_maps_url(result['place_id'])
+        checkpoint = Checkpointer(
+            file_path,
+            every=self.config.get('checkpoint_every', 0),
+            interval=self.config.get('checkpoint_interval', 60),
+            enabled=not self.dry_run,
+        )
+        start = checkpoint.resume()
+        if start:
+            self.logger.info(f"⏩ Resuming at city {start + 1}/{total_count} from an interrupted run")
+        
+        completed = False
+        try:
+            for i, city in enumerate(cities):
+                if i < start:
+                    continue
+                if checkpoint.advance(i, data):
+                    self.logger.info(f"💾 Checkpoint saved after {i}/{total_count} cities")
+                
+                name = city.get('name', 'Unknown')
+                self.logger.info(f"🔄 Processing {i+1}/{total_count}: {name}")
+                
+                # Check if already enriched (has valid place_id)
+                if 'place_id' in city and city['place_id'] is not None and 'google_maps_url' in city:
+                    self.logger.info(f"⏭️ Already enriched, skipping")
+                    continue
+                
+                # Get coordinates
+                coords = city.get('coordinates')
+                if not coords or len(coords) != 2:
+                    self.logger.warning(f"⚠️ No valid coordinates found, skipping")
+                    skipped_count += 1
+                    continue
+                
+                lat, lng = coords
                 
-                # Update coordinates if they changed significantly
-                threshold = self.config.get('coordinate_threshold', 0.0001)
-                if abs(result['lat'] - lat) > threshold or abs(result['lng'] - lng) > threshold:
-                    city['coordinates'] = [result['lat'], result['lng']]
-                    updated_coords_count += 1
-                    self.logger.info(f"🔄 Updated coordinates for {name}")
+                # Check for custom place query in the city object
+                custom_query = city.get('place_query')
                 
-                enriched_count += 1
+                # Find place ID with city-specific search
+                try:
+                    result = self.find_place_id(
+                        name, 
+                        lat, 
+                        lng, 
+                        "",  # No additional context for cities
+                        "NY",
+                        is_city=True,  # Use city-specific search
+                        custom_query=custom_query,
+                        fingerprint=record_fingerprint(city),
+                        review_key=review_key_for(file_path, city)
+                    )
+                except QuotaExceededError as e:
+                    self.logger.error(f"🛑 {e} - saving progress and stopping")
+                    self.quota_exhausted = True
+                    break
+                
+                if result:
+                    # Update with place ID and Google Maps URL
+                    city['place_id'] = result['place_id']
+                    city['google_maps_url'] = self.create_google_maps_url(result['place_id'])
+                
+                    # Update coordinates if they changed significantly
+                    threshold = self.config.get('coordinate_threshold', 0.0001)
+                    if abs(result['lat'] - lat) > threshold or abs(result['lng'] - lng) > threshold:
+                        city['coordinates'] = [result['lat'], result['lng']]
+                        updated_coords_count += 1
+                        self.logger.info(f"🔄 Updated coordinates for {name}")
+                
+                    enriched_count += 1
+                else:
+                    self.logger.error(f"❌ No place ID found for {name}")
+                    skipped_count += 1
             else:
-                self.logger.error(f"❌ No place ID found for {name}")
-                skipped_count += 1
-            
-            # Rate limiting
-            time.sleep(self.config.get('rate_limit_delay', 0.1))
+                completed = True
+        except KeyboardInterrupt:
+            self.logger.warning(f"⏸️ Interrupted - checkpointing {file_path} so the next run resumes at city {checkpoint.position + 1}")
+            checkpoint.finish(data, completed=False)
+            raise
         
-        # Save enriched data (only if not in dry run mode)
+        # Save enriched data (only if not in dry run mode); an early stop keeps the resume cursor
         if not self.dry_run:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            checkpoint.finish(data, completed=completed)
             self.logger.info(f"💾 Saved enriched data to {file_path}")
         
         # Update statistics
@@ -479,6 +576,73 @@ class EnhancedGoogleMapsEnricher:
         self.logger.info(f"🔄 Updated coordinates for {updated_coords_count} cities")
         self.logger.warning(f"⚠️ Skipped {skipped_count} cities")
     
+    def targets(self):
+        """
+        (file path, search context, is_city) for every flat list dataset in the shared registry.
+        Cities are enriched separately; trailheads are nested by region and enriched by
+        assign_trailhead_place_ids.py.
+        """
+        return [(dataset.path(), dataset.record_type, False) for dataset in DATASETS if dataset.is_flat]
+    
+    def plan_find_place(self, plan, name, lat, lng, location_context="", state="NY", is_city=False, custom_query=None,
+                        address=None, fingerprint=None):
+        """Plan the requests find_place_id would make for one record, without sending them"""
+        params = self.text_search_params(name, lat, lng, location_context, state,
+                                         is_city=is_city, custom_query=custom_query)
+        # Same fingerprint as the live search, so an edited record's remembered miss is planned as a live call
+        data = plan.lookup('textsearch', params, fingerprint=fingerprint)
+        if data is None:
+            # Whether Details follows depends on a Text Search answer we do not have yet;
+            # in single-call mode it only does when that answer lacks a field, which is rare
+            if self.resolver.mode == 'details':
+                plan.conditional('details')
+            return
+        if data.get('status') == 'OK' and data.get('results'):
+            decision, _ = self.best_match(data['results'], lat, lng, is_city, name, location_context, address)
+            best_match = decision.best.result if decision.accepted else None
+            if best_match and best_match['place_id'] not in self.used_place_ids:
+                self.used_place_ids.add(best_match['place_id'])
+                if self.resolver.needs_details(best_match):
+                    plan.lookup('details', self.details_params(best_match['place_id']))
+    
+    def plan_records(self, plan, file_path, records, coordinates, location_context="", state="NY", is_city=False):
+        """Mirror of the enrichment loop: which records would search, from the resume cursor on"""
+        plan.start_dataset(Path(file_path).name)
+        start = Checkpointer(file_path, enabled=not self.dry_run).resume()
+        for i, item in enumerate(records):
+            if i < start or ('place_id' in item and item['place_id'] is not None and 'google_maps_url' in item):
+                plan.record(False)
+                continue
+            coords = coordinates(item)
+            if coords is None:
+                plan.record(False)
+                continue
+            plan.record(True)
+            self.plan_find_place(plan, item.get('name', 'Unknown'), coords[0], coords[1], location_context,
+                                 state, is_city=is_city, custom_query=item.get('place_query'),
+                                 address=item.get('address') or item.get('location'),
+                                 fingerprint=record_fingerprint(item))
+    
+    def plan_run(self):
+        """Work out the API calls, cost and time a full run would take, without calling the API"""
+        plan = CallPlan()
+        for file_path, context, is_city in self.targets():
+            if not file_path.exists():
+                continue
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, list):
+                self.plan_records(plan, file_path, data, item_coordinates, context, is_city=is_city)
+        
+        map_data_path = get_dataset("cities").path()
+        if map_data_path.exists():
+            with open(map_data_path, 'r', encoding='utf-8') as f:
+                cities = json.load(f).get('cities', [])
+            self.plan_records(plan, map_data_path, cities, city_coordinates, "", "NY", is_city=True)
+        
+        plan.report(self.logger.info)
+        return plan
+    
     def run(self):
         """
         Run the enhanced enrichment process for all datasets
@@ -494,27 +658,11 @@ class EnhancedGoogleMapsEnricher:
         self.logger.info("✅ Optimized API usage - more efficient API calls")
         self.logger.info("=" * 60)
         
-        # Define data directory
-        data_dir = Path(__file__).parent.parent.parent / "public" / "data"
-        
-        # Updated list of datasets to enrich (FIXED: includes all files that need enrichment)
-        datasets = [
-            ("waterfalls.json", "waterfall", False),
-            ("breweries.json", "brewery", False),
-            ("restaurants.json", "restaurant", False),
-            ("children.json", "activity", False),
-            ("trail-heads.json", "trailhead", False),
-            ("our-airbnbs.json", "accommodation", False),
-            ("points_of_interest.json", "attraction", False),
-            ("pyo_apples.json", "orchard", False),
-            ("pyo_strawberries.json", "orchard", False),
-            ("pyo_cherries.json", "orchard", False),
-            ("pyo_peaches.json", "orchard", False),
-        ]
-        
         # Enrich individual datasets
-        for filename, context, is_city in datasets:
-            file_path = data_dir / filename
+        for file_path, context, is_city in self.targets():
+            filename = file_path.name
+            if self.quota_exhausted:
+                break
             if file_path.exists():
                 try:
                     self.enrich_dataset(file_path, context, is_city=is_city)
@@ -525,8 +673,10 @@ class EnhancedGoogleMapsEnricher:
                 self.logger.warning(f"⚠️ File not found: {file_path}")
         
         # Enrich cities from map-data.json
-        map_data_path = data_dir / "map-data.json"
-        if map_data_path.exists():
+        map_data_path = get_dataset("cities").path()
+        if self.quota_exhausted:
+            self.logger.error("🛑 API quota used up - the remaining datasets resume on the next run")
+        elif map_data_path.exists():
             try:
                 self.enrich_cities_from_map_data(map_data_path)
             except Exception as e:
@@ -548,8 +698,15 @@ class EnhancedGoogleMapsEnricher:
         self.logger.info(f"⚠️ Skipped: {self.stats['skipped']}")
         self.logger.info(f"❌ Errors: {self.stats['errors']}")
         self.logger.info(f"🚫 Duplicates prevented: {self.stats['duplicates_prevented']}")
+        self.logger.info(f"🔎 Queued for review: {self.stats['queued_for_review']} (python shared/review_queue.py)")
         self.logger.info(f"🌐 API calls made: {self.stats['api_calls_made']}")
+        self.logger.info(f"♻️ Calls saved by coalescing: {get_coalescer().saved}")
+        self.logger.info(f"🐢 OVER_QUERY_LIMIT retries: {self.stats['over_query_limit']}")
+        self.logger.info(f"🎚️ Adaptive request rate: {format_rates()}")
         self.logger.info(f"🔑 Unique place IDs used: {len(self.used_place_ids)}")
+        self.logger.info(f"🧭 Place resolution: {self.resolver.summary()}")
+        for line in get_metrics().summary():
+            self.logger.info(f"⏱️ {line}")
         
         if self.dry_run:
             self.logger.info("\n🔍 DRY RUN COMPLETE - No changes were made")
@@ -567,17 +724,30 @@ def main():
     parser = argparse.ArgumentParser(description='Enhanced Google Maps Place ID Enrichment')
     parser.add_argument('--dry-run', action='store_true', 
                        help='Run in dry-run mode (no changes will be made)')
+    parser.add_argument('--plan', action='store_true',
+                       help='Only estimate the API calls, cost and time of a run (sends no requests)')
     parser.add_argument('--config', type=str, 
                        help='Path to configuration file')
+    parser.add_argument('--resolution', choices=RESOLUTION_MODES,
+                       help='single_call: take coordinates/name/address from Text Search, calling Details only '
+                            'for missing fields; details: always call Details (default: resolution_mode in config)')
+    add_base_url_argument(parser)
     
     args = parser.parse_args()
+    apply_base_url(args)
     
     try:
         enricher = EnhancedGoogleMapsEnricher(
             config_file=args.config, 
-            dry_run=args.dry_run
+            dry_run=args.dry_run,
+            resolution_mode=args.resolution
         )
-        enricher.run()
+        if args.plan:
+            enricher.plan_run()
+        else:
+            enricher.run()
+    except KeyboardInterrupt:
+        print("\n⏸️ Stopped - progress was checkpointed; run again to resume where it left off")
     except ValueError as e:
         print(f"❌ Error: {e}")
         print("\nPlease set your Google Maps API key:")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Refresh stale or obsolete place IDs across every dataset in public/data
+
+Picks the place IDs whose Details lookups have failed (remembered by the
+negative cache), that were never refreshed, or whose last refresh is older
+than max_age_days, and refreshes each once through the free ID-only requests
+(shared/place_id_refresh.py). Changed and replaced IDs are written back in
+bulk, one atomic write per file, so verification and status runs stop
+spending calls on dead IDs. Run it before refresh_place_snapshots.py.
+
+Usage:
+    python maintenance/refresh_place_ids.py --list               # count the IDs due, send nothing
+    python maintenance/refresh_place_ids.py --dry-run            # refresh, print the changes, write nothing
+    python maintenance/refresh_place_ids.py [--failed-only] [--limit N] [--clear-unresolved]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.loader import load_script_config
+from shared.datasets import DATA_DIR
+from shared.endpoints import add_base_url_argument, apply_base_url
+from shared.place_id_refresh import (DEFAULT_MAX_AGE_DAYS, REASONS, RefreshResult, apply_refresh,
+                                     collect_targets, refresh_place_id)
+from shared.places_client import AsyncPlacesClient
+from shared.rate_limiter import QuotaExceededError
+
+load_dotenv()
+
+CONFIG = load_script_config('maintenance', __file__)
+REFRESH_CONFIG = CONFIG.get("refresh_place_ids", {})
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Refresh stale or obsolete Google place IDs in bulk")
+    parser.add_argument('--data-dir', type=Path, default=DATA_DIR, help='Directory with the JSON datasets')
+    parser.add_argument('--max-age', type=float, default=REFRESH_CONFIG.get("max_age_days", DEFAULT_MAX_AGE_DAYS),
+                        help='Refresh IDs last refreshed more than this many days ago')
+    parser.add_argument('--failed-only', action='store_true',
+                        help='Only refresh IDs whose Details lookups returned NOT_FOUND/INVALID_REQUEST')
+    parser.add_argument('--limit', type=int, default=REFRESH_CONFIG.get("max_ids_per_run", 0),
+                        help='Refresh at most this many IDs, failed ones first (0 = no limit)')
+    parser.add_argument('--clear-unresolved', action='store_true',
+                        help='Clear IDs that are gone and could not be replaced, so enrichment re-matches them')
+    parser.add_argument('--list', action='store_true', help='Only count the IDs due for a refresh')
+    parser.add_argument('--dry-run', action='store_true', help='Refresh and print the changes without writing')
+    add_base_url_argument(parser)
+    return parser.parse_args()
+
+
+async def refresh(api_key: str, targets) -> RefreshResult:
+    concurrency = REFRESH_CONFIG.get("concurrency", 8)
+    qps = REFRESH_CONFIG.get("qps", 10)
+    timeout = REFRESH_CONFIG.get("timeout", 10)
+
+    # cache_ttl_days=0: the point is to ask Google what the ID is now, not what it was
+    async with AsyncPlacesClient(api_key, concurrency=concurrency, qps=qps, timeout=timeout,
+                                 cache_ttl_days=0) as client:
+        place_ids = list(targets)
+        answers = await asyncio.gather(
+            *(refresh_place_id(client, place_id, targets[place_id]) for place_id in place_ids),
+            return_exceptions=True,
+        )
+
+    result = RefreshResult()
+    for place_id, answer in zip(place_ids, answers):
+        if isinstance(answer, Exception):
+            result.add(place_id, "error", None)
+        else:
+            result.add(place_id, *answer)
+    if any(isinstance(answer, QuotaExceededError) for answer in answers):
+        print("🛑 Daily quota reached; the remaining IDs will be refreshed on the next run")
+    print(f"⏱️  {client.stats['requests']} ID-only requests in {client.elapsed:.1f}s "
+          f"({client.throughput():.1f} req/s, {client.stats['errors']} errors)")
+    return result
+
+
+def main():
+    args = parse_args()
+    apply_base_url(args)
+
+    targets = collect_targets(args.data_dir, args.max_age, failed_only=args.failed_only)
+    # Failed IDs cost every later run a call, so they go first when the run is limited
+    ordered = sorted(targets, key=lambda place_id: REASONS.index(targets[place_id]['reason']))
+    if args.limit:
+        ordered = ordered[:args.limit]
+    targets = {place_id: targets[place_id] for place_id in ordered}
+    by_reason = {reason: sum(1 for t in targets.values() if t['reason'] == reason) for reason in REASONS}
+    print(f"🪪 {len(targets)} place IDs due in {args.data_dir}: {by_reason['failed']} failing, "
+          f"{by_reason['unchecked']} never refreshed, {by_reason['stale']} older than {args.max_age:g} days")
+
+    if args.list or not targets:
+        return
+
+    api_key = os.getenv('GOOGLE_MAPS_API_KEY')
+    if not api_key:
+        print("❌ Error: GOOGLE_MAPS_API_KEY not found in environment variables")
+        sys.exit(1)
+
+    result = asyncio.run(refresh(api_key, targets))
+    apply_refresh(result, args.data_dir, dry_run=args.dry_run, clear_unresolved=args.clear_unresolved)
+
+    print(f"\n📊 {result.summary()}")
+    for path in result.files_written:
+        print(f"💾 Wrote {path}")
+    if args.dry_run:
+        print("🔍 DRY RUN - no files were changed")
+    unresolved = result.count("unresolved") + result.count("ambiguous")
+    if unresolved and not args.clear_unresolved:
+        print(f"⚠️  {unresolved} IDs are gone and could not be replaced; "
+              f"re-run with --clear-unresolved to hand them back to enrichment")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Refresh the shared place snapshots for every place_id in public/data
+
+Fetches Place Details once per place_id with the union field mask
+(geometry, name, formatted_address, business_status) and stores it in the
+shared response cache. verify_coordinates_google.py, check_restaurant_status.py
+and the enrichers then read those snapshots instead of calling Details
+themselves. Places whose snapshot is still within the TTL are skipped.
+
+Usage:
+    python maintenance/refresh_place_snapshots.py [--max-age DAYS] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.loader import load_script_config
+from shared.datasets import DATA_DIR
+from shared.endpoints import add_base_url_argument, apply_base_url
+from shared.place_snapshots import collect_place_ids, fetch_snapshot, read_snapshot
+from shared.places_cache import ttl_for
+from shared.places_client import AsyncPlacesClient
+from shared.rate_limiter import QuotaExceededError
+
+load_dotenv()
+
+CONFIG = load_script_config('maintenance', __file__)
+VERIFY_CONFIG = CONFIG.get("verify_coordinates", {})
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Refresh shared Place Details snapshots")
+    parser.add_argument('--data-dir', type=Path, default=DATA_DIR, help='Directory with the JSON datasets')
+    parser.add_argument('--max-age', type=float, default=None,
+                        help='Refresh snapshots older than this many days (default: response_cache details TTL)')
+    parser.add_argument('--dry-run', action='store_true', help='Only report how many snapshots are stale')
+    add_base_url_argument(parser)
+    return parser.parse_args()
+
+
+async def refresh(api_key: str, place_ids, max_age: float) -> None:
+    concurrency = VERIFY_CONFIG.get("concurrency", 8)
+    qps = VERIFY_CONFIG.get("qps", 10)
+    timeout = VERIFY_CONFIG.get("timeout", 10)
+
+    async with AsyncPlacesClient(api_key, concurrency=concurrency, qps=qps, timeout=timeout,
+                                 cache_ttl_days=max_age) as client:
+        results = await asyncio.gather(
+            *(fetch_snapshot(client, place_id) for place_id in place_ids),
+            return_exceptions=True,
+        )
+
+    failed = [pid for pid, r in zip(place_ids, results) if r is None or isinstance(r, Exception)]
+    if any(isinstance(r, QuotaExceededError) for r in results):
+        print("🛑 Daily quota reached; remaining snapshots will be refreshed on the next run")
+    print(f"✅ Refreshed {len(place_ids) - len(failed)} snapshots, {len(failed)} failed")
+    print(f"⏱️  {client.stats['requests']} Details requests in {client.elapsed:.1f}s "
+          f"({client.throughput():.1f} req/s, {client.stats['errors']} errors)")
+    adaptive = client.adaptive
+    print(f"🎚️  Concurrency settled at {int(adaptive['current'])}/{adaptive['maximum']} in flight "
+          f"({adaptive['decreases']} backoffs, {adaptive['increases']} increases)")
+
+
+def main():
+    args = parse_args()
+    apply_base_url(args)
+    max_age = ttl_for('details') if args.max_age is None else args.max_age
+
+    counts = collect_place_ids(args.data_dir)
+    stale = [pid for pid in counts if read_snapshot(pid, ttl_days=max_age) is None]
+    references = sum(counts.values())
+    print(f"📍 {len(counts)} unique place_ids ({references} references) in {args.data_dir}")
+    print(f"🕒 {len(stale)} snapshots missing or older than {max_age:g} days")
+
+    if args.dry_run or not stale:
+        return
+
+    api_key = os.getenv('GOOGLE_MAPS_API_KEY')
+    if not api_key:
+        print("❌ Error: GOOGLE_MAPS_API_KEY not found in environment variables")
+        sys.exit(1)
+
+    asyncio.run(refresh(api_key, stale, max_age))
+
+
+if __name__ == "__main__":
+    main()
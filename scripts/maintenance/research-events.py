@@ -3,7 +3,9 @@
 Weekly Upstate NY Events Crawler (family-forward, notable-only)
 
 - Deep-research via OpenAI Responses API with the web search tool
-- Scans each configured region for the next 3 months
+- Scans each configured region for the next 3 months, region x month jobs
+  running concurrently (bounded by research_events.concurrency, each call
+  capped at research_events.call_timeout seconds)
 - Deduplicates across runs
 - Maintains an annual-recurrence index for faster future updates
 - Persists a worklog to skip repeated effort
@@ -21,11 +23,11 @@ import datetime as dt
 import random
 import logging
 import argparse
+import asyncio
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 from dotenv import load_dotenv
-import requests
 from jsonschema import validate, ValidationError
 from dateutil.relativedelta import relativedelta
 
@@ -34,10 +36,14 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 # Import shared configuration loader
 from config.loader import load_script_config, setup_logging, validate_environment, get_api_key
+from shared.endpoints import add_base_url_argument, apply_base_url
+from shared.geocoding import get_geocoding_service
+from shared.metrics import get_metrics
+from shared.rate_limiter import QuotaExceededError
 
 # --- OpenAI Responses API (2025) ---
 # Docs: platform.openai.com/docs/api-reference/responses (see citations)
-from openai import OpenAI
+from openai import AsyncOpenAI
 from openai.types.responses import Response  # for typing
 
 # ------------------------------
@@ -121,9 +127,6 @@ REGIONS = [
 NOTABLE_ONLY = CONFIG["research_events"]["filters"]["notable_only"]
 FAMILY_WEIGHT = CONFIG["research_events"]["filters"]["family_weight"]
 
-# Geocoding
-GEOCODE_ENDPOINT = "https://maps.googleapis.com/maps/api/geocode/json"
-
 # Model to use (text+web). Mini is cheaper; swap to gpt-4o/gpt-5 if you want higher recall.
 OPENAI_MODEL = os.environ.get("OPENAI_MODEL", CONFIG["api"]["openai"]["default_model"])
 
@@ -137,12 +140,6 @@ def exponential_backoff(attempt: int, base_delay: float = 1.0, max_delay: float
     jitter = random.uniform(0.1, 0.3) * delay
     return delay + jitter
 
-def rate_limited_sleep(delay: float, reason: str = ""):
-    """Sleep with informative message"""
-    if reason:
-        logger.info(f"Rate limiting: {reason} - sleeping {delay:.1f}s")
-    time.sleep(delay)
-
 def validate_event(event: Dict[str, Any]) -> bool:
     """Validate an event against the schema"""
     try:
@@ -233,71 +230,37 @@ def looks_annual(e: Dict[str, Any]) -> bool:
     duration = (dt.date.fromisoformat(e["end_date"]) - dt.date.fromisoformat(e["start_date"])).days if e.get("start_date") and e.get("end_date") else 0
     return flags or duration >= 1
 
-def geocode_address(address: str, api_key: str) -> Optional[Dict[str, float]]:
-    if not address:
-        return None
-    
-    try:
-        params = {"address": address, "key": api_key}
-        timeout = CONFIG["api"]["google_maps"]["timeout"]
-        r = requests.get(GEOCODE_ENDPOINT, params=params, timeout=timeout)
-        
-        if r.status_code != 200:
-            logger.warning(f"Geocoding HTTP error {r.status_code} for address: {address}")
-            return None
-            
-        data = r.json()
-        
-        if data.get("status") == "REQUEST_DENIED":
-            logger.error(f"Geocoding denied for address: {address} - Check API key")
-            return None
-        elif data.get("status") == "ZERO_RESULTS":
-            logger.warning(f"No results found for address: {address}")
-            return None
-        elif data.get("status") != "OK" or not data.get("results"):
-            logger.warning(f"Geocoding failed with status '{data.get('status')}' for address: {address}")
-            return None
-            
-        loc = data["results"][0]["geometry"]["location"]
-        return {"lat": loc["lat"], "lng": loc["lng"]}
-        
-    except requests.exceptions.Timeout:
-        logger.warning(f"Geocoding timeout for address: {address}")
-        return None
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Geocoding request error for address {address}: {e}")
-        return None
-    except (KeyError, IndexError) as e:
-        logger.error(f"Unexpected geocoding response format for address {address}: {e}")
-        return None
-
 # ------------------------------
 # OpenAI “deep research” call
 # ------------------------------
 
-def openai_client() -> OpenAI:
-    """Create OpenAI client using centralized API key loading"""
+def openai_client() -> AsyncOpenAI:
+    """Create the async OpenAI client using centralized API key loading"""
     api_key = get_api_key('openai')
     if not api_key:
         raise ValueError("OpenAI API key not found")
-    return OpenAI(api_key=api_key)
+    return AsyncOpenAI(api_key=api_key)
 
 SEARCH_TOOL = {"type": "web_search_preview"}  # per docs; enables web search inside Responses API
 
-def research_events_for_window(
-    client: OpenAI,
+async def research_events_for_window(
+    client: AsyncOpenAI,
     region: Dict[str, Any],
     window: Dict[str, str],
     annual_index: Dict[str, Any],
     worklog: Dict[str, Any],
     max_retries: int = None,
-) -> List[Dict[str, Any]]:
+    timeout: float = None,
+) -> Optional[List[Dict[str, Any]]]:
     """
     Ask the model (with web search tool) to return notable, family-friendly events
     in a strict JSON schema, de-duplicated and with source URLs.
+    Each attempt is cancelled after ``timeout`` seconds; returns None when every attempt failed.
     """
     if max_retries is None:
         max_retries = CONFIG["api"]["openai"]["max_retries"]
+    if timeout is None:
+        timeout = CONFIG["research_events"].get("call_timeout", 180)
     
     region_name = region["region"]
     start, end = window["start"], window["end"]
@@ -369,26 +332,32 @@ Output must be ONLY valid JSON (no commentary), matching the provided schema exa
     # Call with web search tool + structured output with retry logic
     for attempt in range(max_retries):
         try:
-            resp: Response = client.responses.create(
-                model=OPENAI_MODEL,
-                tools=[SEARCH_TOOL],
-                # "input" is supported in Responses API; we also request tool + JSON schema
-                input=[
-                    {"role": "system", "content": system},
-                    {"role": "user", "content": user_prompt}
-                ],
-                response_format=schema,
-                temperature=0.2,  # keep it precise
-            )
+            with get_metrics().track("openai_responses"):
+                resp: Response = await asyncio.wait_for(client.responses.create(
+                    model=OPENAI_MODEL,
+                    tools=[SEARCH_TOOL],
+                    # "input" is supported in Responses API; we also request tool + JSON schema
+                    input=[
+                        {"role": "system", "content": system},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    response_format=schema,
+                    temperature=0.2,  # keep it precise
+                ), timeout=timeout)
             break  # Success, exit retry loop
         except Exception as e:
+            reason = f"timed out after {timeout:g}s" if isinstance(e, asyncio.TimeoutError) else str(e)
             if attempt < max_retries - 1:
                 delay = exponential_backoff(attempt, base_delay=2.0)
-                rate_limited_sleep(delay, f"OpenAI API error (attempt {attempt + 1}/{max_retries}): {e}")
+                logger.info(f"Rate limiting: OpenAI API error for {region_name} {start} "
+                            f"(attempt {attempt + 1}/{max_retries}): {reason} - sleeping {delay:.1f}s")
+                get_metrics().retry("openai_responses")
+                get_metrics().slept("openai_responses", delay, "backoff")
+                await asyncio.sleep(delay)
                 continue
             else:
-                logger.error(f"OpenAI API failed after {max_retries} attempts: {e}")
-                return []
+                logger.error(f"OpenAI API failed after {max_retries} attempts for {region_name} {start}: {reason}")
+                return None
 
     # The SDK exposes .output_text for text; for JSON schema, use .output or .parsed
     # Newer SDKs provide .output[0].content[0]....; guard for variations:
@@ -425,6 +394,54 @@ Output must be ONLY valid JSON (no commentary), matching the provided schema exa
 # Main workflow
 # ------------------------------
 
+def filter_notable(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Final local filter for "notable only" plus the NYC guard"""
+    filtered = []
+    for e in events:
+        # family-friendly flag is a boolean per schema
+        if NOTABLE_ONLY:
+            # Heuristic: require a legit website and multi-sourced citations or an official CVB
+            url_ok = e.get("website", "").startswith(("http://", "https://"))
+            srcs = e.get("sources", [])
+            is_official = any(("gov" in (s or "") or "chamber" in (s or "") or "tourism" in (s or "") or "visit" in (s or "")) for s in srcs)
+            if not url_ok:
+                continue
+            if len(srcs) == 0 and not is_official:
+                continue
+        # NYC guard (belt & suspenders)
+        if "new york, ny" in e.get("address", "").lower():
+            continue
+        filtered.append(e)
+    return filtered
+
+async def research_jobs(
+    jobs: List[Tuple[Dict[str, Any], Dict[str, str]]],
+    annuals: Dict[str, Any],
+    worklog: Dict[str, Any],
+) -> List[Optional[List[Dict[str, Any]]]]:
+    """
+    Run the region/window jobs concurrently, at most research_events.concurrency at a time.
+    Results come back in job order. Jobs only read ``annuals``/``worklog``; the caller updates them.
+    """
+    settings = CONFIG["research_events"]
+    semaphore = asyncio.Semaphore(settings.get("concurrency", 4))
+    client = openai_client()
+
+    async def run(region: Dict[str, Any], window: Dict[str, str]) -> Optional[List[Dict[str, Any]]]:
+        async with semaphore:
+            logger.info(f"Researching {region['region']} for {window['start']} to {window['end']}")
+            events = await research_events_for_window(client, region, window, annuals, worklog)
+            # Polite pacing with jitter before this slot takes the next job
+            delay = settings["sleep_between_regions"] * random.uniform(0.8, 1.5)
+            get_metrics().slept("openai_responses", delay, "rate_limit")
+            await asyncio.sleep(delay)
+            return events
+
+    try:
+        return await asyncio.gather(*(run(region, window) for region, window in jobs))
+    finally:
+        await client.close()
+
 def merge_and_dedupe(existing: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     seen = {stable_event_key(e) for e in existing}
     out = list(existing)
@@ -478,25 +495,27 @@ def record_work(worklog: Dict[str, Any], region_name: str, window: Dict[str, str
     }
 
 def geocode_events(events: List[Dict[str, Any]], gmaps_key: str) -> None:
-    for i, e in enumerate(events):
-        if "lat" in e and "lng" in e:
+    """
+    Geocode every event without coordinates in one batch through the shared geocoding service:
+    known venues come from the gazetteer, repeat addresses once from the cache, and the Google
+    lookups go out concurrently (paced by the shared rate limiter).
+    """
+    pending = [(e, (e.get("address") or e.get("location_name") or "", e.get("location_name")))
+               for e in events if not ("lat" in e and "lng" in e)]
+    if not pending:
+        return
+    try:
+        results = asyncio.run(get_geocoding_service(api_key=gmaps_key).ageocode_many(item for _, item in pending))
+    except QuotaExceededError as ex:
+        logger.error(f"{ex} - leaving events without coordinates")
+        return
+    for e, item in pending:
+        result = results.get(item)
+        if result is None:
+            logger.warning(f"No geocoding result for address: {item[0]}")
             continue
-        addr = e.get("address") or e.get("location_name")
-        coords = geocode_address(addr, gmaps_key)
-        if coords:
-            e["lat"] = coords["lat"]
-            e["lng"] = coords["lng"]
-        
-        # Progressive rate limiting - longer delays as we process more
-        base_delay = CONFIG["api"]["google_maps"]["rate_limit_delay"]
-        if i > 10:
-            base_delay = 0.5  # Fallback value
-        elif i > 5:
-            base_delay = 0.3  # Fallback value
-        
-        # Add jitter to avoid thundering herd
-        jitter = random.uniform(0.8, 1.2)
-        time.sleep(base_delay * jitter)
+        e["lat"] = result.lat
+        e["lng"] = result.lng
 
 def validate_environment():
     """Validate required environment variables"""
@@ -583,11 +602,13 @@ Examples:
         choices=[r["region"] for r in REGIONS],
         help="Research only a specific region"
     )
+    add_base_url_argument(parser)
     
     return parser.parse_args()
 
 def main():
     args = parse_arguments()
+    apply_base_url(args)
     
     # Adjust logging level
     if args.verbose:
@@ -619,7 +640,6 @@ def main():
         global REGIONS
         REGIONS = [r for r in REGIONS if r["region"] == args.region]
 
-    client = openai_client()
     annuals = load_json(ANNUALS_FILE, {})
     worklog = load_json(WORKLOG_FILE, {})
     existing_events = load_json(EVENTS_OUT, [])
@@ -629,8 +649,8 @@ def main():
 
     all_new: List[Dict[str, Any]] = []
 
+    jobs = []
     for region in REGIONS:
-        logger.info(f"Processing region: {region['region']}")
         for w in windows:
             # Skip if we already researched this region/window recently (unless --force)
             run_key = f"{region['region']}:{w['start']}:{w['end']}"
@@ -638,47 +658,37 @@ def main():
                 # Already done; skip rework
                 logger.debug(f"Skipping {run_key} - already processed")
                 continue
+            jobs.append((region, w))
+
+    # Research every job concurrently; results come back in job order
+    started = time.monotonic()
+    results = asyncio.run(research_jobs(jobs, annuals, worklog)) if jobs else []
+    logger.info(f"Researched {len(jobs)} region/window jobs in {time.monotonic() - started:.0f}s")
+
+    # Apply the results one at a time, in region/window order, so the annual index,
+    # worklog and event order are the same however the calls finished
+    for (region, w), events in zip(jobs, results):
+        if events is None:
+            # Left out of the worklog so the next run tries this window again
+            logger.warning(f"No answer for {region['region']} ({w['start']} to {w['end']}); will retry next run")
+            continue
+
+        # Validate events
+        events = validate_events(events)
+        logger.info(f"After validation: {len(events)} valid events")
+
+        # Apply a final local filter for "notable only" if desired
+        filtered = filter_notable(events)
+
+        # Update annual index
+        update_annuals(annuals, region["region"], filtered)
+
+        # Collect
+        all_new.extend(filtered)
+        logger.info(f"Found {len(filtered)} events for {region['region']} ({w['start']} to {w['end']})")
 
-            # Research
-            logger.info(f"Researching {region['region']} for {w['start']} to {w['end']}")
-            events = research_events_for_window(client, region, w, annuals, worklog)
-            
-            # Validate events
-            events = validate_events(events)
-            logger.info(f"After validation: {len(events)} valid events")
-
-            # Apply a final local filter for "notable only" if desired
-            filtered = []
-            for e in events:
-                # family-friendly flag is a boolean per schema
-                if NOTABLE_ONLY:
-                    # Heuristic: require a legit website and multi-sourced citations or an official CVB
-                    url_ok = e.get("website", "").startswith(("http://", "https://"))
-                    srcs = e.get("sources", [])
-                    is_official = any(("gov" in (s or "") or "chamber" in (s or "") or "tourism" in (s or "") or "visit" in (s or "")) for s in srcs)
-                    if not url_ok:
-                        continue
-                    if len(srcs) == 0 and not is_official:
-                        continue
-                # NYC guard (belt & suspenders)
-                if "new york, ny" in e.get("address", "").lower():
-                    continue
-                filtered.append(e)
-
-            # Update annual index
-            update_annuals(annuals, region["region"], filtered)
-
-            # Collect
-            all_new.extend(filtered)
-            logger.info(f"Found {len(filtered)} events for {region['region']} ({w['start']} to {w['end']})")
-
-            # Worklog
-            record_work(worklog, region["region"], w, len(filtered))
-
-            # Polite pacing with jitter
-            jitter = random.uniform(0.8, 1.5)
-            sleep_delay = CONFIG["research_events"]["sleep_between_regions"] * jitter
-            rate_limited_sleep(sleep_delay, f"Between regions ({region['region']})")
+        # Worklog
+        record_work(worklog, region["region"], w, len(filtered))
 
     # Merge + dedupe with existing
     merged = merge_and_dedupe(existing_events, all_new)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tag every record in public/data with its region and scenic areas, offline
+
+Tests the coordinates of every record of every registered dataset against
+the REDC region polygons and the map-data.json scenicAreas outlines in one
+batch (shared/region_tagger.py). Writes ``region_id`` and ``scenic_area_ids``
+back with one atomic write per changed file, and prints how many waterfalls,
+trailheads, breweries and so on fall in each polygon. Needs no API key;
+install shapely for the STRtree backend, otherwise NumPy does the same work.
+
+Usage:
+    python maintenance/tag_regions.py                      # tag and print the per-polygon counts
+    python maintenance/tag_regions.py --dry-run            # count only, write nothing
+    python maintenance/tag_regions.py --report counts.json # also save the counts as JSON
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.loader import load_script_config
+from shared.checkpoint import atomic_write_json
+from shared.datasets import DATA_DIR, DATASETS
+from shared.region_tagger import KINDS, REGIONS_FILE, tag_records
+
+CONFIG = load_script_config('maintenance', __file__)
+TAG_CONFIG = CONFIG.get("tag_regions", {})
+
+KIND_TITLES = {"region": "Regions", "scenic_area": "Scenic areas"}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Tag records with their region and scenic areas")
+    parser.add_argument('--data-dir', type=Path, default=DATA_DIR, help='Directory with the JSON datasets')
+    parser.add_argument('--regions-file', default=TAG_CONFIG.get("regions_file", REGIONS_FILE),
+                        help='Region polygons (GeoJSON) inside the data directory')
+    parser.add_argument('--report', type=Path, help='Write the per-polygon counts to this JSON file')
+    parser.add_argument('--dry-run', action='store_true', help='Count without writing any tags')
+    return parser.parse_args()
+
+
+def print_counts(result) -> None:
+    record_types = list(dict.fromkeys(dataset.record_type for dataset in DATASETS))
+    for kind in KINDS:
+        print(f"\n🗺️  {KIND_TITLES[kind]}")
+        for area in result.areas[kind]:
+            counts = result.counts[kind][area.id]
+            detail = ", ".join(f"{counts[t]} {t}" for t in record_types if counts.get(t))
+            print(f"  {area.name:<45} {sum(counts.values()):>4}  {detail}")
+    if result.untagged:
+        outside = ", ".join(f"{count} {t}" for t, count in sorted(result.untagged.items()))
+        print(f"\n⚠️  Outside every region: {outside}")
+
+
+def main():
+    args = parse_args()
+    started = time.perf_counter()
+    result = tag_records(args.data_dir, args.regions_file, dry_run=args.dry_run)
+    elapsed = time.perf_counter() - started
+
+    print_counts(result)
+    print(f"\n📊 {result.tagged} records in a region, {result.records_updated} records updated, "
+          f"{len(result.files_written)} files written ({result.backend}, {elapsed:.2f}s)")
+    for path in result.files_written:
+        print(f"💾 Wrote {path}")
+    if args.report:
+        atomic_write_json(args.report, result.to_dict())
+        print(f"📄 Counts saved to: {args.report}")
+    if args.dry_run:
+        print("🔍 DRY RUN - no files were changed")
+
+
+if __name__ == "__main__":
+    main()
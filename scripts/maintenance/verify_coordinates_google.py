@@ -2,345 +2,180 @@
 """
 Script to verify GPS coordinates in the scenic NY map datasets
 using Google Places API with existing place IDs.
+
+Runs incrementally by default: records whose lat/lng/place_id are unchanged
+since their last verification, and which were verified within the TTL, are
+skipped. Changed records are checked first, then records whose last check
+found a discrepancy that has not been corrected yet, then never-verified
+records, then the oldest verifications.
+
+Usage:
+    python maintenance/verify_coordinates_google.py [--full] [--ttl DAYS] [--limit N]
 """
 
+import argparse
+import asyncio
 import json
-import requests
-import time
 import os
-from typing import Dict, List, Tuple, Optional
+import sys
+from itertools import groupby
+from typing import Dict, Iterable, List, Tuple, Optional
 from dotenv import load_dotenv
 
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.loader import load_script_config
+from shared.corrections import correction_from_discrepancy, write_patch
+from shared.datasets import Dataset, RecordHandle, verifiable_datasets, walk_records
+from shared.endpoints import add_base_url_argument, apply_base_url
+from shared.geodesy import distance_m, haversine_m
+from shared.place_snapshots import fetch_snapshot
+from shared.places_client import AsyncPlacesClient
+from shared.verification_ledger import CHANGED, DISCREPANT, EXPIRED, FRESH, NEW, PRIORITY, VerificationLedger
+
 # Load environment variables
 load_dotenv()
 
 # Configuration
 GOOGLE_PLACES_API_KEY = os.getenv('GOOGLE_MAPS_API_KEY')
-GOOGLE_PLACES_BASE_URL = "https://maps.googleapis.com/maps/api/place/details/json"
-REQUEST_DELAY = 0.1  # Shorter delay since we're using place IDs (more reliable)
+CONFIG = load_script_config('maintenance', __file__)
+VERIFY_CONFIG = CONFIG.get("verify_coordinates", {})
+PATCH_FILE = 'coordinate_corrections.json'
 
-def load_json_file(filepath: str) -> Dict:
-    """Load JSON data from file."""
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading {filepath}: {e}")
-        return {}
-
-def get_place_details(place_id: str) -> Optional[Tuple[float, float]]:
+async def get_place_details(client: AsyncPlacesClient, place_id: str) -> Optional[Tuple[float, float]]:
     """
-    Get place details from Google Places API using place ID.
+    Get the place's coordinates from its shared snapshot (fetched with the
+    union Details field mask when no fresh snapshot is stored).
     Returns (lat, lng) tuple or None if not found.
     """
-    if not GOOGLE_PLACES_API_KEY:
-        print("❌ Google Maps API key not found in environment variables")
-        return None
-    
     try:
-        params = {
-            'place_id': place_id,
-            'fields': 'geometry,name,formatted_address',
-            'key': GOOGLE_PLACES_API_KEY
-        }
-        
-        response = requests.get(GOOGLE_PLACES_BASE_URL, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        if data.get('status') == 'OK' and 'result' in data:
-            result = data['result']
-            geometry = result.get('geometry', {})
-            location = geometry.get('location', {})
-            
-            if 'lat' in location and 'lng' in location:
-                lat = float(location['lat'])
-                lng = float(location['lng'])
-                return (lat, lng)
-        
-        print(f"⚠️  API returned status: {data.get('status', 'UNKNOWN')}")
+        snapshot = await fetch_snapshot(client, place_id)
+        if snapshot and snapshot['lat'] is not None and snapshot['lng'] is not None:
+            return (float(snapshot['lat']), float(snapshot['lng']))
         return None
-        
+
     except Exception as e:
         print(f"Error getting place details for {place_id}: {e}")
         return None
 
-def calculate_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+def plan_dataset(ledger: VerificationLedger, dataset: Dataset, handles: Iterable[RecordHandle],
+                 ttl_days: float) -> Tuple[List[str], List[Dict]]:
     """
-    Calculate distance between two points using Haversine formula.
-    Returns distance in meters.
+    Classify every verifiable record against the verification ledger.
+    Returns (notes about unverifiable records, candidates in dataset order).
     """
-    import math
-    
-    R = 6371000  # Earth's radius in meters
-    
-    lat1_rad = math.radians(lat1)
-    lat2_rad = math.radians(lat2)
-    delta_lat = math.radians(lat2 - lat1)
-    delta_lng = math.radians(lng2 - lng1)
-    
-    a = (math.sin(delta_lat / 2) ** 2 + 
-         math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lng / 2) ** 2)
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    
-    return R * c
+    notes = []
+    candidates = []
+    for handle in handles:
+        name = handle.name
+        current_lat, current_lng = handle.lat, handle.lng
 
-def verify_waterfalls():
-    """Verify waterfall coordinates using Google Places API."""
-    print("=== Verifying Waterfalls ===")
-    data = load_json_file('../public/data/waterfalls.json')
-    
-    discrepancies = []
-    verified_count = 0
-    
-    for i, waterfall in enumerate(data):
-        name = waterfall.get('name', f'Waterfall {i}')
-        place_id = waterfall.get('place_id')
-        current_lat = waterfall.get('lat')
-        current_lng = waterfall.get('lng')
-        
         if current_lat is None or current_lng is None:
-            print(f"⚠️  {name}: Missing coordinates")
-            continue
-        
-        if not place_id:
-            print(f"❓ {name}: No place ID available")
+            notes.append(f"⚠️  {name}: Missing coordinates")
             continue
-        
-        # Get coordinates from Google Places API
-        google_coords = get_place_details(place_id)
-        
-        if google_coords:
-            google_lat, google_lng = google_coords
-            distance = calculate_distance(current_lat, current_lng, google_lat, google_lng)
-            verified_count += 1
-            
-            if distance > 100:  # More than 100m difference
-                discrepancies.append({
-                    'name': name,
-                    'type': 'waterfall',
-                    'place_id': place_id,
-                    'current': (current_lat, current_lng),
-                    'google': (google_lat, google_lng),
-                    'distance_m': distance
-                })
-                print(f"❌ {name}: {distance:.0f}m difference")
-            else:
-                print(f"✅ {name}: {distance:.0f}m difference (OK)")
-        else:
-            print(f"❓ {name}: Could not verify with Google Places API")
-        
-        time.sleep(REQUEST_DELAY)
-    
-    print(f"Verified {verified_count}/{len(data)} waterfalls")
-    return discrepancies
 
-def verify_breweries():
-    """Verify brewery coordinates using Google Places API."""
-    print("\n=== Verifying Breweries ===")
-    data = load_json_file('../public/data/breweries.json')
-    
-    discrepancies = []
-    verified_count = 0
-    
-    for i, brewery in enumerate(data):
-        name = brewery.get('name', f'Brewery {i}')
-        place_id = brewery.get('place_id')
-        current_lat = brewery.get('lat')
-        current_lng = brewery.get('lng')
-        
-        if current_lat is None or current_lng is None:
-            print(f"⚠️  {name}: Missing coordinates")
-            continue
-        
+        place_id = handle.get('place_id')
         if not place_id:
-            print(f"❓ {name}: No place ID available")
+            notes.append(f"❓ {name}: No place ID available")
             continue
-        
-        # Get coordinates from Google Places API
-        google_coords = get_place_details(place_id)
-        
-        if google_coords:
-            google_lat, google_lng = google_coords
-            distance = calculate_distance(current_lat, current_lng, google_lat, google_lng)
-            verified_count += 1
-            
-            if distance > 100:  # More than 100m difference
-                discrepancies.append({
-                    'name': name,
-                    'type': 'brewery',
-                    'place_id': place_id,
-                    'current': (current_lat, current_lng),
-                    'google': (google_lat, google_lng),
-                    'distance_m': distance
-                })
-                print(f"❌ {name}: {distance:.0f}m difference")
-            else:
-                print(f"✅ {name}: {distance:.0f}m difference (OK)")
-        else:
-            print(f"❓ {name}: Could not verify with Google Places API")
-        
-        time.sleep(REQUEST_DELAY)
-    
-    print(f"Verified {verified_count}/{len(data)} breweries")
-    return discrepancies
 
-def verify_restaurants():
-    """Verify restaurant coordinates using Google Places API."""
-    print("\n=== Verifying Restaurants ===")
-    data = load_json_file('../public/data/restaurants.json')
-    
-    discrepancies = []
-    verified_count = 0
-    
-    for i, restaurant in enumerate(data):
-        name = restaurant.get('name', f'Restaurant {i}')
-        place_id = restaurant.get('place_id')
-        current_lat = restaurant.get('lat')
-        current_lng = restaurant.get('lng')
-        
-        if current_lat is None or current_lng is None:
-            print(f"⚠️  {name}: Missing coordinates")
-            continue
-        
-        if not place_id:
-            print(f"❓ {name}: No place ID available")
-            continue
-        
-        # Get coordinates from Google Places API
-        google_coords = get_place_details(place_id)
-        
-        if google_coords:
-            google_lat, google_lng = google_coords
-            distance = calculate_distance(current_lat, current_lng, google_lat, google_lng)
-            verified_count += 1
-            
-            if distance > 100:  # More than 100m difference
-                discrepancies.append({
-                    'name': name,
-                    'type': 'restaurant',
-                    'place_id': place_id,
-                    'current': (current_lat, current_lng),
-                    'google': (google_lat, google_lng),
-                    'distance_m': distance
-                })
-                print(f"❌ {name}: {distance:.0f}m difference")
-            else:
-                print(f"✅ {name}: {distance:.0f}m difference (OK)")
-        else:
-            print(f"❓ {name}: Could not verify with Google Places API")
-        
-        time.sleep(REQUEST_DELAY)
-    
-    print(f"Verified {verified_count}/{len(data)} restaurants")
-    return discrepancies
+        # Cities keep [lat, lng] under "coordinates"; the ledger expects lat/lng fields
+        record = dict(handle.record, lat=current_lat, lng=current_lng)
+        status, verified_at = ledger.classify(handle.key, record, ttl_days,
+                                              dataset.verify_threshold_m, haversine_m)
+        candidates.append({
+            'type': dataset.record_type,
+            'dataset': dataset.name,
+            'key': handle.key,
+            'name': name,
+            'place_id': place_id,
+            'lat': current_lat,
+            'lng': current_lng,
+            'status': status,
+            'verified_at': verified_at,
+        })
+    return notes, candidates
 
-def verify_orchards():
-    """Verify orchard coordinates using Google Places API."""
-    print("\n=== Verifying Orchards ===")
-    data = load_json_file('../public/data/orchards_points.json')
-    
-    discrepancies = []
-    verified_count = 0
-    
-    for i, orchard in enumerate(data):
-        name = orchard.get('name', f'Orchard {i}')
-        place_id = orchard.get('place_id')
-        current_lat = orchard.get('lat')
-        current_lng = orchard.get('lng')
-        
-        if current_lat is None or current_lng is None:
-            print(f"⚠️  {name}: Missing coordinates")
-            continue
-        
-        if not place_id:
-            print(f"❓ {name}: No place ID available")
-            continue
-        
-        # Get coordinates from Google Places API
-        google_coords = get_place_details(place_id)
-        
-        if google_coords:
-            google_lat, google_lng = google_coords
-            distance = calculate_distance(current_lat, current_lng, google_lat, google_lng)
-            verified_count += 1
-            
-            if distance > 100:  # More than 100m difference
-                discrepancies.append({
-                    'name': name,
-                    'type': 'orchard',
-                    'place_id': place_id,
-                    'current': (current_lat, current_lng),
-                    'google': (google_lat, google_lng),
-                    'distance_m': distance
-                })
-                print(f"❌ {name}: {distance:.0f}m difference")
-            else:
-                print(f"✅ {name}: {distance:.0f}m difference (OK)")
-        else:
-            print(f"❓ {name}: Could not verify with Google Places API")
-        
-        time.sleep(REQUEST_DELAY)
-    
-    print(f"Verified {verified_count}/{len(data)} orchards")
-    return discrepancies
+def select_due(candidates: List[Dict], full: bool, limit: int) -> List[Dict]:
+    """
+    Pick the records to check this run: changed records first, then uncorrected discrepancies,
+    never-verified ones, then the oldest verifications. Fresh, unchanged records are skipped unless ``full``.
+    """
+    due = candidates if full else [c for c in candidates if c['status'] != FRESH]
+    due = sorted(due, key=lambda c: (PRIORITY[c['status']], c['verified_at']))
+    return due[:limit] if limit else due
+
+def report_dataset(ledger: VerificationLedger, plural: str, total: int, notes: List[str],
+                   candidates: List[Dict], results: Dict[int, Optional[Tuple[float, float]]],
+                   threshold_m: float, ttl_days: float) -> List[Dict]:
+    """Print one dataset's results in dataset order and record successful verifications."""
+    for note in notes:
+        print(note)
 
-def verify_cities():
-    """Verify city coordinates using Google Places API."""
-    print("\n=== Verifying Cities ===")
-    data = load_json_file('../public/data/map-data.json')
-    cities = data.get('cities', [])
-    
     discrepancies = []
     verified_count = 0
-    
-    for i, city in enumerate(cities):
-        name = city.get('name', f'City {i}')
-        place_id = city.get('place_id')
-        current_lat = city.get('lat')
-        current_lng = city.get('lng')
-        
-        if current_lat is None or current_lng is None:
-            print(f"⚠️  {name}: Missing coordinates")
+    fresh_count = 0
+    deferred_count = 0
+
+    # Stored vs Google distances for every verified record in one vectorized call
+    verified = [c for c in candidates if results.get(id(c))]
+    distances = distance_m([c['lat'] for c in verified], [c['lng'] for c in verified],
+                           [results[id(c)][0] for c in verified], [results[id(c)][1] for c in verified])
+    distance_by_id = {id(c): float(d) for c, d in zip(verified, distances)}
+
+    for candidate in candidates:
+        if id(candidate) not in results:
+            if candidate['status'] == FRESH:
+                fresh_count += 1
+            else:
+                deferred_count += 1
             continue
-        
-        if not place_id:
-            print(f"❓ {name}: No place ID available")
+
+        name = candidate['name']
+        google_coords = results[id(candidate)]
+        if not google_coords:
+            print(f"❓ {name}: Could not verify with Google Places API")
             continue
-        
-        # Get coordinates from Google Places API
-        google_coords = get_place_details(place_id)
-        
-        if google_coords:
-            google_lat, google_lng = google_coords
-            distance = calculate_distance(current_lat, current_lng, google_lat, google_lng)
-            verified_count += 1
-            
-            if distance > 1000:  # More than 1km difference (cities can be large)
-                discrepancies.append({
-                    'name': name,
-                    'type': 'city',
-                    'place_id': place_id,
-                    'current': (current_lat, current_lng),
-                    'google': (google_lat, google_lng),
-                    'distance_m': distance
-                })
-                print(f"❌ {name}: {distance:.0f}m difference")
-            else:
-                print(f"✅ {name}: {distance:.0f}m difference (OK)")
+
+        current_lat, current_lng = candidate['lat'], candidate['lng']
+        google_lat, google_lng = google_coords
+        distance = distance_by_id[id(candidate)]
+        verified_count += 1
+        # A discrepancy keeps the record due until its correction is applied
+        ledger.record(candidate['key'], candidate['type'], candidate['place_id'], current_lat, current_lng,
+                      google_lat, google_lng, distance, discrepant=distance > threshold_m)
+
+        changed = " [changed]" if candidate['status'] == CHANGED else ""
+        if distance > threshold_m:
+            discrepancies.append({
+                'name': name,
+                'type': candidate['type'],
+                'dataset': candidate['dataset'],
+                'key': candidate['key'],
+                'place_id': candidate['place_id'],
+                'current': (current_lat, current_lng),
+                'google': (google_lat, google_lng),
+                'distance_m': distance
+            })
+            print(f"❌ {name}: {distance:.0f}m difference{changed}")
         else:
-            print(f"❓ {name}: Could not verify with Google Places API")
-        
-        time.sleep(REQUEST_DELAY)
-    
-    print(f"Verified {verified_count}/{len(cities)} cities")
+            print(f"✅ {name}: {distance:.0f}m difference (OK){changed}")
+
+    print(f"Verified {verified_count}/{total} {plural}")
+    if fresh_count:
+        print(f"⏭️  Skipped {fresh_count} unchanged {plural} verified within {ttl_days:g} days")
+    if deferred_count:
+        print(f"⏳ {deferred_count} {plural} queued for a later run (per-run limit reached)")
     return discrepancies
 
-def generate_correction_script(discrepancies: List[Dict]):
-    """Generate a Python script to automatically correct the coordinates."""
+def write_corrections(discrepancies: List[Dict], verified_count: int):
+    """Summarize the discrepancies and write them as a correction patch plus a report."""
     if not discrepancies:
-        print("\n🎉 All coordinates verified successfully!")
+        if verified_count:
+            print(f"\n🎉 All {verified_count} checked coordinates verified successfully!")
+        else:
+            print("\n💤 Nothing was due for verification this run")
         return
     
     print(f"\n📊 SUMMARY: Found {len(discrepancies)} coordinate discrepancies")
@@ -361,93 +196,11 @@ def generate_correction_script(discrepancies: List[Dict]):
             print(f"    Current: {item['current'][0]:.6f}, {item['current'][1]:.6f}")
             print(f"    Google: {item['google'][0]:.6f}, {item['google'][1]:.6f}")
     
-    # Generate correction script
-    correction_script = """#!/usr/bin/env python3
-'''
-Auto-generated script to correct GPS coordinates based on Google Places API verification.
-Run this script to automatically update the coordinates in your JSON files.
-'''
-
-import json
-
-def update_coordinates():
-    corrections = [
-"""
-    
-    for disc in discrepancies:
-        # Escape single quotes in names
-        escaped_name = disc['name'].replace("'", "\\'")
-        correction_script += f"""        {{
-            'type': '{disc['type']}',
-            'name': '{escaped_name}',
-            'place_id': '{disc['place_id']}',
-            'old_lat': {disc['current'][0]},
-            'old_lng': {disc['current'][1]},
-            'new_lat': {disc['google'][0]},
-            'new_lng': {disc['google'][1]},
-            'distance_m': {disc['distance_m']:.0f}
-        }},
-"""
-    
-    correction_script += """    ]
-    
-    # Apply corrections
-    for correction in corrections:
-        print(f"Updating {correction['name']} ({correction['type']})...")
-        
-        if correction['type'] == 'waterfall':
-            filepath = '../public/data/waterfalls.json'
-        elif correction['type'] == 'brewery':
-            filepath = '../public/data/breweries.json'
-        elif correction['type'] == 'restaurant':
-            filepath = '../public/data/restaurants.json'
-        elif correction['type'] == 'orchard':
-            filepath = '../public/data/orchards_points.json'
-        elif correction['type'] == 'city':
-            filepath = '../public/data/map-data.json'
-        else:
-            continue
-        
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            if correction['type'] == 'city':
-                # Cities are in a nested structure
-                cities = data.get('cities', [])
-                for city in cities:
-                    if city.get('name') == correction['name']:
-                        city['lat'] = correction['new_lat']
-                        city['lng'] = correction['new_lng']
-                        print(f"  Updated {correction['name']}: {correction['old_lat']:.6f},{correction['old_lng']:.6f} -> {correction['new_lat']:.6f},{correction['new_lng']:.6f}")
-                        break
-            else:
-                # Other types are direct arrays
-                for item in data:
-                    if item.get('name') == correction['name']:
-                        item['lat'] = correction['new_lat']
-                        item['lng'] = correction['new_lng']
-                        print(f"  Updated {correction['name']}: {correction['old_lat']:.6f},{correction['old_lng']:.6f} -> {correction['new_lat']:.6f},{correction['new_lng']:.6f}")
-                        break
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                
-        except Exception as e:
-            print(f"  Error updating {correction['name']}: {e}")
-    
-    print(f"\\n✅ Applied {len(corrections)} coordinate corrections")
-
-if __name__ == "__main__":
-    update_coordinates()
-"""
+    # Write the corrections as a data patch, applied in one pass per file by apply_coordinate_corrections.py
+    write_patch(PATCH_FILE, [correction_from_discrepancy(disc) for disc in discrepancies])
     
-    # Save correction script
-    with open('apply_coordinate_corrections.py', 'w', encoding='utf-8') as f:
-        f.write(correction_script)
-    
-    print(f"\n🔧 Generated correction script: apply_coordinate_corrections.py")
-    print("   Run this script to automatically apply all coordinate corrections")
+    print(f"\n🔧 Wrote correction patch: {PATCH_FILE}")
+    print(f"   Review it with: python maintenance/apply_coordinate_corrections.py {PATCH_FILE} --dry-run")
     
     # Save detailed report
     report_file = 'google_coordinate_verification_report.json'
@@ -455,8 +208,22 @@ if __name__ == "__main__":
         json.dump(discrepancies, f, indent=2, ensure_ascii=False)
     print(f"📄 Detailed report saved to: {report_file}")
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Verify dataset coordinates against Google Places")
+    parser.add_argument('--full', action='store_true',
+                        help='Re-verify every record, ignoring the verification ledger')
+    parser.add_argument('--ttl', type=float, default=VERIFY_CONFIG.get("reverify_ttl_days", 30),
+                        help='Skip unchanged records verified within this many days')
+    parser.add_argument('--limit', type=int, default=VERIFY_CONFIG.get("max_checks_per_run", 0),
+                        help='Check at most this many records, highest priority first (0 = no limit)')
+    add_base_url_argument(parser)
+    return parser.parse_args()
+
 def main():
     """Main function to run coordinate verification."""
+    args = parse_args()
+    apply_base_url(args)
+
     print("🗺️  Scenic NY Map - Google Places Coordinate Verification")
     print("=" * 60)
     print("Cross-referencing coordinates with Google Places API using place IDs")
@@ -468,17 +235,66 @@ def main():
         print("   Please make sure your .env file contains: GOOGLE_MAPS_API_KEY=your_api_key_here")
         return
     
+    asyncio.run(run_verification(args))
+
+async def run_verification(args: argparse.Namespace):
+    """Plan the incremental run, then verify every due record through one pooled Places client."""
+    concurrency = VERIFY_CONFIG.get("concurrency", 8)
+    qps = VERIFY_CONFIG.get("qps", 10)
+    timeout = VERIFY_CONFIG.get("timeout", 10)
+    # A verification must not be answered by a month-old cached Details response; --full always asks Google
+    response_ttl = 0 if args.full else VERIFY_CONFIG.get("response_ttl_days", 1)
+    mode = "full" if args.full else f"incremental (TTL {args.ttl:g} days)"
+    print(f"⚙️  Concurrency: {concurrency} | QPS limit: {qps} | Mode: {mode}")
+    print()
+
+    ledger = VerificationLedger()
+    plans = []
+    # One streaming pass over every dataset the registry marks for verification
+    for dataset, handles in groupby(walk_records(verifiable_datasets(), write_back=False),
+                                    key=lambda handle: handle.dataset):
+        handles = list(handles)
+        notes, candidates = plan_dataset(ledger, dataset, handles, args.ttl)
+        plans.append((dataset.title.lower(), dataset.title, dataset.verify_threshold_m,
+                      len(handles), notes, candidates))
+
+    due = select_due([c for plan in plans for c in plan[5]], args.full, args.limit)
+    by_status = {status: sum(1 for c in due if c['status'] == status) for status in PRIORITY}
+    print(f"🧮 {len(due)} records due: {by_status[CHANGED]} changed, {by_status[DISCREPANT]} uncorrected, "
+          f"{by_status[NEW]} never verified, {by_status[EXPIRED] + by_status[FRESH]} re-checks")
+
+    async with AsyncPlacesClient(GOOGLE_PLACES_API_KEY, concurrency=concurrency, qps=qps, timeout=timeout,
+                                 cache_ttl_days=response_ttl) as client:
+        # Fan out in priority order: the client bounds concurrency and paces requests to the configured QPS
+        coords = await asyncio.gather(*(get_place_details(client, c['place_id']) for c in due))
+    results = {id(c): result for c, result in zip(due, coords)}
+    failed = sum(1 for result in coords if result is None)
+    verified_count = len(coords) - failed
+
     all_discrepancies = []
-    
-    # Verify each dataset
-    all_discrepancies.extend(verify_waterfalls())
-    all_discrepancies.extend(verify_breweries())
-    all_discrepancies.extend(verify_restaurants())
-    all_discrepancies.extend(verify_orchards())
-    all_discrepancies.extend(verify_cities())
-    
-    # Generate correction script and report
-    generate_correction_script(all_discrepancies)
+    for index, (plural, title, threshold_m, total, notes, candidates) in enumerate(plans):
+        if index:
+            print()
+        print(f"=== Verifying {title} ===")
+        all_discrepancies.extend(
+            report_dataset(ledger, plural, total, notes, candidates, results, threshold_m, args.ttl)
+        )
+    ledger.close()
+
+    print(f"\n⏱️  {client.stats['requests']} Places requests in {client.elapsed:.1f}s "
+          f"({client.throughput():.1f} req/s, {client.stats['errors']} errors)")
+    print(f"♻️  Saved {client.coalescer.saved} duplicate lookups by coalescing, "
+          f"{client.stats['cache_hits']} served from cache")
+    adaptive = client.adaptive
+    print(f"🎚️  Concurrency settled at {int(adaptive['current'])}/{adaptive['maximum']} in flight "
+          f"({adaptive['decreases']} backoffs, {adaptive['increases']} increases)")
+
+    if failed:
+        print(f"🪪 {failed} place IDs returned no location; `python maintenance/refresh_place_ids.py --failed-only` "
+              f"replaces obsolete ones")
+
+    # Write correction patch and report
+    write_corrections(all_discrepancies, verified_count)
 
 if __name__ == "__main__":
     main()
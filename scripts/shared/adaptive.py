@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+AIMD (additive-increase / multiplicative-decrease) control for API callers
+
+The shared rate limiter enforces the configured ceiling; these controllers find
+the fastest pace below it that the API actually tolerates. Every window of
+healthy responses (OK status, latency under target) raises the limit by a fixed
+step; an OVER_QUERY_LIMIT answer, a 5xx or a timeout cuts it by a factor, at most
+once per cooldown so one burst of failures counts as a single signal.
+
+- AdaptivePacer spaces synchronous requests at the controller's rate (req/s)
+- AdaptiveGate bounds in-flight async requests at the controller's concurrency
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from config.loader import load_common_config
+
+from .rate_limiter import get_rate_limiter
+
+
+class AIMDController:
+    """Tracks one adaptive limit (a rate or a concurrency)"""
+
+    def __init__(self, initial: float, minimum: float, maximum: float, increase: float = 1.0,
+                 decrease: float = 0.5, window: int = 10, latency_target: Optional[float] = None,
+                 cooldown: float = 2.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = min(maximum, max(minimum, initial))
+        self.increase = increase
+        self.decrease = decrease
+        self.window = max(1, window)
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+
+        self._healthy = 0
+        self._last_decrease = 0.0
+        self.stats = {
+            'increases': 0,
+            'decreases': 0,
+            'slow_responses': 0,
+            'signals': {},
+            'peak': self.limit,
+            'trough': self.limit,
+        }
+
+    def record_success(self, latency: Optional[float] = None) -> None:
+        if self.latency_target is not None and latency is not None and latency > self.latency_target:
+            # Slow but successful: hold the limit rather than push further
+            self.stats['slow_responses'] += 1
+            self._healthy = 0
+            return
+        self._healthy += 1
+        if self._healthy >= self.window:
+            self._healthy = 0
+            if self.limit < self.maximum:
+                self.limit = min(self.maximum, self.limit + self.increase)
+                self.stats['increases'] += 1
+                self.stats['peak'] = max(self.stats['peak'], self.limit)
+
+    def record_congestion(self, reason: str) -> None:
+        signals = self.stats['signals']
+        signals[reason] = signals.get(reason, 0) + 1
+        self._healthy = 0
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit * self.decrease)
+        self.stats['decreases'] += 1
+        self.stats['trough'] = min(self.stats['trough'], self.limit)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'current': round(self.limit, 2), 'minimum': self.minimum, 'maximum': self.maximum, **self.stats}
+
+
+class AdaptivePacer:
+    """Spaces synchronous request starts at the controller's current rate"""
+
+    def __init__(self, controller: AIMDController):
+        self.controller = controller
+        self._next_start = 0.0
+        self.slept = 0.0
+
+    def wait(self) -> None:
+        now = time.monotonic()
+        delay = self._next_start - now
+        if delay > 0:
+            time.sleep(delay)
+            self.slept += delay
+            now += delay
+        self._next_start = now + 1.0 / self.controller.limit
+
+
+class AdaptiveGate:
+    """Async context manager admitting at most ``int(controller.limit)`` requests at a time"""
+
+    def __init__(self, controller: AIMDController):
+        self.controller = controller
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self) -> "AdaptiveGate":
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < max(1, int(self.controller.limit)))
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            # The limit may have grown as well as shrunk, so wake every waiter to re-check
+            self._condition.notify_all()
+
+
+def adaptive_settings() -> Dict[str, Any]:
+    return load_common_config().get("api", {}).get("google_maps", {}).get("adaptive", {})
+
+
+_pacers: Dict[str, Optional[AdaptivePacer]] = {}
+
+
+def get_pacer(api: str) -> Optional[AdaptivePacer]:
+    """
+    Process-wide pacer for ``api``, bounded above by the shared limiter's rate.
+    Returns None when adaptive pacing is disabled or the API is unthrottled.
+    """
+    if api not in _pacers:
+        settings = adaptive_settings()
+        qps, _ = get_rate_limiter()._rate(api)
+        if not settings.get("enabled", True) or qps <= 0:
+            _pacers[api] = None
+        else:
+            minimum = min(qps, settings.get("min_qps", 0.2))
+            _pacers[api] = AdaptivePacer(AIMDController(
+                initial=qps * settings.get("initial_fraction", 0.5),
+                minimum=minimum,
+                maximum=qps,
+                increase=max(minimum, qps * settings.get("increase_fraction", 0.1)),
+                decrease=settings.get("decrease_factor", 0.5),
+                window=settings.get("window", 10),
+                latency_target=settings.get("latency_target_ms", 2000) / 1000,
+            ))
+    return _pacers[api]
+
+
+def concurrency_controller(maximum: int) -> AIMDController:
+    """AIMD controller for an async client's in-flight request limit"""
+    settings = adaptive_settings()
+    maximum = max(1, maximum)
+    if not settings.get("enabled", True):
+        return AIMDController(initial=maximum, minimum=maximum, maximum=maximum)
+    return AIMDController(
+        initial=max(1, round(maximum * settings.get("initial_fraction", 0.5))),
+        minimum=1,
+        maximum=maximum,
+        increase=1,
+        decrease=settings.get("decrease_factor", 0.5),
+        window=settings.get("window", 10),
+        latency_target=settings.get("latency_target_ms", 2000) / 1000,
+    )
+
+
+def adaptive_summary() -> Dict[str, Dict[str, Any]]:
+    """Current state of every synchronous pacer created in this process"""
+    return {api: pacer.controller.snapshot() for api, pacer in _pacers.items() if pacer is not None}
+
+
+def format_rates() -> str:
+    """One-line summary for run statistics, e.g. 'places 7.5 req/s (2 cuts)'"""
+    parts = [f"{api} {state['current']:g} req/s ({state['decreases']} cuts)"
+             for api, state in adaptive_summary().items()]
+    return ", ".join(parts) or "not used"
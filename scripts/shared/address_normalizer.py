@@ -0,0 +1,139 @@
+"""
+Canonical form of addresses and place queries, for cache and dedup keys
+
+"348 Sunside Road, East Durham, NY 12423" and "348 Sunside Rd, East Durham NY"
+are the same address, and Google's "82 4 Corners Rd" is our "82 Four Corners
+Rd". normalize_address() maps such spellings onto one key:
+
+- casing, accents and punctuation are dropped; "&" reads "and", apostrophes
+  join their word ("Moe's" = "Moes")
+- street suffixes and directionals take their USPS abbreviation
+  (Road -> rd, Avenue -> ave, North -> n), as do Mount/Mountain/Fort
+- state and US highway references collapse to "rte N" (NY-28, State Route 28,
+  US Highway 20, Rte 20)
+- business words take their usual abbreviation (Company -> co)
+- unit designators (Apartment, Apt, Suite, Ste, #) become "unit"; Floor,
+  Building and Room their short forms
+- number words become digits, including tens compounds and ordinals
+  ("Twenty-One" -> 21, "First" -> 1st)
+- a trailing state name becomes its postal code; a ZIP (or ZIP+4) after a
+  state, and a trailing country, are dropped
+
+The result is only ever used as a key, never shown or sent to an API, so the
+rules favour merging spellings over keeping distinctions a human would make.
+That is right for addresses but too eager for place-name searches ("Joe's
+Pizza, NY 12866" is not "Joe's Pizza, NY 12831"); those are keyed on
+normalize_query(), which only ignores case, accents, punctuation and spacing.
+The regexes and token tables are compiled once at import. Results are
+memoized, since the same venue addresses come back on every run.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict
+
+# Bump when a rule changes, so stored keys (e.g. the compiled gazetteer) are rebuilt
+NORMALIZER_VERSION = 1
+
+STREET_SUFFIXES = {
+    "alley": "aly", "avenue": "ave", "av": "ave", "boulevard": "blvd", "bypass": "byp", "causeway": "cswy",
+    "circle": "cir", "court": "ct", "crossing": "xing", "drive": "dr", "expressway": "expy", "extension": "ext",
+    "freeway": "fwy", "heights": "hts", "highway": "hwy", "hollow": "holw", "junction": "jct", "lane": "ln",
+    "parkway": "pkwy", "pike": "pike", "place": "pl", "plaza": "plz", "point": "pt", "road": "rd", "square": "sq",
+    "street": "st", "str": "st", "terrace": "ter", "trail": "trl", "turnpike": "tpke", "way": "way",
+    "center": "ctr", "centre": "ctr", "mountain": "mtn", "mount": "mt", "fort": "ft", "lake": "lk",
+}
+
+DIRECTIONALS = {
+    "north": "n", "south": "s", "east": "e", "west": "w",
+    "northeast": "ne", "northwest": "nw", "southeast": "se", "southwest": "sw",
+}
+
+UNIT_DESIGNATORS = {
+    "apartment": "unit", "apt": "unit", "suite": "unit", "ste": "unit", "unit": "unit",
+    "floor": "fl", "flr": "fl", "building": "bldg", "bldg": "bldg", "room": "rm", "rm": "rm",
+}
+
+BUSINESS_WORDS = {"company": "co", "corporation": "corp", "incorporated": "inc", "limited": "ltd", "brothers": "bros"}
+
+NUMBER_WORDS = {
+    "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4", "five": "5", "six": "6", "seven": "7",
+    "eight": "8", "nine": "9", "ten": "10", "eleven": "11", "twelve": "12", "thirteen": "13", "fourteen": "14",
+    "fifteen": "15", "sixteen": "16", "seventeen": "17", "eighteen": "18", "nineteen": "19",
+    "first": "1st", "second": "2nd", "third": "3rd", "fourth": "4th", "fifth": "5th", "sixth": "6th",
+    "seventh": "7th", "eighth": "8th", "ninth": "9th", "tenth": "10th", "eleventh": "11th", "twelfth": "12th",
+}
+TENS = {"twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90}
+UNITS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9}
+UNIT_ORDINALS = {"first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5, "sixth": 6, "seventh": 7,
+                 "eighth": 8, "ninth": 9}
+
+# New York and the states the maps' records spill into
+STATE_NAMES = {
+    "new york": "ny", "pennsylvania": "pa", "new jersey": "nj", "vermont": "vt", "massachusetts": "ma",
+    "connecticut": "ct", "new hampshire": "nh", "ontario": "on", "quebec": "qc",
+}
+STATE_CODES = frozenset(STATE_NAMES.values())
+
+
+def _ordinal(number: int) -> str:
+    suffix = "th" if 10 <= number % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(number % 10, "th")
+    return f"{number}{suffix}"
+
+
+TOKEN_MAP: Dict[str, str] = {
+    **STREET_SUFFIXES, **DIRECTIONALS, **UNIT_DESIGNATORS, **BUSINESS_WORDS, **NUMBER_WORDS,
+    **{word: str(number) for word, number in TENS.items()},
+    **{word[:-1] + "ieth": _ordinal(number) for word, number in TENS.items()},
+}
+
+_ZIP4 = re.compile(r"\b(\d{5})-\d{4}\b")
+_HASH_UNIT = re.compile(r"#\s*(?=\w)")
+_APOSTROPHE = re.compile(r"[\'’]")
+_AMPERSAND = re.compile(r"&")
+_NON_WORD = re.compile(r"[^\w]+")
+_TENS_COMPOUND = re.compile(r"\b(" + "|".join(TENS) + r")(?:\s+|-)(" + "|".join({**UNITS, **UNIT_ORDINALS}) + r")\b")
+_COUNTRY = re.compile(r"(?:\s+(?:usa|us|united states(?: of america)?|canada))+$")
+_STATE_NAME = re.compile(r"\b(" + "|".join(STATE_NAMES) + r")(?=(?:\s+\d{5})?$)")
+_STATE_ZIP = re.compile(r"\b(" + "|".join(sorted(STATE_CODES)) + r")\s+\d{5}$")
+# "NY-28", "State Route 28", "US Highway 20", "Rte 9W" -> "rte 28"; a 5-digit ZIP after NY is not a route
+_ROUTE = re.compile(r"\b(?:(?:ny|state|us)\s+(?:route|rte|rt|highway|hwy)|(?:ny|us)|route|rte|rt|highway|hwy)"
+                    r"\s+(\d{1,3}[a-z]?)\b")
+
+
+def _compound(match: "re.Match") -> str:
+    tens, unit = TENS[match.group(1)], match.group(2)
+    if unit in UNIT_ORDINALS:
+        return _ordinal(tens + UNIT_ORDINALS[unit])
+    return str(tens + UNITS[unit])
+
+
+@lru_cache(maxsize=65536)
+def _normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").casefold()
+    text = _ZIP4.sub(r"\1", text)
+    text = _HASH_UNIT.sub(" unit ", text)
+    text = _APOSTROPHE.sub("", text)
+    text = _AMPERSAND.sub(" and ", text)
+    text = " ".join(_NON_WORD.sub(" ", text).split())
+
+    text = _TENS_COMPOUND.sub(_compound, text)
+    text = _COUNTRY.sub("", text)
+    text = _STATE_NAME.sub(lambda m: STATE_NAMES[m.group(1)], text)
+    text = _STATE_ZIP.sub(r"\1", text)
+    text = " ".join(TOKEN_MAP.get(token, token) for token in text.split())
+    return _ROUTE.sub(r"rte \1", text)
+
+
+def normalize_query(text: Any) -> str:
+    """Case-, accent-, punctuation- and whitespace-insensitive form of a query"""
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode("ascii")
+    return " ".join(_NON_WORD.sub(" ", text.casefold()).split())
+
+
+def normalize_address(text: Any) -> str:
+    """Canonical key form of an address, place name or free-text query ("" for nothing)"""
+    if text is None:
+        return ""
+    return _normalize(str(text))
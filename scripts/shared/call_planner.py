@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Plan/cost-estimate mode shared by the Places enrichers
+
+Before a run spends anything, each tool walks its datasets with the same
+decision logic and request parameters it would use live, but hands every
+request to a CallPlan instead of the network. The plan checks the shared
+response cache (without touching it), folds identical requests together as
+the coalescer would, and totals the calls that would actually be billed:
+
+- live:        not cached, will be sent
+- cached:      answered from the response cache within its TTL, or a miss the
+               negative cache will not retry yet
+- coalesced:   identical to a request already planned in this run
+- conditional: depends on a response that is not cached yet (e.g. Details
+               after a Text Search match), counted as an upper bound
+
+Cost uses the per-1000 prices under api.google_maps.pricing in common.json;
+the wall-clock estimate divides live calls by the shared limiter's rate.
+"""
+
+from typing import Any, Callable, Dict, Optional
+
+from config.loader import load_common_config
+
+from .negative_cache import get_negative_cache, negative_response
+from .places_cache import PlacesCache, get_places_cache, request_key, ttl_for
+from .rate_limiter import get_rate_limiter
+
+# USD per 1000 requests (legacy Places / Geocoding SKUs), used when common.json has no pricing block
+DEFAULT_PRICES = {
+    "textsearch": 32.0,
+    "findplacefromtext": 17.0,
+    "details": 17.0,
+    "geocode": 5.0,
+}
+
+ENDPOINT_APIS = {"geocode": "geocoding", "nominatim": "nominatim"}
+
+KINDS = ("live", "cached", "coalesced", "conditional")
+
+
+def pricing() -> Dict[str, float]:
+    configured = load_common_config().get("api", {}).get("google_maps", {}).get("pricing", {})
+    return {**DEFAULT_PRICES, **configured.get("usd_per_1000", {})}
+
+
+class CallPlan:
+    """Tally of the API requests a run would make, by dataset and endpoint"""
+
+    def __init__(self, cache: Optional[PlacesCache] = None, prices: Optional[Dict[str, float]] = None):
+        self.cache = cache or get_places_cache()
+        self.negative = get_negative_cache()
+        self.prices = prices or pricing()
+        self.calls: Dict[str, Dict[str, int]] = {}
+        self.datasets: Dict[str, Dict[str, int]] = {}
+        self._dataset = "(none)"
+        self._planned: Dict[str, Any] = {}
+
+    def _dataset_stats(self) -> Dict[str, int]:
+        return self.datasets.setdefault(self._dataset, {"records": 0, "lookups": 0, **{kind: 0 for kind in KINDS}})
+
+    def start_dataset(self, name: str) -> None:
+        self._dataset = name
+        self._dataset_stats()
+
+    def record(self, needs_lookup: bool) -> None:
+        """Count one record of the current dataset (and whether it triggers any request)"""
+        stats = self._dataset_stats()
+        stats["records"] += 1
+        stats["lookups"] += bool(needs_lookup)
+
+    def _count(self, endpoint: str, kind: str, count: int = 1) -> None:
+        self.calls.setdefault(endpoint, {k: 0 for k in KINDS})[kind] += count
+        self._dataset_stats()[kind] += count
+
+    def lookup(self, endpoint: str, params: Dict[str, Any], ttl_days: Optional[float] = None,
+               fingerprint: Optional[str] = None) -> Any:
+        """
+        Account for one request exactly as get_json would send it.
+        Returns the cached response when the cache would answer it (so callers can plan the
+        follow-up requests that depend on it), otherwise None.
+        """
+        params = {k: v for k, v in params.items() if k != "key"}
+        key = request_key(endpoint, params)
+        if key in self._planned:
+            self._count(endpoint, "coalesced")
+            return self._planned[key]
+
+        ttl = ttl_for(endpoint) if ttl_days is None else ttl_days
+        cached = self.cache.get(endpoint, params, ttl_days=ttl, peek=True) if ttl else None
+        if cached is None and ttl:
+            status = self.negative.check(endpoint, params, fingerprint, peek=True)
+            if status is not None:
+                cached = negative_response(endpoint, status)
+        self._count(endpoint, "live" if cached is None else "cached")
+        self._planned[key] = cached
+        return cached
+
+    def conditional(self, endpoint: str, count: int = 1) -> None:
+        """Requests that only happen if a not-yet-cached response says so (upper bound)"""
+        self._count(endpoint, "conditional", count)
+
+    def billable(self, include_conditional: bool = True) -> Dict[str, int]:
+        return {endpoint: counts["live"] + (counts["conditional"] if include_conditional else 0)
+                for endpoint, counts in self.calls.items()}
+
+    def cost_usd(self, include_conditional: bool = True) -> float:
+        return sum(calls * self.prices.get(endpoint, 0.0) / 1000
+                   for endpoint, calls in self.billable(include_conditional).items())
+
+    def duration_s(self, include_conditional: bool = True) -> float:
+        """Wall-clock seconds to send the billable calls at the shared limiter's configured rate"""
+        limiter = get_rate_limiter()
+        seconds = 0.0
+        for endpoint, calls in self.billable(include_conditional).items():
+            qps, _ = limiter._rate(ENDPOINT_APIS.get(endpoint, "places"))
+            if qps > 0:
+                seconds += calls / qps
+        return seconds
+
+    def report(self, emit: Callable[[str], None] = print) -> None:
+        emit("📋 API call plan (nothing has been sent)")
+        for name, stats in self.datasets.items():
+            emit(f"  {name}: {stats['records']} records, {stats['lookups']} need lookups -> "
+                 f"{stats['live']} live, {stats['cached']} cached, {stats['coalesced']} coalesced, "
+                 f"{stats['conditional']} conditional")
+        for endpoint, counts in sorted(self.calls.items()):
+            price = self.prices.get(endpoint, 0.0)
+            emit(f"  {endpoint:<18} {counts['live']:>6} live + {counts['conditional']:>6} conditional "
+                 f"({counts['cached']} cached, {counts['coalesced']} coalesced) @ ${price:g}/1000")
+        low, high = self.cost_usd(False), self.cost_usd(True)
+        emit(f"💵 Projected cost: ${low:,.2f}" + (f" - ${high:,.2f}" if high > low else ""))
+        low, high = self.duration_s(False), self.duration_s(True)
+        emit(f"⏱️  Projected time at the configured rate: {format_duration(low)}"
+             + (f" - {format_duration(high)}" if high > low else ""))
+
+
+def format_duration(seconds: float) -> str:
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.1f} min"
+    return f"{seconds / 3600:.1f} h"
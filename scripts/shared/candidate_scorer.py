@@ -0,0 +1,254 @@
+"""
+Multi-signal scoring of Places search candidates
+
+Taking the nearest result (the enrichers) or simply the first one (the place
+ID assigners) picks the wrong place often enough that fixes like
+legacy/fix_village_town_place_ids.py were needed afterwards. Here every
+candidate of a search is scored on four signals, each between 0 and 1:
+
+- distance: great-circle distance from the record's coordinates, decaying with
+  the dataset's match radius (candidates beyond a hard limit are dropped)
+- name:     share of the record's name tokens found in the candidate's name,
+  discounted for extra tokens; near-identical tokens count as equal
+- types:    how well the candidate's Google types fit the record type (a city
+  wants a locality, a brewery a bar/restaurant, a waterfall a natural feature)
+- address:  share of the record's address/location tokens in formatted_address,
+  both in normalized form (shared/address_normalizer.py: Road = Rd, Four = 4)
+
+The confidence of a candidate is the weighted mean of the signals the record
+can provide (no coordinates means no distance signal, and so on). The best
+candidate is accepted when its confidence reaches ``min_confidence`` and beats
+the runner-up by ``margin``; otherwise the match goes to the review queue
+(shared/review_queue.py) instead of into the data. Weights and thresholds live
+under api.google_maps.matching in common.json.
+"""
+
+import math
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional
+
+from config.loader import load_common_config
+
+from .address_normalizer import normalize_address, normalize_query
+from .geodesy import distances_from
+
+DEFAULT_WEIGHTS = {"distance": 0.35, "name": 0.35, "types": 0.15, "address": 0.15}
+DEFAULT_MIN_CONFIDENCE = 0.6
+DEFAULT_MARGIN = 0.05
+# Distance at which the distance signal falls to 1/e, when no radius is given
+DEFAULT_DISTANCE_SCALE_M = 1000
+
+# Words that say nothing about which place is meant
+STOP_TOKENS = {
+    "the", "of", "and", "at", "in", "on", "a", "an", "ny", "new", "york", "usa", "us", "state",
+    "inc", "llc", "co", "company",
+}
+
+# Tokens this similar (difflib ratio) count as the same word, to absorb typos and plurals
+TOKEN_MATCH_RATIO = 0.85
+
+# Fit of Google place types per registry record type; the best-fitting type counts
+TYPE_PROFILES: Dict[str, Dict[str, float]] = {
+    "city": {"locality": 1.0, "administrative_area_level_3": 0.9, "postal_town": 0.8, "sublocality": 0.5,
+             "neighborhood": 0.4, "political": 0.5, "establishment": 0.1, "point_of_interest": 0.1},
+    "waterfall": {"natural_feature": 1.0, "park": 0.9, "tourist_attraction": 0.9, "point_of_interest": 0.5,
+                  "establishment": 0.4, "locality": 0.1, "route": 0.2},
+    "trailhead": {"park": 1.0, "natural_feature": 0.9, "tourist_attraction": 0.8, "campground": 0.7,
+                  "point_of_interest": 0.5, "establishment": 0.4, "locality": 0.1, "route": 0.3},
+    "brewery": {"bar": 1.0, "restaurant": 0.9, "food": 0.8, "liquor_store": 0.7, "store": 0.5,
+                "point_of_interest": 0.4, "establishment": 0.4, "locality": 0.0},
+    "restaurant": {"restaurant": 1.0, "cafe": 0.9, "bakery": 0.8, "meal_takeaway": 0.8, "bar": 0.8, "food": 0.8,
+                   "point_of_interest": 0.4, "establishment": 0.4, "locality": 0.0},
+    "orchard": {"food": 0.9, "store": 0.8, "grocery_or_supermarket": 0.8, "tourist_attraction": 0.8,
+                "point_of_interest": 0.6, "establishment": 0.6, "locality": 0.1},
+    "attraction": {"tourist_attraction": 1.0, "museum": 1.0, "park": 0.9, "natural_feature": 0.9,
+                   "point_of_interest": 0.6, "establishment": 0.5, "locality": 0.2},
+    "activity": {"tourist_attraction": 1.0, "amusement_park": 1.0, "zoo": 1.0, "aquarium": 1.0, "museum": 0.9,
+                 "park": 0.9, "point_of_interest": 0.6, "establishment": 0.5, "locality": 0.1},
+    "accommodation": {"lodging": 1.0, "point_of_interest": 0.4, "establishment": 0.4, "street_address": 0.6,
+                      "premise": 0.6, "locality": 0.1},
+}
+
+# Search contexts used by older scripts, mapped to the registry record type they mean
+RECORD_TYPE_ALIASES = {"farm": "orchard", "poi": "attraction", "children": "activity"}
+
+
+def tokens(text: Any) -> List[str]:
+    return [token for token in normalize_query(text or "").split() if token not in STOP_TOKENS]
+
+
+def address_tokens(text: Any) -> List[str]:
+    return [token for token in normalize_address(text).split() if token not in STOP_TOKENS]
+
+
+def _token_in(token: str, others: Iterable[str]) -> bool:
+    return any(token == other or SequenceMatcher(None, token, other).ratio() >= TOKEN_MATCH_RATIO for other in others)
+
+
+def name_similarity(record_name: Any, candidate_name: Any) -> Optional[float]:
+    """Share of the record's name tokens in the candidate name, discounted for extra candidate tokens"""
+    wanted, offered = tokens(record_name), tokens(candidate_name)
+    if not wanted:
+        return None
+    if not offered:
+        return 0.0
+    found = sum(1 for token in wanted if _token_in(token, offered))
+    used = sum(1 for token in offered if _token_in(token, wanted))
+    return (found / len(wanted)) * (0.5 + 0.5 * used / len(offered))
+
+
+def address_agreement(record_address: Any, candidate_address: Any) -> Optional[float]:
+    """Share of the record's address/location tokens found in the candidate's formatted_address"""
+    wanted = set(address_tokens(record_address))
+    if not wanted:
+        return None
+    offered = set(address_tokens(candidate_address))
+    return sum(1 for token in wanted if _token_in(token, offered)) / len(wanted)
+
+
+def type_fit(record_type: Optional[str], candidate_types: Iterable[str]) -> Optional[float]:
+    """Best fit of the candidate's Google types for ``record_type`` (None when the type has no profile)"""
+    profile = TYPE_PROFILES.get(RECORD_TYPE_ALIASES.get(record_type, record_type) or "")
+    if profile is None:
+        return None
+    return max((profile.get(kind, 0.0) for kind in candidate_types or ()), default=0.0)
+
+
+def candidate_location(candidate: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    location = (candidate.get("geometry") or {}).get("location") or {}
+    if location.get("lat") is None or location.get("lng") is None:
+        return None
+    return location
+
+
+class ScoredCandidate:
+    """One search result with its per-signal scores and overall confidence"""
+
+    def __init__(self, result: Dict[str, Any], signals: Dict[str, Optional[float]], confidence: float,
+                 distance_m: Optional[float]):
+        self.result = result
+        self.signals = signals
+        self.confidence = confidence
+        self.distance_m = distance_m
+
+    @property
+    def place_id(self) -> Optional[str]:
+        return self.result.get("place_id")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary for logs and the review queue"""
+        location = candidate_location(self.result) or {}
+        return {
+            "place_id": self.place_id,
+            "name": self.result.get("name"),
+            "formatted_address": self.result.get("formatted_address"),
+            "lat": location.get("lat"),
+            "lng": location.get("lng"),
+            "types": self.result.get("types", []),
+            "confidence": round(self.confidence, 3),
+            "distance_m": None if self.distance_m is None else round(self.distance_m),
+            "signals": {name: None if value is None else round(value, 3) for name, value in self.signals.items()},
+        }
+
+
+class MatchDecision:
+    """Ranked candidates for one record and whether the best one can be written without review"""
+
+    def __init__(self, ranked: List[ScoredCandidate], accepted: bool, reason: str):
+        self.ranked = ranked
+        self.accepted = accepted
+        self.reason = reason
+
+    @property
+    def best(self) -> Optional[ScoredCandidate]:
+        return self.ranked[0] if self.ranked else None
+
+    @property
+    def confidence(self) -> float:
+        return self.best.confidence if self.best else 0.0
+
+
+class CandidateScorer:
+    """Ranks Places search results for a record and decides whether the top one is safe to accept"""
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+                 margin: float = DEFAULT_MARGIN, top_k: int = 3):
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.min_confidence = min_confidence
+        self.margin = margin
+        self.top_k = top_k
+
+    def rank(self, results: List[Dict[str, Any]], name: Any = None, lat: Optional[float] = None,
+             lng: Optional[float] = None, record_type: Optional[str] = None, address: Any = None,
+             max_distance_m: Optional[float] = None, distance_scale_m: Optional[float] = None) -> List[ScoredCandidate]:
+        """
+        Every usable candidate, best first. With coordinates, candidates without a location or
+        at/over ``max_distance_m`` are dropped, and distances are computed in one vectorized call.
+        """
+        located = lat is not None and lng is not None
+        if located:
+            results = [result for result in results if candidate_location(result)]
+            distances = distances_from(lat, lng, [candidate_location(r)["lat"] for r in results],
+                                       [candidate_location(r)["lng"] for r in results]) if results else []
+            scale = distance_scale_m or (max_distance_m / 3 if max_distance_m else DEFAULT_DISTANCE_SCALE_M)
+        else:
+            distances = [None] * len(results)
+
+        ranked = []
+        for result, distance in zip(results, distances):
+            if distance is not None and max_distance_m is not None and not distance < max_distance_m:
+                continue
+            signals = {
+                "distance": None if distance is None else math.exp(-float(distance) / scale),
+                "name": name_similarity(name, result.get("name")),
+                "types": type_fit(record_type, result.get("types")),
+                "address": address_agreement(address, result.get("formatted_address")),
+            }
+            ranked.append(ScoredCandidate(result, signals, self.confidence(signals),
+                                          None if distance is None else float(distance)))
+        # Stable sort keeps Google's order between equally scored candidates
+        ranked.sort(key=lambda scored: -scored.confidence)
+        return ranked
+
+    def confidence(self, signals: Dict[str, Optional[float]]) -> float:
+        """Weighted mean of the available signals"""
+        available = {name: value for name, value in signals.items() if value is not None and self.weights.get(name)}
+        total = sum(self.weights[name] for name in available)
+        if not total:
+            return 0.0
+        return sum(self.weights[name] * value for name, value in available.items()) / total
+
+    def decide(self, results: List[Dict[str, Any]], **record: Any) -> MatchDecision:
+        """Rank ``results`` (keyword arguments as for rank) and accept the best one if it is clear enough"""
+        ranked = self.rank(results, **record)
+        if not ranked:
+            return MatchDecision([], False, "no candidate within range")
+        best = ranked[0]
+        if best.confidence < self.min_confidence:
+            return MatchDecision(ranked[:self.top_k], False,
+                                 f"low confidence {best.confidence:.2f} < {self.min_confidence:.2f}")
+        if len(ranked) > 1 and best.confidence - ranked[1].confidence < self.margin:
+            return MatchDecision(ranked[:self.top_k], False,
+                                 f"ambiguous: {best.confidence:.2f} vs {ranked[1].confidence:.2f}")
+        return MatchDecision(ranked[:self.top_k], True, f"confidence {best.confidence:.2f}")
+
+
+def matching_settings() -> Dict[str, Any]:
+    return load_common_config().get("api", {}).get("google_maps", {}).get("matching", {})
+
+
+_shared_scorer: Optional[CandidateScorer] = None
+
+
+def get_candidate_scorer() -> CandidateScorer:
+    """Process-wide scorer configured from common.json api.google_maps.matching"""
+    global _shared_scorer
+    if _shared_scorer is None:
+        settings = matching_settings()
+        _shared_scorer = CandidateScorer(
+            weights=settings.get("weights"),
+            min_confidence=settings.get("min_confidence", DEFAULT_MIN_CONFIDENCE),
+            margin=settings.get("margin", DEFAULT_MARGIN),
+            top_k=settings.get("top_k", 3),
+        )
+    return _shared_scorer
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Checkpoints and resume cursors for long enrichment runs
+
+A run periodically writes its partially enriched dataset back to disk
+(atomically: temp file + rename, so a crash never leaves half a JSON file)
+together with a resume cursor: the number of entries already handled and a
+hash of the file as written. The next run over the same file skips straight
+past those entries, so lookups that failed are not paid for twice. The cursor
+is dropped once a run completes, or ignored if the file has been changed
+since it was written.
+
+The response cache is flushed at every checkpoint, so entries handled after
+the last checkpoint are replayed from the cache rather than the API.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from .endpoints import state_path
+from .places_cache import get_places_cache
+
+DEFAULT_INTERVAL = 60.0
+
+
+def dump_json(data: Any) -> bytes:
+    """Serialize a dataset exactly as the scripts write it"""
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def atomic_write_bytes(path: Path, payload: bytes) -> None:
+    """Replace ``path`` with ``payload`` without ever exposing a partial file"""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def atomic_write_json(path: Path, data: Any) -> None:
+    atomic_write_bytes(path, dump_json(data))
+
+
+def file_digest(payload: bytes) -> str:
+    return hashlib.sha1(payload).hexdigest()
+
+
+class Checkpointer:
+    """
+    Resume cursor plus periodic atomic write-back for one dataset file.
+
+    ``every`` checkpoints after that many newly handled entries (0 = off) and
+    ``interval`` after that many seconds, whichever comes first.
+    """
+
+    def __init__(self, file_path: Path, every: int = 0, interval: float = DEFAULT_INTERVAL,
+                 enabled: bool = True):
+        self.file_path = Path(file_path).resolve()
+        self.every = every
+        self.interval = interval
+        self.enabled = enabled
+        key = hashlib.sha1(str(self.file_path).encode("utf-8")).hexdigest()[:12]
+        self.cursor_path = state_path(None, "checkpoints") / f"{self.file_path.stem}-{key}.json"
+
+        self.position = 0
+        self.saves = 0
+        self._since_save = 0
+        self._last_save = time.monotonic()
+
+    def resume(self) -> int:
+        """Position to continue from: entries before it were handled by an interrupted run"""
+        if not self.enabled or not self.cursor_path.exists():
+            return 0
+        try:
+            with open(self.cursor_path, "r", encoding="utf-8") as f:
+                cursor = json.load(f)
+            with open(self.file_path, "rb") as f:
+                current = file_digest(f.read())
+        except (OSError, ValueError):
+            return 0
+        if cursor.get("digest") != current:
+            # The file changed since the checkpoint was written; start over
+            return 0
+        self.position = int(cursor.get("position", 0))
+        return self.position
+
+    def advance(self, position: int, data: Any) -> bool:
+        """Record that entries before ``position`` are handled; checkpoint if one is due"""
+        self.position = position
+        self._since_save += 1
+        due = (self.every and self._since_save >= self.every) or \
+              (self.interval and time.monotonic() - self._last_save >= self.interval)
+        if due:
+            self.save(data)
+        return bool(due)
+
+    def save(self, data: Any) -> None:
+        """Write the dataset and the cursor (dataset first, so the cursor never points past saved work)"""
+        if not self.enabled:
+            return
+        get_places_cache().flush()
+        payload = dump_json(data)
+        atomic_write_bytes(self.file_path, payload)
+        self.cursor_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(self.cursor_path, {
+            "file": str(self.file_path),
+            "position": self.position,
+            "digest": file_digest(payload),
+            "saved_at": datetime.now().isoformat(),
+        })
+        self.saves += 1
+        self._since_save = 0
+        self._last_save = time.monotonic()
+
+    def finish(self, data: Any, completed: bool = True) -> None:
+        """Final write-back; the cursor is kept only if the run stopped early"""
+        if not self.enabled:
+            return
+        if completed:
+            atomic_write_json(self.file_path, data)
+            self.clear()
+        else:
+            self.save(data)
+
+    def clear(self) -> None:
+        if self.cursor_path.exists():
+            self.cursor_path.unlink()
+
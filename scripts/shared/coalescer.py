@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+In-run request coalescing for Places / Geocoding lookups
+
+The same place_id or query often appears in several datasets of one run (a city
+in map-data.json that is also a point of interest, a repeated place_query...).
+RequestCoalescer collapses identical requests: a request that is already in
+flight is awaited rather than re-sent, and a completed one is answered from
+memory. Every caller receives the same decoded response, so treat it as read-only.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .metrics import get_metrics
+from .places_cache import request_key
+
+
+class RequestCoalescer:
+    """Shares one response between every identical request made during a run"""
+
+    def __init__(self):
+        self._completed: Dict[str, Any] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.stats = {
+            'requests': 0,
+            'coalesced': 0,
+        }
+
+    @staticmethod
+    def key(endpoint: str, params: Dict[str, Any]) -> str:
+        return request_key(endpoint, params)
+
+    @staticmethod
+    def _reusable(data: Any) -> bool:
+        # Throttled answers must be retried, not shared
+        return data is not None and not (isinstance(data, dict) and data.get('status') == 'OVER_QUERY_LIMIT')
+
+    def call(self, endpoint: str, params: Dict[str, Any], fetch: Callable[[], Any]) -> Any:
+        """Return the run's response for (endpoint, params), calling ``fetch`` only the first time"""
+        self.stats['requests'] += 1
+        key = self.key(endpoint, params)
+        if key in self._completed:
+            self.stats['coalesced'] += 1
+            get_metrics().coalesced(endpoint)
+            return self._completed[key]
+
+        data = fetch()
+        if self._reusable(data):
+            self._completed[key] = data
+        return data
+
+    async def call_async(self, endpoint: str, params: Dict[str, Any],
+                         fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Async variant of call(); concurrent identical requests await the same in-flight fetch"""
+        self.stats['requests'] += 1
+        key = self.key(endpoint, params)
+        if key in self._completed:
+            self.stats['coalesced'] += 1
+            get_metrics().coalesced(endpoint)
+            return self._completed[key]
+        if key in self._in_flight:
+            self.stats['coalesced'] += 1
+            get_metrics().coalesced(endpoint)
+            return await asyncio.shield(self._in_flight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            data = await fetch()
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters re-raise the error; mark it retrieved so an unshared failure is not logged
+            future.exception()
+            raise
+        else:
+            future.set_result(data)
+            if self._reusable(data):
+                self._completed[key] = data
+            return data
+        finally:
+            del self._in_flight[key]
+
+    @property
+    def saved(self) -> int:
+        """API calls avoided so far"""
+        return self.stats['coalesced']
+
+    def summary(self) -> str:
+        return f"{self.stats['requests']} lookups, {self.saved} served by coalescing"
+
+
+_shared_coalescer: Optional[RequestCoalescer] = None
+
+
+def get_coalescer() -> RequestCoalescer:
+    """Process-wide coalescer used by shared.google_api.get_json"""
+    global _shared_coalescer
+    if _shared_coalescer is None:
+        _shared_coalescer = RequestCoalescer()
+    return _shared_coalescer
@@ -0,0 +1,180 @@
+"""
+Coordinate correction patches and a batched applier
+
+A patch is plain JSON data rather than generated code:
+
+    {
+      "version": 1,
+      "generated_at": "2026-01-01T00:00:00+00:00",
+      "corrections": [
+        {"dataset": "waterfalls", "key": "waterfalls:Rainbow Falls", "place_id": "ChIJ...",
+         "name": "Rainbow Falls", "old": [44.123456, -73.654321], "new": [44.134567, -73.643210],
+         "distance_m": 250}
+      ]
+    }
+
+Each correction names its registry dataset and is keyed by place_id, falling
+back to the record's stable RecordHandle key when the place_id is missing or
+shared by several records. The applier groups corrections by dataset file,
+indexes each file once, applies everything in one pass and writes the file
+once (atomically). A correction is refused as a conflict when the record's
+coordinates no longer match the "old" values it was computed from, when its
+place_id is ambiguous, or when two corrections target the same record with
+different coordinates.
+"""
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .checkpoint import atomic_write_json
+from .datasets import DatasetDocument, RecordHandle, get_dataset
+
+PATCH_VERSION = 1
+
+# Coordinates closer than this (degrees, ~1 cm) are treated as equal
+COORDINATE_TOLERANCE = 1e-7
+
+OUTCOMES = ("applied", "already_applied", "conflict", "missing")
+
+
+def correction_from_discrepancy(discrepancy: Dict[str, Any]) -> Dict[str, Any]:
+    """Correction moving a verified record from its current coordinates to Google's"""
+    return {
+        'dataset': discrepancy['dataset'],
+        'key': discrepancy['key'],
+        'place_id': discrepancy['place_id'],
+        'name': discrepancy['name'],
+        'old': list(discrepancy['current']),
+        'new': list(discrepancy['google']),
+        'distance_m': round(discrepancy['distance_m']),
+    }
+
+
+def write_patch(path: Path, corrections: List[Dict[str, Any]]) -> None:
+    atomic_write_json(Path(path), {
+        'version': PATCH_VERSION,
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'corrections': corrections,
+    })
+
+
+def load_patch(path: Path) -> List[Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        patch = json.load(f)
+    if patch.get('version') != PATCH_VERSION:
+        raise ValueError(f"{path}: unsupported correction patch version {patch.get('version')!r}")
+    return patch.get('corrections', [])
+
+
+def _same_point(a: Optional[Tuple[float, float]], b: Iterable[float]) -> bool:
+    if a is None:
+        return False
+    return all(abs(float(x) - float(y)) <= COORDINATE_TOLERANCE for x, y in zip(a, b))
+
+
+class CorrectionResult:
+    """Outcome of applying one patch: per-correction outcomes plus the files written"""
+
+    def __init__(self):
+        self.outcomes: List[Tuple[Dict[str, Any], str, str]] = []
+        self.files_written: List[Path] = []
+
+    def add(self, correction: Dict[str, Any], outcome: str, detail: str = "") -> None:
+        self.outcomes.append((correction, outcome, detail))
+
+    def count(self, outcome: str) -> int:
+        return sum(1 for _, o, _ in self.outcomes if o == outcome)
+
+    def summary(self) -> str:
+        counts = ", ".join(f"{self.count(outcome)} {outcome.replace('_', ' ')}" for outcome in OUTCOMES)
+        return f"{len(self.outcomes)} corrections: {counts}; {len(self.files_written)} files written"
+
+
+def _index(document: DatasetDocument) -> Tuple[Dict[str, List[RecordHandle]], Dict[str, List[RecordHandle]]]:
+    by_place_id: Dict[str, List[RecordHandle]] = {}
+    by_key: Dict[str, List[RecordHandle]] = {}
+    for handle in document.records():
+        if handle.get('place_id'):
+            by_place_id.setdefault(handle.get('place_id'), []).append(handle)
+        by_key.setdefault(handle.key, []).append(handle)
+    return by_place_id, by_key
+
+
+def _target(correction: Dict[str, Any], by_place_id: Dict[str, List[RecordHandle]],
+            by_key: Dict[str, List[RecordHandle]]) -> Tuple[Optional[RecordHandle], str, str]:
+    """(record the correction applies to, or None with the outcome and reason)"""
+    matches = by_place_id.get(correction.get('place_id') or "", [])
+    if len(matches) > 1:
+        # Several records share the place_id: only the stable key can tell them apart
+        matches = [handle for handle in matches if handle.key == correction.get('key')]
+    if not matches:
+        matches = by_key.get(correction.get('key') or "", [])
+    if not matches:
+        return None, "missing", "no record with this place_id or key"
+    if len(matches) > 1:
+        return None, "conflict", f"{len(matches)} records match"
+    return matches[0], "", ""
+
+
+def apply_corrections(corrections: List[Dict[str, Any]], data_dir: Optional[Path] = None, dry_run: bool = False,
+                      emit: Callable[[str], None] = print) -> CorrectionResult:
+    """
+    Apply ``corrections`` with one load and at most one write per dataset file.
+    With ``dry_run`` nothing is written; ``emit`` receives a -/+ diff of every change either way.
+    """
+    result = CorrectionResult()
+    by_dataset: Dict[str, List[Dict[str, Any]]] = {}
+    for correction in corrections:
+        by_dataset.setdefault(correction['dataset'], []).append(correction)
+
+    for name, items in by_dataset.items():
+        dataset = get_dataset(name)
+        document = DatasetDocument.load(dataset, data_dir)
+        if document is None:
+            for correction in items:
+                result.add(correction, "missing", f"{dataset.filename} not found")
+            continue
+
+        by_place_id, by_key = _index(document)
+        claimed: Dict[int, Dict[str, Any]] = {}
+        emit(f"--- {document.path}")
+        for correction in items:
+            handle, outcome, problem = _target(correction, by_place_id, by_key)
+            label = correction.get('name') or correction.get('key')
+            if handle is None:
+                result.add(correction, outcome, problem)
+                emit(f"! {label}: {problem}")
+                continue
+
+            new = correction['new']
+            earlier = claimed.get(id(handle))
+            if earlier is not None:
+                if _same_point(tuple(earlier['new']), new):
+                    result.add(correction, "already_applied", "duplicate correction")
+                else:
+                    result.add(correction, "conflict", "another correction in this patch moves the same record")
+                    emit(f"! {label}: conflicting corrections for {handle.key}")
+                continue
+
+            current = handle.coordinates
+            if _same_point(current, new):
+                result.add(correction, "already_applied")
+                continue
+            if not _same_point(current, correction['old']):
+                found = f"{current[0]:.6f},{current[1]:.6f}" if current else "no coordinates"
+                result.add(correction, "conflict", "record coordinates changed since verification")
+                emit(f"! {label}: expected {correction['old'][0]:.6f},{correction['old'][1]:.6f}, found {found}")
+                continue
+
+            claimed[id(handle)] = correction
+            emit(f"- {handle.key}: {current[0]:.6f},{current[1]:.6f}")
+            emit(f"+ {handle.key}: {new[0]:.6f},{new[1]:.6f} ({correction.get('distance_m', 0):.0f}m)")
+            handle.set_coordinates(new[0], new[1])
+            result.add(correction, "applied")
+
+        if document.dirty and not dry_run:
+            document.save()
+            result.files_written.append(document.path)
+    return result
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Registry of the datasets in public/data and a streaming walker over their records
+
+Each Dataset declares its file, where the records sit inside it (a path of
+dict keys, with "*" meaning every element of a list), the fields that identify
+a record (dotted for nested values, "fruits.0.type"), how its coordinates are stored and the distance thresholds used when
+matching or verifying it against Google.
+
+walk_records() yields every record of every dataset as a RecordHandle, loading
+one file at a time. A handle exposes the record's coordinates and identity and
+writes changes back: each file is saved atomically once its records have been
+consumed, and only if a handle changed something. Verification, enrichment and
+linting can therefore share one pass over the data.
+
+Usage:
+    python shared/datasets.py           # registry with record counts
+    python shared/datasets.py --lint    # also report missing coordinates and duplicate identities
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from shared.checkpoint import atomic_write_json
+from shared.endpoints import SCRIPTS_DIR
+
+DATA_DIR = SCRIPTS_DIR.parent / "public" / "data"
+
+EVERY = "*"
+
+
+class Dataset:
+    """Where one data file keeps its records and how they are matched"""
+
+    def __init__(self, name: str, filename: str, record_type: str, title: str,
+                 location: Sequence[str] = (EVERY,), identity: Sequence[str] = ("name",),
+                 coordinates: str = "fields", verify_threshold_m: Optional[float] = None,
+                 match_radius_m: float = 3000):
+        self.name = name
+        self.filename = filename
+        self.record_type = record_type
+        self.title = title
+        self.location = tuple(location)
+        self.identity = tuple(identity)
+        # "fields": separate lat/lng keys; "pair": a [lat, lng] list under "coordinates"
+        self.coordinates = coordinates
+        # Google vs stored distance above which verification reports a discrepancy (None = not verified)
+        self.verify_threshold_m = verify_threshold_m
+        # Maximum distance between the stored point and a Places match when enriching
+        self.match_radius_m = match_radius_m
+
+    @property
+    def is_flat(self) -> bool:
+        """True when the file is a plain list of records"""
+        return self.location == (EVERY,)
+
+    def path(self, data_dir: Optional[Path] = None) -> Path:
+        return Path(data_dir or DATA_DIR) / self.filename
+
+    def __repr__(self) -> str:
+        return f"Dataset({self.name!r}, {self.filename!r})"
+
+
+DATASETS: List[Dataset] = [
+    Dataset("waterfalls", "waterfalls.json", "waterfall", "Waterfalls", verify_threshold_m=100),
+    Dataset("breweries", "breweries.json", "brewery", "Breweries", verify_threshold_m=100),
+    Dataset("restaurants", "restaurants.json", "restaurant", "Restaurants", verify_threshold_m=100),
+    # A farm has one record per crop (apples, peaches), each with its own place and coordinates
+    Dataset("orchards", "pyo-fruit-farms.json", "orchard", "Orchards", identity=("name", "address", "fruits.0.type"),
+            verify_threshold_m=100),
+    Dataset("children", "children.json", "activity", "Children's Activities"),
+    Dataset("points_of_interest", "points_of_interest.json", "attraction", "Points of Interest"),
+    Dataset("trailheads", "trail-heads.json", "trailhead", "Trailheads", location=(EVERY, "trails", EVERY)),
+    Dataset("airbnbs", "our-airbnbs.json", "accommodation", "Our Airbnbs", identity=("name", "start_date")),
+    Dataset("events", "events.json", "event", "Events", location=("events", EVERY),
+            identity=("name", "start_date")),
+    # Cities can be large, so they get wider thresholds
+    Dataset("cities", "map-data.json", "city", "Cities", location=("cities", EVERY), coordinates="pair",
+            verify_threshold_m=1000, match_radius_m=10000),
+]
+
+_BY_NAME = {dataset.name: dataset for dataset in DATASETS}
+
+
+def get_dataset(name: str) -> Dataset:
+    try:
+        return _BY_NAME[name]
+    except KeyError:
+        raise KeyError(f"Unknown dataset {name!r}; known: {', '.join(_BY_NAME)}") from None
+
+
+def dataset_for_file(path: Any) -> Optional[Dataset]:
+    """Registry entry whose file has the same name as ``path`` (None for unregistered files)"""
+    filename = Path(path).name
+    return next((dataset for dataset in DATASETS if dataset.filename == filename), None)
+
+
+def field_value(record: Dict[str, Any], field: str) -> Any:
+    """Value of a plain or dotted identity field ("fruits.0.type"); None when any step is missing"""
+    value: Any = record
+    for step in field.split("."):
+        if isinstance(value, dict):
+            value = value.get(step)
+        elif isinstance(value, list) and step.isdigit() and int(step) < len(value):
+            value = value[int(step)]
+        else:
+            return None
+    return value
+
+
+def record_key(dataset: Dataset, record: Dict[str, Any]) -> str:
+    """Stable "<dataset>:<identity>" key for cursors, ledgers and reports"""
+    identity = (field_value(record, field) for field in dataset.identity)
+    return f"{dataset.name}:" + "|".join("" if value is None else str(value) for value in identity)
+
+
+def verifiable_datasets() -> List[Dataset]:
+    return [dataset for dataset in DATASETS if dataset.verify_threshold_m is not None]
+
+
+_MISSING = object()
+
+
+class RecordHandle:
+    """One record inside a loaded dataset, with write-back"""
+
+    def __init__(self, document: "DatasetDocument", location: Tuple[Any, ...], record: Dict[str, Any]):
+        self.document = document
+        self.dataset = document.dataset
+        self.location = location
+        self.record = record
+
+    def get(self, field: str, default: Any = None) -> Any:
+        return self.record.get(field, default)
+
+    @property
+    def name(self) -> str:
+        return self.record.get("name") or f"{self.dataset.record_type.title()} {self.location}"
+
+    @property
+    def identity(self) -> Tuple[Any, ...]:
+        return tuple(field_value(self.record, field) for field in self.dataset.identity)
+
+    @property
+    def key(self) -> str:
+        """Stable "<dataset>:<identity>" key for cursors, ledgers and reports"""
+        return record_key(self.dataset, self.record)
+
+    @property
+    def coordinates(self) -> Optional[Tuple[float, float]]:
+        if self.dataset.coordinates == "pair":
+            pair = self.record.get("coordinates")
+            if isinstance(pair, (list, tuple)) and len(pair) == 2 and None not in pair:
+                return float(pair[0]), float(pair[1])
+            return None
+        lat, lng = self.record.get("lat"), self.record.get("lng")
+        if lat is None or lng is None:
+            return None
+        return float(lat), float(lng)
+
+    @property
+    def lat(self) -> Optional[float]:
+        coordinates = self.coordinates
+        return coordinates[0] if coordinates else None
+
+    @property
+    def lng(self) -> Optional[float]:
+        coordinates = self.coordinates
+        return coordinates[1] if coordinates else None
+
+    def set_coordinates(self, lat: float, lng: float) -> None:
+        if self.dataset.coordinates == "pair":
+            self.update(coordinates=[lat, lng])
+        else:
+            self.update(lat=lat, lng=lng)
+
+    def update(self, **fields: Any) -> bool:
+        """Set fields on the record; returns True (and marks the file for saving) if anything changed"""
+        changed = False
+        for field, value in fields.items():
+            if self.record.get(field, _MISSING) != value:
+                self.record[field] = value
+                changed = True
+        if changed:
+            self.document.dirty = True
+        return changed
+
+    def __repr__(self) -> str:
+        return f"RecordHandle({self.key!r})"
+
+
+class DatasetDocument:
+    """A loaded data file plus whether any of its records changed"""
+
+    def __init__(self, dataset: Dataset, path: Path, data: Any):
+        self.dataset = dataset
+        self.path = path
+        self.data = data
+        self.dirty = False
+
+    @classmethod
+    def load(cls, dataset: Dataset, data_dir: Optional[Path] = None) -> Optional["DatasetDocument"]:
+        path = dataset.path(data_dir)
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(dataset, path, json.load(f))
+
+    def records(self) -> Iterator[RecordHandle]:
+        for location, record in _walk(self.data, self.dataset.location, ()):
+            if isinstance(record, dict):
+                yield RecordHandle(self, location, record)
+
+    def save(self) -> None:
+        atomic_write_json(self.path, self.data)
+        self.dirty = False
+
+
+def _walk(node: Any, steps: Tuple[str, ...], location: Tuple[Any, ...]) -> Iterator[Tuple[Tuple[Any, ...], Any]]:
+    if not steps:
+        yield location, node
+        return
+    step, rest = steps[0], steps[1:]
+    if step == EVERY:
+        if isinstance(node, list):
+            for index, child in enumerate(node):
+                yield from _walk(child, rest, location + (index,))
+    elif isinstance(node, dict):
+        if step in node:
+            yield from _walk(node[step], rest, location + (step,))
+    elif isinstance(node, list):
+        # A key applied to a list of groups (e.g. several region objects) applies to each group
+        for index, child in enumerate(node):
+            yield from _walk(child, steps, location + (index,))
+
+
+def walk_records(datasets: Optional[Iterable[Dataset]] = None, data_dir: Optional[Path] = None,
+                 write_back: bool = True) -> Iterator[RecordHandle]:
+    """
+    Stream every record of ``datasets`` (default: all of them).
+    Missing files are skipped. With ``write_back``, a file whose records were changed
+    through their handles is saved once the walker moves past it (or is closed).
+    """
+    for dataset in DATASETS if datasets is None else datasets:
+        document = DatasetDocument.load(dataset, data_dir)
+        if document is None:
+            continue
+        try:
+            yield from document.records()
+        finally:
+            if write_back and document.dirty:
+                document.save()
+
+
+def lint(handles: Iterable[RecordHandle]) -> Dict[str, List[str]]:
+    """Problems per dataset: missing names/coordinates and duplicate identities"""
+    problems: Dict[str, List[str]] = {}
+    seen: Dict[str, Tuple[Any, ...]] = {}
+    for handle in handles:
+        issues = problems.setdefault(handle.dataset.name, [])
+        if not handle.record.get("name"):
+            issues.append(f"{handle.location}: missing name")
+        if handle.coordinates is None:
+            issues.append(f"{handle.name}: missing coordinates")
+        if handle.key in seen:
+            issues.append(f"{handle.name}: duplicate of the record at {seen[handle.key]}")
+        else:
+            seen[handle.key] = handle.location
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the registered datasets in public/data")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--lint", action="store_true", help="Report records with missing fields or duplicate identities")
+    args = parser.parse_args()
+
+    counts: Dict[str, Dict[str, int]] = {}
+    handles = []
+    for handle in walk_records(data_dir=args.data_dir, write_back=False):
+        stats = counts.setdefault(handle.dataset.name, {"records": 0, "place_ids": 0})
+        stats["records"] += 1
+        stats["place_ids"] += bool(handle.record.get("place_id"))
+        if args.lint:
+            handles.append(handle)
+
+    print(f"📚 Datasets in {args.data_dir}")
+    for dataset in DATASETS:
+        stats = counts.get(dataset.name)
+        if stats is None:
+            status = "missing" if not dataset.path(args.data_dir).exists() else "no records"
+            print(f"  {dataset.name:<20} {dataset.filename:<26} {status}")
+            continue
+        verify = f"verify >{dataset.verify_threshold_m:g} m" if dataset.verify_threshold_m is not None else "not verified"
+        print(f"  {dataset.name:<20} {dataset.filename:<26} {stats['records']:>4} records, "
+              f"{stats['place_ids']:>4} with place_id, {verify}")
+
+    if args.lint:
+        total = 0
+        for name, issues in lint(handles).items():
+            for issue in issues:
+                print(f"⚠️  {name}: {issue}")
+            total += len(issues)
+        print(f"🧹 {total} lint issues")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+API origins, base-URL overrides and the location of local API state
+
+Every script reaches Google Maps Platform and Nominatim through URLs that start
+with the origins below. Setting GOOGLE_MAPS_BASE_URL and/or NOMINATIM_BASE_URL
+(or passing --base-url to scripts that take arguments) rewrites those origins at
+request time, so any script can be pointed at shared/mock_api_server.py without
+code changes. While an override is active, the response cache, rate-limiter and
+ledger databases live in scripts/.cache/mock/ so stand-in responses never mix
+with real ones.
+"""
+
+import argparse
+import os
+from pathlib import Path
+from typing import Optional
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+STATE_DIR = SCRIPTS_DIR / ".cache"
+
+GOOGLE_MAPS_ORIGIN = "https://maps.googleapis.com"
+NOMINATIM_ORIGIN = "https://nominatim.openstreetmap.org"
+
+# Environment variable -> origin it replaces
+BASE_URL_OVERRIDES = {
+    "GOOGLE_MAPS_BASE_URL": GOOGLE_MAPS_ORIGIN,
+    "NOMINATIM_BASE_URL": NOMINATIM_ORIGIN,
+}
+
+
+def resolve_url(url: str) -> str:
+    """Apply any configured base-URL override to ``url``"""
+    for env, origin in BASE_URL_OVERRIDES.items():
+        override = os.getenv(env)
+        if override and url.startswith(origin):
+            return override.rstrip("/") + url[len(origin):]
+    return url
+
+
+def overrides_active() -> bool:
+    return any(os.getenv(env) for env in BASE_URL_OVERRIDES)
+
+
+def set_base_url(base_url: str) -> None:
+    """
+    Route Google and Nominatim calls of this process (and its children) to ``base_url``.
+    Nominatim is served under ``{base_url}/nominatim``, matching the mock server.
+    """
+    base_url = base_url.rstrip("/")
+    os.environ["GOOGLE_MAPS_BASE_URL"] = base_url
+    os.environ["NOMINATIM_BASE_URL"] = f"{base_url}/nominatim"
+
+
+def add_base_url_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--base-url", default=None,
+                        help="Send Google/Nominatim requests to this server instead (e.g. http://127.0.0.1:8765)")
+
+
+def apply_base_url(args: argparse.Namespace) -> None:
+    if getattr(args, "base_url", None):
+        set_base_url(args.base_url)
+
+
+def state_path(relative: Optional[str], default_name: str) -> Path:
+    """
+    Path of a local state database: ``relative`` is taken from config (relative to scripts/),
+    falling back to scripts/.cache/<default_name>; redirected to a mock/ subfolder while overrides are active.
+    """
+    path = SCRIPTS_DIR / relative if relative else STATE_DIR / default_name
+    if overrides_active():
+        path = path.parent / "mock" / path.name
+    return path
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Offline gazetteer compiled from our own verified records
+
+Hundreds of records in public/data already carry an address and coordinates
+that Google confirmed (a place_id, a google_verified_at stamp, or a Google
+geocode on an event), and map-data.json knows where every city is. Events and
+Airbnbs at the same venues used to send those addresses to the Geocoding API
+again. The build step here compiles them into one index with three lookups:
+
+- exact:   the address string as stored
+- address: the normalized address (address_key, also the geocode cache key),
+  so suffix spellings, number words, ZIPs, case, punctuation and spacing do not matter
+- name:    the normalized venue or city name. A name used by places further
+  apart than ``name_conflict_m`` is ambiguous and left out.
+
+The index is written to scripts/.cache/gazetteer.json together with the size
+and mtime of every source file. Gazetteer.load() rebuilds it when a dataset
+or the address normalization rules changed since, so a stale index is never
+consulted. Lookups are plain dict
+hits and take microseconds, which is why the geocoding service asks the
+gazetteer before any backend that needs the network.
+
+Usage:
+    python shared/gazetteer.py --build                  # compile the index now
+    python shared/gazetteer.py "64 Klein Ave, Hunter, NY 12442" "Hunter Mountain Resort"
+    python shared/gazetteer.py --stats                  # entries per dataset and key kind
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.loader import load_config
+from shared.candidate_scorer import address_tokens
+from shared.address_normalizer import NORMALIZER_VERSION, normalize_address
+from shared.checkpoint import atomic_write_json
+from shared.datasets import DATA_DIR, DATASETS, walk_records
+from shared.endpoints import STATE_DIR, SCRIPTS_DIR
+from shared.geodesy import haversine_m
+
+DEFAULT_GAZETTEER_PATH = STATE_DIR / "gazetteer.json"
+DEFAULT_NAME_CONFLICT_M = 1000
+FORMAT_VERSION = 2
+
+# Record fields that hold a full address, best first
+ADDRESS_FIELDS = ("formatted_address", "address", "geocoded_address")
+# Spellings a city is also looked up by, besides its bare name
+CITY_SUFFIXES = ("ny", "new york", "ny usa", "new york usa")
+# Share of the rest of "Venue, Town, NY" that must appear in the venue's address
+VENUE_ADDRESS_AGREEMENT = 0.5
+
+KINDS = ("exact", "address", "name")
+
+
+def gazetteer_settings() -> Dict[str, Any]:
+    return load_config("geocoding").get("gazetteer", {})
+
+
+def gazetteer_path() -> Path:
+    path = gazetteer_settings().get("path")
+    return SCRIPTS_DIR / path if path else DEFAULT_GAZETTEER_PATH
+
+
+def address_key(query: Any) -> str:
+    """Lookup key of an address or name (shared/address_normalizer.py): Road = Rd, Four = 4, NY 12423 = NY"""
+    return normalize_address(query)
+
+
+def is_verified(record: Dict[str, Any]) -> bool:
+    """Whether Google stands behind the record's coordinates"""
+    return bool(record.get("place_id") or record.get("google_verified_at") or record.get("geocoded") is True)
+
+
+def source_signature(data_dir: Path) -> Dict[str, List[int]]:
+    """[size, mtime_ns] of every dataset file, to tell whether the index is stale"""
+    signature = {}
+    for filename in sorted({dataset.filename for dataset in DATASETS}):
+        path = data_dir / filename
+        if path.exists():
+            stat = path.stat()
+            signature[filename] = [stat.st_size, stat.st_mtime_ns]
+    return signature
+
+
+class Gazetteer:
+    """Compiled index of verified places: entries plus exact/address/name lookup tables"""
+
+    def __init__(self, entries: List[Dict[str, Any]], tables: Dict[str, Dict[str, int]],
+                 sources: Dict[str, List[int]], built_at: float):
+        self.entries = entries
+        self.tables = tables
+        self.sources = sources
+        self.built_at = built_at
+
+    @classmethod
+    def build(cls, data_dir: Optional[Path] = None,
+              name_conflict_m: float = DEFAULT_NAME_CONFLICT_M) -> "Gazetteer":
+        """Compile the index from every verified record and every map-data city"""
+        data_dir = Path(data_dir or DATA_DIR)
+        entries: List[Dict[str, Any]] = []
+        tables: Dict[str, Dict[str, int]] = {kind: {} for kind in KINDS}
+        ambiguous_names = set()
+
+        for handle in walk_records(data_dir=data_dir, write_back=False):
+            city = handle.dataset.record_type == "city"
+            if handle.coordinates is None or not (city or is_verified(handle.record)):
+                continue
+            addresses = [handle.get(field) for field in ADDRESS_FIELDS if isinstance(handle.get(field), str)]
+            # An event is known by its venue, everything else by its own name
+            venue = handle.get("location_name") or handle.name
+            index = len(entries)
+            entries.append({
+                "lat": handle.lat,
+                "lng": handle.lng,
+                "name": venue,
+                "address": addresses[0] if addresses else "",
+                "place_id": handle.get("place_id"),
+                "key": handle.key,
+            })
+            if city:
+                addresses += [f"{handle.name} {suffix}" for suffix in CITY_SUFFIXES]
+            for address in addresses:
+                # The first record to claim an address keeps it; later ones are the same venue
+                if address.strip():
+                    tables["exact"].setdefault(address.strip(), index)
+                if address_key(address):
+                    tables["address"].setdefault(address_key(address), index)
+
+            name = address_key(venue if venue != "Unknown" else "")
+            if not name or name in ambiguous_names:
+                continue
+            other = tables["name"].get(name)
+            if other is None:
+                tables["name"][name] = index
+            elif haversine_m(entries[other]["lat"], entries[other]["lng"],
+                             handle.lat, handle.lng) > name_conflict_m:
+                # Two different places share the name (a chain, a common creek name); trust neither
+                del tables["name"][name]
+                ambiguous_names.add(name)
+
+        return cls(entries, tables, source_signature(data_dir), time.time())
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None, data_dir: Optional[Path] = None) -> "Gazetteer":
+        """The compiled index, rebuilt and saved first if it is missing, outdated or older than the data"""
+        settings = gazetteer_settings()
+        path = Path(path or gazetteer_path())
+        data_dir = Path(data_dir or DATA_DIR)
+        if path.exists():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == FORMAT_VERSION and data.get("normalizer") == NORMALIZER_VERSION \
+                        and data.get("sources") == source_signature(data_dir):
+                    return cls(data["entries"], data["tables"], data["sources"], data["built_at"])
+            except (OSError, ValueError, KeyError):
+                pass
+        gazetteer = cls.build(data_dir, settings.get("name_conflict_m", DEFAULT_NAME_CONFLICT_M))
+        gazetteer.save(path)
+        return gazetteer
+
+    def save(self, path: Path) -> None:
+        atomic_write_json(path, {
+            "version": FORMAT_VERSION,
+            "normalizer": NORMALIZER_VERSION,
+            "built_at": self.built_at,
+            "sources": self.sources,
+            "entries": self.entries,
+            "tables": self.tables,
+        })
+
+    def _entry(self, kind: str, key: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        index = self.tables[kind].get(key)
+        return None if index is None else (self.entries[index], kind)
+
+    def lookup(self, query: Any, venue: Any = None) -> Optional[Tuple[Dict[str, Any], str]]:
+        """
+        (entry, kind) for an address, trying the exact string, the normalized address, then
+        ``venue`` or the query itself as a name. A query shaped "Venue, Town, NY" also matches
+        the venue's name when its address agrees with the rest of the query.
+        """
+        query = str(query or "").strip()
+        key = address_key(query)
+        found = (query and self._entry("exact", query)) or (key and self._entry("address", key))
+        if found:
+            return found
+        for name in (venue, query):
+            if address_key(name):
+                found = self._entry("name", address_key(name))
+                if found:
+                    return found
+        head, _, rest = query.partition(",")
+        if rest:
+            found = self._entry("name", address_key(head))
+            if found and _agreement(rest, found[0]["address"]) >= VENUE_ADDRESS_AGREEMENT:
+                return found
+        return None
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Entries per dataset, and keys per lookup table"""
+        per_dataset: Dict[str, int] = {}
+        for entry in self.entries:
+            dataset = entry["key"].split(":", 1)[0]
+            per_dataset[dataset] = per_dataset.get(dataset, 0) + 1
+        return {"datasets": per_dataset, "tables": {kind: len(table) for kind, table in self.tables.items()}}
+
+
+def _agreement(text: str, address: str) -> float:
+    """Share of the town/street words of ``text`` (state and country words aside) found in ``address``"""
+    wanted = set(address_tokens(text))
+    if not wanted:
+        return 0.0
+    return len(wanted & set(address_tokens(address))) / len(wanted)
+
+
+_shared_gazetteer: Optional[Gazetteer] = None
+
+
+def get_gazetteer() -> Gazetteer:
+    """Process-wide gazetteer, loaded (or rebuilt) on first use"""
+    global _shared_gazetteer
+    if _shared_gazetteer is None:
+        _shared_gazetteer = Gazetteer.load()
+    return _shared_gazetteer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the offline gazetteer of verified places")
+    parser.add_argument("queries", nargs="*", help="Addresses or venue names to look up")
+    parser.add_argument("--build", action="store_true", help="Compile the index even if it is current")
+    parser.add_argument("--stats", action="store_true", help="Show entries per dataset and keys per lookup table")
+    args = parser.parse_args()
+
+    if args.build:
+        path = gazetteer_path()
+        started = time.perf_counter()
+        gazetteer = Gazetteer.build(name_conflict_m=gazetteer_settings().get("name_conflict_m", DEFAULT_NAME_CONFLICT_M))
+        gazetteer.save(path)
+        print(f"📚 Compiled {len(gazetteer.entries)} places in {time.perf_counter() - started:.2f}s -> {path}")
+    else:
+        gazetteer = get_gazetteer()
+
+    if args.stats:
+        counts = gazetteer.counts()
+        print(f"📚 {len(gazetteer.entries)} places, built {time.strftime('%Y-%m-%d %H:%M', time.localtime(gazetteer.built_at))}")
+        for dataset, count in sorted(counts["datasets"].items()):
+            print(f"  {dataset:<20} {count}")
+        print("  keys: " + ", ".join(f"{count} {kind}" for kind, count in counts["tables"].items()))
+
+    for query in args.queries:
+        started = time.perf_counter()
+        found = gazetteer.lookup(query)
+        micros = (time.perf_counter() - started) * 1e6
+        if found is None:
+            print(f"❌ {query}: not in the gazetteer ({micros:.0f} µs)")
+        else:
+            entry, kind = found
+            print(f"📍 {query}: {entry['lat']:.6f}, {entry['lng']:.6f} - {entry['key']} "
+                  f"by {kind} ({micros:.0f} µs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Geocoding service shared by every script
+
+research-events.py, geocode_events.py, geocode_airbnbs.py,
+geocode_airbnbs_nominatim.py and geocode_orchards.py each carried their own
+geocoder with its own timeouts and error handling. They now all go through
+GeocodingService, which tries a chain of backends in order:
+
+- gazetteer: coordinates of our own records that Google already matched, and
+  of the map-data cities, from the compiled index in shared/gazetteer.py;
+  looked up by address or venue name without any request
+- google:    the Geocoding API, through shared get_json (rate limiter, response
+  cache, negative cache, metrics)
+- nominatim: OpenStreetMap search, paced by the shared limiter's 1 req/s bucket
+
+The first backend that answers wins. The gazetteer (and any other local
+backend at the head of the chain) is asked before the cache, since it is the
+only one that knows venues: every event at a shared address gets its own
+venue's coordinates whatever was looked up first. Network results are kept in
+a ``geocodes`` table next to the response cache, keyed by the normalized
+address rather than by backend request. An address is therefore geocoded once across the
+whole toolchain, whichever script asks and however it phrases the request
+parameters (a cached answer is only reused by chains that include the
+backend it came from). geocode_many() deduplicates a batch of addresses or
+(address, venue) pairs first.
+ageocode_many() sends the Google lookups concurrently over one pooled
+session; Nominatim stays serial, since its usage policy allows one request
+per second anyway.
+
+The chain, cache TTL and backend settings live under "service" in
+config/geocoding.json.
+
+Usage:
+    python shared/geocoding.py "348 Sunside Rd, East Durham, NY"     # geocode through the chain
+    python shared/geocoding.py --chain gazetteer,nominatim "Ithaca, NY"
+    python shared/geocoding.py --stats                                # cached results per backend
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import requests
+
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.loader import load_config
+from shared.endpoints import state_path
+from shared.gazetteer import Gazetteer, address_key, get_gazetteer
+from shared.google_api import GEOCODE_URL, GOOGLE_API_BASE_URL, NOMINATIM_SEARCH_URL, get_json
+from shared.places_cache import DAY_SECONDS, DEFAULT_CACHE_PATH, cache_settings, ttl_for
+from shared.places_client import AsyncPlacesClient
+from shared.rate_limiter import QuotaExceededError
+
+BACKEND_NAMES = ("gazetteer", "google", "nominatim")
+NOMINATIM_USER_AGENT = "scenic-ny-map/1.0 (+https://example.com)"
+
+
+def service_settings() -> Dict[str, Any]:
+    return load_config("geocoding").get("service", {})
+
+
+class GeocodeResult:
+    """Coordinates for one address and the backend that supplied them"""
+
+    def __init__(self, lat: float, lng: float, formatted_address: str = "", place_id: Optional[str] = None,
+                 backend: str = "", types: Optional[List[str]] = None, importance: Optional[float] = None):
+        self.lat = float(lat)
+        self.lng = float(lng)
+        self.formatted_address = formatted_address or ""
+        self.place_id = place_id
+        self.backend = backend
+        self.types = types or []
+        # Nominatim's 0-1 relevance of the match (None from the other backends)
+        self.importance = importance
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "lat": self.lat,
+            "lng": self.lng,
+            "formatted_address": self.formatted_address,
+            "place_id": self.place_id,
+            "backend": self.backend,
+            "types": self.types,
+            "importance": self.importance,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GeocodeResult":
+        return cls(data["lat"], data["lng"], data.get("formatted_address", ""), data.get("place_id"),
+                   data.get("backend", ""), data.get("types"), data.get("importance"))
+
+    def __repr__(self) -> str:
+        return f"GeocodeResult({self.lat:.6f}, {self.lng:.6f}, {self.backend!r})"
+
+
+class GazetteerGeocoder:
+    """Our own verified places (shared/gazetteer.py); answers without any network call"""
+
+    name = "gazetteer"
+    # Answers from memory, so it is asked before the geocode cache
+    local = True
+
+    def __init__(self, gazetteer: Optional[Gazetteer] = None):
+        self._gazetteer = gazetteer
+
+    @property
+    def gazetteer(self) -> Gazetteer:
+        if self._gazetteer is None:
+            self._gazetteer = get_gazetteer()
+        return self._gazetteer
+
+    def geocode(self, query: str, venue: Optional[str] = None) -> Optional[GeocodeResult]:
+        found = self.gazetteer.lookup(query, venue)
+        if found is None:
+            return None
+        entry, _ = found
+        return GeocodeResult(entry["lat"], entry["lng"], entry["address"] or entry["name"], entry["place_id"], self.name)
+
+
+class GoogleGeocoder:
+    """Google Geocoding API"""
+
+    name = "google"
+
+    def __init__(self, api_key: Optional[str], region: str = "us", timeout: float = 20):
+        self.api_key = api_key
+        self.region = region
+        self.timeout = timeout
+
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def params(self, query: str) -> Dict[str, str]:
+        params = {"address": query}
+        if self.region:
+            params["region"] = self.region
+        return params
+
+    def parse(self, query: str, data: Any) -> Optional[GeocodeResult]:
+        if not isinstance(data, dict):
+            return None
+        status = data.get("status")
+        if status == "OK" and data.get("results"):
+            result = data["results"][0]
+            location = result["geometry"]["location"]
+            return GeocodeResult(location["lat"], location["lng"], result.get("formatted_address", ""),
+                                 result.get("place_id"), self.name, result.get("types"))
+        if status == "REQUEST_DENIED":
+            print(f"⚠️  Geocoding denied for {query!r} - check the API key ({data.get('error_message', '')})")
+        return None
+
+    def geocode(self, query: str) -> Optional[GeocodeResult]:
+        data = get_json(GEOCODE_URL, {**self.params(query), "key": self.api_key}, timeout=self.timeout)
+        return self.parse(query, data)
+
+    async def geocode_async(self, client: AsyncPlacesClient, query: str) -> Optional[GeocodeResult]:
+        return self.parse(query, await client.get_json("geocode", self.params(query)))
+
+
+class NominatimGeocoder:
+    """OpenStreetMap Nominatim search (free; the shared limiter keeps it under 1 request per second)"""
+
+    name = "nominatim"
+
+    def __init__(self, user_agent: str = NOMINATIM_USER_AGENT, countrycodes: str = "us", timeout: float = 20):
+        self.user_agent = user_agent
+        self.countrycodes = countrycodes
+        self.timeout = timeout
+
+    def geocode(self, query: str) -> Optional[GeocodeResult]:
+        params = {"q": query, "format": "jsonv2", "limit": 1}
+        if self.countrycodes:
+            params["countrycodes"] = self.countrycodes
+        results = get_json(NOMINATIM_SEARCH_URL, params, timeout=self.timeout,
+                           headers={"User-Agent": self.user_agent})
+        if not isinstance(results, list) or not results:
+            return None
+        best = results[0]
+        types = [value for value in (best.get("class"), best.get("type")) if value]
+        return GeocodeResult(best["lat"], best["lon"], best.get("display_name", ""), best.get("place_id"),
+                             self.name, types, best.get("importance"))
+
+
+class GeocodeCache:
+    """Geocoding results per normalized address, in a ``geocodes`` table next to the response cache"""
+
+    def __init__(self, db_path: Path = DEFAULT_CACHE_PATH, ttl_days: Optional[float] = 90):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_days = ttl_days
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS geocodes ("
+            " key TEXT PRIMARY KEY,"
+            " query TEXT NOT NULL,"
+            " backend TEXT NOT NULL,"
+            " result TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL)"
+        )
+
+    def get(self, query: str) -> Optional[GeocodeResult]:
+        row = self._conn.execute("SELECT result, fetched_at FROM geocodes WHERE key = ?",
+                                 (address_key(query),)).fetchone()
+        if row is None:
+            return None
+        if self.ttl_days and row[1] < time.time() - self.ttl_days * DAY_SECONDS:
+            return None
+        return GeocodeResult.from_dict(json.loads(row[0]))
+
+    def put(self, query: str, result: GeocodeResult) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO geocodes (key, query, backend, result, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (address_key(query), query, result.backend, json.dumps(result.to_dict(), ensure_ascii=False), time.time()),
+        )
+
+    def counts(self) -> Dict[str, int]:
+        return dict(self._conn.execute("SELECT backend, COUNT(*) FROM geocodes GROUP BY backend").fetchall())
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class GeocodingService:
+    """Cached geocoding through a fallback chain of backends"""
+
+    def __init__(self, backends: Sequence[Any], cache: Optional[GeocodeCache] = None,
+                 concurrency: int = 8, qps: float = 10, timeout: float = 20):
+        self.backends = [backend for backend in backends if getattr(backend, "available", True)]
+        # The local backends at the head of the chain run ahead of the cache, the rest behind it
+        split = next((i for i, backend in enumerate(self.backends) if not getattr(backend, "local", False)),
+                     len(self.backends))
+        self.local_backends, self.remote_backends = self.backends[:split], self.backends[split:]
+        self.cache = cache
+        self.concurrency = concurrency
+        self.qps = qps
+        self.timeout = timeout
+        self.stats: Dict[str, int] = {"cache": 0, "misses": 0, "errors": 0,
+                                      **{backend.name: 0 for backend in self.backends}}
+
+    def _cached(self, query: str) -> Optional[GeocodeResult]:
+        result = self.cache.get(query) if self.cache is not None else None
+        # A chain without a backend does not take its answers (e.g. no OSM ids where a Google place_id is wanted)
+        if result is not None and result.backend not in self.stats:
+            return None
+        if result is not None:
+            self.stats["cache"] += 1
+        return result
+
+    def _found(self, query: str, result: GeocodeResult) -> GeocodeResult:
+        self.stats[result.backend] += 1
+        # Gazetteer answers are already local; only network results are worth keeping
+        if self.cache is not None and result.backend != GazetteerGeocoder.name:
+            self.cache.put(query, result)
+        return result
+
+    def _try(self, backend: Any, query: str, venue: Optional[str] = None) -> Optional[GeocodeResult]:
+        """One backend's answer; transport errors move on to the next backend, quota errors propagate"""
+        try:
+            if isinstance(backend, GazetteerGeocoder):
+                return backend.geocode(query, venue)
+            return backend.geocode(query)
+        except QuotaExceededError:
+            raise
+        except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+            self.stats["errors"] += 1
+            print(f"⚠️  {backend.name} geocoding failed for {query!r}: {e}")
+            return None
+
+    def geocode(self, query: Any, venue: Optional[str] = None) -> Optional[GeocodeResult]:
+        """
+        Coordinates for ``query`` from the cache or the first backend that finds it (None if none does).
+        ``venue`` is the place's name, which the gazetteer can match when the address is phrased differently.
+        """
+        query = str(query or "").strip()
+        if not address_key(query):
+            return None
+        for backend in self.local_backends:
+            result = self._try(backend, query, venue)
+            if result is not None:
+                return self._found(query, result)
+        result = self._cached(query)
+        if result is not None:
+            return result
+        for backend in self.remote_backends:
+            result = self._try(backend, query, venue)
+            if result is not None:
+                return self._found(query, result)
+        self.stats["misses"] += 1
+        return None
+
+    def geocode_many(self, queries: Iterable[Any]) -> Dict[Any, Optional[GeocodeResult]]:
+        """
+        Result for each of a batch of addresses or (address, venue) pairs, keyed as given;
+        each distinct address and venue is looked up once
+        """
+        by_key: Dict[tuple, Optional[GeocodeResult]] = {}
+        results: Dict[Any, Optional[GeocodeResult]] = {}
+        for item in queries:
+            query, venue = _split_item(item)
+            key = (address_key(query), address_key(venue))
+            if key not in by_key:
+                by_key[key] = self.geocode(query, venue)
+            results[item] = by_key[key]
+        return results
+
+    async def ageocode_many(self, queries: Iterable[Any]) -> Dict[Any, Optional[GeocodeResult]]:
+        """
+        Async geocode_many(): the chain runs stage by stage over the whole batch. Backends with a
+        geocode_async() (Google) get their share concurrently over one pooled session; the rest run in turn.
+        """
+        items = list(queries)
+        # Local backends see each distinct (address, venue); what they miss goes on per address
+        local_found: Dict[tuple, Optional[GeocodeResult]] = {}
+        first_query: Dict[str, str] = {}
+        for item in items:
+            query, venue = _split_item(item)
+            key = address_key(query)
+            if not key or (key, address_key(venue)) in local_found:
+                continue
+            result = None
+            for backend in self.local_backends:
+                result = self._try(backend, query, venue)
+                if result is not None:
+                    result = self._found(query, result)
+                    break
+            local_found[(key, address_key(venue))] = result
+            if result is None:
+                first_query.setdefault(key, query)
+
+        found: Dict[str, Optional[GeocodeResult]] = {}
+        pending = []
+        for key, query in first_query.items():
+            found[key] = self._cached(query)
+            if found[key] is None:
+                pending.append((key, query))
+
+        for backend in self.remote_backends:
+            if not pending:
+                break
+            if hasattr(backend, "geocode_async"):
+                async with AsyncPlacesClient(backend.api_key, concurrency=self.concurrency, qps=self.qps,
+                                             timeout=self.timeout, base_url=GOOGLE_API_BASE_URL,
+                                             api="geocoding") as client:
+                    answers = await asyncio.gather(
+                        *(backend.geocode_async(client, query) for _, query in pending), return_exceptions=True)
+                if any(isinstance(answer, QuotaExceededError) for answer in answers):
+                    raise next(answer for answer in answers if isinstance(answer, QuotaExceededError))
+            else:
+                answers = [self._try(backend, query) for _, query in pending]
+            still_pending = []
+            for (key, query), answer in zip(pending, answers):
+                if isinstance(answer, GeocodeResult):
+                    found[key] = self._found(query, answer)
+                else:
+                    if isinstance(answer, Exception):
+                        self.stats["errors"] += 1
+                    still_pending.append((key, query))
+            pending = still_pending
+        self.stats["misses"] += len(pending)
+        results: Dict[Any, Optional[GeocodeResult]] = {}
+        for item in items:
+            query, venue = _split_item(item)
+            key = address_key(query)
+            results[item] = local_found.get((key, address_key(venue))) or found.get(key)
+        return results
+
+    def summary(self) -> str:
+        return ", ".join(f"{count} {name}" for name, count in self.stats.items())
+
+
+def _split_item(item: Any) -> tuple:
+    """(address, venue) of a batch item, which is an address or an (address, venue) pair"""
+    query, venue = item if isinstance(item, tuple) else (item, None)
+    return str(query or "").strip(), venue
+
+
+def build_backends(chain: Sequence[str], settings: Dict[str, Any], api_key: Optional[str] = None) -> List[Any]:
+    backends = []
+    timeout = settings.get("timeout", 20)
+    for name in chain:
+        if name == "gazetteer":
+            backends.append(GazetteerGeocoder())
+        elif name == "google":
+            backends.append(GoogleGeocoder(api_key or os.getenv("GOOGLE_MAPS_API_KEY"),
+                                           region=settings.get("region", "us"), timeout=timeout))
+        elif name == "nominatim":
+            nominatim = settings.get("nominatim", {})
+            backends.append(NominatimGeocoder(nominatim.get("user_agent", NOMINATIM_USER_AGENT),
+                                              nominatim.get("countrycodes", "us"), timeout=timeout))
+        else:
+            raise ValueError(f"Unknown geocoding backend {name!r}; known: {', '.join(BACKEND_NAMES)}")
+    return backends
+
+
+_services: Dict[tuple, GeocodingService] = {}
+
+
+def get_geocoding_service(chain: Optional[Sequence[str]] = None, api_key: Optional[str] = None) -> GeocodingService:
+    """Process-wide service for a chain (default: "chain" under service in config/geocoding.json)"""
+    settings = service_settings()
+    chain = tuple(chain or settings.get("chain", BACKEND_NAMES))
+    if chain not in _services:
+        cache = GeocodeCache(
+            db_path=state_path(cache_settings().get("path"), DEFAULT_CACHE_PATH.name),
+            ttl_days=settings.get("cache_ttl_days", ttl_for("geocode")),
+        )
+        _services[chain] = GeocodingService(
+            build_backends(chain, settings, api_key), cache,
+            concurrency=settings.get("concurrency", 8), qps=settings.get("qps", 10),
+            timeout=settings.get("timeout", 20),
+        )
+    return _services[chain]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Geocode addresses through the shared geocoding service")
+    parser.add_argument("addresses", nargs="*")
+    parser.add_argument("--chain", type=lambda value: tuple(value.split(",")),
+                        help=f"Comma-separated backends to try, in order (from {', '.join(BACKEND_NAMES)})")
+    parser.add_argument("--stats", action="store_true", help="Show how many cached results came from each backend")
+    args = parser.parse_args()
+
+    service = get_geocoding_service(args.chain)
+    if args.stats:
+        counts = service.cache.counts()
+        print(f"🗺️  {sum(counts.values())} cached geocodes ({service.cache.db_path})")
+        for backend, count in sorted(counts.items()):
+            print(f"  {backend:<10} {count}")
+    for address, result in service.geocode_many(args.addresses).items():
+        if result is None:
+            print(f"❌ {address}: not found")
+        else:
+            print(f"📍 {address}: {result.lat:.6f}, {result.lng:.6f} via {result.backend} ({result.formatted_address})")
+
+
+if __name__ == "__main__":
+    main()
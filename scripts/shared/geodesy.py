@@ -0,0 +1,141 @@
+"""
+Great-circle distances, bearings and bounding boxes shared by the scripts
+
+All functions use the haversine formula on a sphere of EARTH_RADIUS_M, which
+is what every script used to copy as calculate_distance. The NumPy kernels
+take scalars or arrays and broadcast, so a ranking or verification loop can
+compute all of its distances in one call:
+
+- distance_m(lat1, lng1, lat2, lng2)    elementwise / pairwise
+- distances_from(lat, lng, lats, lngs)  one-to-many
+- distance_matrix(lats1, lngs1, ...)    many-to-many
+- nearest(lat, lng, lats, lngs, ...)    closest candidate within a radius
+- pairs_within(lats, lngs, radius_m)    every pair of points closer than a radius
+
+haversine_m is the scalar version for code that really has one pair at a
+time; below a handful of points it is faster than going through NumPy
+(see benchmarks/bench_geodesy.py).
+"""
+
+import math
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371000
+
+# Meters per degree of latitude (and of longitude at the equator)
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Distance in meters between two points (scalar)"""
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    delta_lat = math.radians(lat2 - lat1)
+    delta_lng = math.radians(lng2 - lng1)
+    a = (math.sin(delta_lat / 2) ** 2 +
+         math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lng / 2) ** 2)
+    return EARTH_RADIUS_M * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def distance_m(lat1: ArrayLike, lng1: ArrayLike, lat2: ArrayLike, lng2: ArrayLike) -> Union[float, np.ndarray]:
+    """Distance in meters between broadcastable arrays of points (a float for scalar input)"""
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    # arcsin form; the clip keeps rounding from pushing sqrt(a) past 1 for antipodal points
+    distance = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    return float(distance) if distance.ndim == 0 else distance
+
+
+def distances_from(lat: float, lng: float, lats: ArrayLike, lngs: ArrayLike) -> np.ndarray:
+    """Distances in meters from one point to each of ``lats``/``lngs``"""
+    return np.atleast_1d(distance_m(lat, lng, lats, lngs))
+
+
+def distance_matrix(lats1: ArrayLike, lngs1: ArrayLike,
+                    lats2: Optional[ArrayLike] = None, lngs2: Optional[ArrayLike] = None) -> np.ndarray:
+    """(len(lats1), len(lats2)) matrix of distances in meters; the second set defaults to the first"""
+    lats1, lngs1 = np.asarray(lats1, dtype=float), np.asarray(lngs1, dtype=float)
+    if lats2 is None:
+        lats2, lngs2 = lats1, lngs1
+    lats2, lngs2 = np.asarray(lats2, dtype=float), np.asarray(lngs2, dtype=float)
+    return distance_m(lats1[:, None], lngs1[:, None], lats2[None, :], lngs2[None, :])
+
+
+def bearing_deg(lat1: ArrayLike, lng1: ArrayLike, lat2: ArrayLike, lng2: ArrayLike) -> Union[float, np.ndarray]:
+    """Initial compass bearing in degrees (0 = north, 90 = east) from point 1 towards point 2"""
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lng1, lat2, lng2))
+    delta_lng = lng2 - lng1
+    y = np.sin(delta_lng) * np.cos(lat2)
+    x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(delta_lng)
+    bearing = (np.degrees(np.arctan2(y, x)) + 360) % 360
+    return float(bearing) if bearing.ndim == 0 else bearing
+
+
+def bounding_box(lat: float, lng: float, radius_m: float) -> Tuple[float, float, float, float]:
+    """
+    (min_lat, min_lng, max_lat, max_lng) enclosing every point within ``radius_m`` of the center.
+    Good enough as a prefilter away from the poles and the antimeridian, which this map never reaches.
+    """
+    delta_lat = radius_m / METERS_PER_DEGREE
+    delta_lng = radius_m / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-12))
+    return lat - delta_lat, lng - delta_lng, lat + delta_lat, lng + delta_lng
+
+
+def in_box(lats: ArrayLike, lngs: ArrayLike, box: Tuple[float, float, float, float]) -> np.ndarray:
+    """Boolean mask of the points inside a bounding_box()"""
+    lats, lngs = np.asarray(lats, dtype=float), np.asarray(lngs, dtype=float)
+    min_lat, min_lng, max_lat, max_lng = box
+    return (lats >= min_lat) & (lats <= max_lat) & (lngs >= min_lng) & (lngs <= max_lng)
+
+
+def nearest(lat: float, lng: float, lats: ArrayLike, lngs: ArrayLike,
+            max_distance_m: float = math.inf) -> Tuple[Optional[int], float]:
+    """
+    (index of the closest point strictly within ``max_distance_m``, its distance).
+    Returns (None, inf) when nothing qualifies; ties go to the earliest point.
+    """
+    distances = distances_from(lat, lng, lats, lngs)
+    if not distances.size:
+        return None, math.inf
+    index = int(np.argmin(distances))
+    if not distances[index] < max_distance_m:
+        return None, math.inf
+    return index, float(distances[index])
+
+
+def pairs_within(lats: ArrayLike, lngs: ArrayLike, radius_m: float,
+                 chunk: int = 1024) -> List[Tuple[int, int, float]]:
+    """
+    Every (i, j, distance) with i < j and distance < ``radius_m``, sorted by distance.
+    Points are sorted by latitude so each one is only compared with the band of points
+    whose latitude is within the radius, in chunks to bound memory.
+    """
+    lats, lngs = np.asarray(lats, dtype=float), np.asarray(lngs, dtype=float)
+    order = np.argsort(lats, kind="stable")
+    sorted_lats, sorted_lngs = lats[order], lngs[order]
+    band = radius_m / METERS_PER_DEGREE
+    pairs: List[Tuple[int, int, float]] = []
+    for start in range(0, len(order), chunk):
+        stop = min(start + chunk, len(order))
+        # Partners of this chunk lie between its first point and the last point's latitude + band
+        end = int(np.searchsorted(sorted_lats, sorted_lats[stop - 1] + band, side="right"))
+        block = distance_matrix(sorted_lats[start:stop], sorted_lngs[start:stop],
+                                sorted_lats[start:end], sorted_lngs[start:end])
+        rows, cols = np.nonzero(block < radius_m)
+        for row, col in zip(rows, cols):
+            # Offsets within the block: keep each pair once (partner after the point in sort order)
+            if col > row:
+                i, j = int(order[start + row]), int(order[start + col])
+                pairs.append((min(i, j), max(i, j), float(block[row, col])))
+    pairs.sort(key=lambda pair: (pair[2], pair[0], pair[1]))
+    return pairs
+
+
+def as_arrays(points: Iterable[Tuple[float, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """(lats, lngs) arrays from an iterable of (lat, lng) pairs"""
+    array = np.asarray(list(points), dtype=float).reshape(-1, 2)
+    return array[:, 0], array[:, 1]
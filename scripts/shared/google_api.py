@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Shared synchronous HTTP helper for Google Maps Platform and Nominatim calls
+
+Every request goes through one pooled requests.Session and draws a token from
+the cross-process SharedRateLimiter first, so scripts no longer need their own
+time.sleep() pacing and can safely run side by side. URLs are resolved against
+the GOOGLE_MAPS_BASE_URL / NOMINATIM_BASE_URL overrides (see shared/endpoints.py).
+Below the limiter's ceiling, an AIMD pacer per API (shared/adaptive.py) speeds up
+while responses stay healthy and backs off on OVER_QUERY_LIMIT, 5xx and timeouts. Successful responses are
+read through the shared SQLite PlacesCache, so repeat lookups cost no API call,
+and identical requests within one run are coalesced before they reach the cache.
+Lookups that recently found nothing (ZERO_RESULTS / NOT_FOUND) are answered from
+the negative cache (shared/negative_cache.py) until their retry time.
+Latency, statuses, cache hits and time spent waiting are recorded per endpoint
+in shared/metrics.py.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+import requests
+
+from .adaptive import get_pacer
+from .coalescer import get_coalescer
+from .endpoints import GOOGLE_MAPS_ORIGIN, NOMINATIM_ORIGIN, resolve_url
+from .metrics import get_metrics
+from .negative_cache import get_negative_cache, is_negative, negative_response
+from .places_cache import get_places_cache, ttl_for
+from .rate_limiter import get_rate_limiter
+
+GOOGLE_API_BASE_URL = f"{GOOGLE_MAPS_ORIGIN}/maps/api"
+PLACES_BASE_URL = f"{GOOGLE_API_BASE_URL}/place"
+GEOCODE_URL = f"{GOOGLE_API_BASE_URL}/geocode/json"
+NOMINATIM_SEARCH_URL = f"{NOMINATIM_ORIGIN}/search"
+
+# Seconds every process backs off after Google answers OVER_QUERY_LIMIT
+OVER_QUERY_LIMIT_BACKOFF = 5.0
+
+_session: Optional[requests.Session] = None
+
+
+def http_session() -> requests.Session:
+    """Process-wide keep-alive session"""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
+
+def api_for_url(url: str) -> str:
+    """Map an endpoint URL to the rate-limiter bucket it draws from"""
+    if "nominatim" in url:
+        return "nominatim"
+    if "/geocode/" in url:
+        return "geocoding"
+    return "places"
+
+
+def congestion_reason(error: Exception) -> Optional[str]:
+    """Classify a request failure as an overload signal for the adaptive pacer (None if it is not one)"""
+    if isinstance(error, requests.exceptions.Timeout):
+        return "timeout"
+    response = getattr(error, "response", None)
+    if response is not None and (response.status_code >= 500 or response.status_code == 429):
+        return f"http_{response.status_code}"
+    return None
+
+
+def endpoint_for_url(url: str) -> str:
+    """Cache namespace for an endpoint URL: details, textsearch, findplacefromtext, geocode, nominatim..."""
+    if "nominatim" in url:
+        return "nominatim"
+    parts = [p for p in url.split("?")[0].rstrip("/").split("/") if p and p != "json"]
+    return parts[-1] if parts else url
+
+
+def is_cacheable(data: Any) -> bool:
+    """Only definitive, successful answers are cached (Google status OK or a non-empty Nominatim list)"""
+    if isinstance(data, dict):
+        return data.get("status") == "OK"
+    return isinstance(data, list) and len(data) > 0
+
+
+def response_status(data: Any) -> str:
+    """API-level status of a response: Google's ``status`` field, or OK / ZERO_RESULTS for Nominatim lists"""
+    if isinstance(data, dict):
+        return data.get("status") or "OK"
+    return "OK" if data else "ZERO_RESULTS"
+
+
+def get_json(url: str, params: Dict[str, Any], timeout: float = 20, api: Optional[str] = None,
+             headers: Optional[Dict[str, str]] = None, cache_ttl_days: Optional[float] = None,
+             fingerprint: Optional[str] = None) -> Any:
+    """
+    GET ``url`` through the shared response cache and rate limiter and return the decoded JSON body.
+
+    ``cache_ttl_days`` overrides the configured TTL for this call; 0 forces a fresh
+    request (the response still refreshes the cache). Identical requests made
+    earlier in the same run are answered from memory either way.
+
+    ``fingerprint`` (negative_cache.record_fingerprint of the record being looked up)
+    lets a remembered ZERO_RESULTS / NOT_FOUND lapse as soon as that record is edited.
+
+    Raises requests.exceptions.RequestException on transport/HTTP errors and
+    QuotaExceededError once the API's daily quota is used up.
+    """
+    endpoint = endpoint_for_url(url)
+    return get_coalescer().call(
+        endpoint, params,
+        lambda: _fetch_json(url, endpoint, params, timeout, api, headers, cache_ttl_days, fingerprint),
+    )
+
+
+def _fetch_json(url: str, endpoint: str, params: Dict[str, Any], timeout: float, api: Optional[str],
+                headers: Optional[Dict[str, str]], cache_ttl_days: Optional[float],
+                fingerprint: Optional[str] = None) -> Any:
+    cache = get_places_cache()
+    negative = get_negative_cache()
+    metrics = get_metrics()
+    ttl = ttl_for(endpoint) if cache_ttl_days is None else cache_ttl_days
+    if ttl:
+        cached = cache.get(endpoint, params, ttl_days=ttl)
+        if cached is None:
+            status = negative.check(endpoint, params, fingerprint)
+            if status is not None:
+                cached = negative_response(endpoint, status)
+        metrics.cache(endpoint, hit=cached is not None)
+        if cached is not None:
+            return cached
+
+    api = api or api_for_url(url)
+    limiter = get_rate_limiter()
+    pacer = get_pacer(api)
+    if pacer is not None:
+        slept = pacer.slept
+        pacer.wait()
+        metrics.slept(endpoint, pacer.slept - slept, "adaptive")
+    metrics.slept(endpoint, limiter.acquire(api), "rate_limit")
+
+    started = time.perf_counter()
+    try:
+        response = http_session().get(resolve_url(url), params=params, timeout=timeout, headers=headers)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        reason = congestion_reason(e)
+        metrics.error(endpoint, reason or type(e).__name__, time.perf_counter() - started)
+        if pacer is not None and reason:
+            pacer.controller.record_congestion(reason)
+        raise
+    latency = time.perf_counter() - started
+    data = response.json()
+    metrics.request(endpoint, latency, response_status(data))
+
+    if isinstance(data, dict) and data.get("status") == "OVER_QUERY_LIMIT":
+        limiter.penalize(api, OVER_QUERY_LIMIT_BACKOFF)
+        if pacer is not None:
+            pacer.controller.record_congestion("over_query_limit")
+        return data
+
+    if pacer is not None:
+        pacer.controller.record_success(latency)
+    if is_cacheable(data):
+        cache.put(endpoint, params, data)
+        negative.clear(endpoint, params)
+    elif is_negative(data):
+        negative.record(endpoint, params, response_status(data), fingerprint)
+    return data
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Per-endpoint API metrics for every script run
+
+shared.google_api.get_json, AsyncPlacesClient and the scripts that call other
+HTTP APIs directly report here. Metrics are kept per endpoint (textsearch, details,
+geocode, nominatim, openai_responses...):
+
+- requests sent, responses by API status, errors by reason, retries
+- latency histogram (p50/p95/p99 from a bounded sample, Prometheus buckets)
+- response cache hits/misses and requests answered by in-run coalescing
+- seconds spent sleeping (rate limiter, adaptive pacer, retry backoff) versus
+  seconds waiting on the network
+
+When the process exits, the run's metrics are written to scripts/.cache/metrics/
+as <script>-<timestamp>.json (older runs are pruned to api.metrics.keep_runs)
+and <script>.prom in Prometheus text format, ready for a node_exporter textfile
+collector.
+
+Usage:
+    python shared/metrics.py                              # latest run of every script
+    python shared/metrics.py verify_coordinates_google    # latest run of one script
+    python shared/metrics.py verify_coordinates_google --diff   # vs the run before it
+"""
+
+import argparse
+import atexit
+import bisect
+import json
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Add the scripts directory to the path so we can import from config
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.loader import load_common_config
+from shared.endpoints import state_path
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Latencies kept per endpoint for exact quantiles (reservoir sampled beyond this)
+SAMPLE_SIZE = 4096
+
+PROMETHEUS_PREFIX = "upstate_map_api"
+
+
+def metrics_settings() -> Dict[str, Any]:
+    return load_common_config().get("api", {}).get("metrics", {})
+
+
+class LatencyHistogram:
+    """Cumulative buckets for Prometheus plus a bounded sample for quantiles"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS, sample_size: int = SAMPLE_SIZE):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.sample_size = sample_size
+        self._samples: List[float] = []
+        self._rng = random.Random(0)
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        if len(self._samples) < self.sample_size:
+            self._samples.append(seconds)
+        else:
+            slot = self._rng.randrange(self.count)
+            if slot < self.sample_size:
+                self._samples[slot] = seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, count) pairs as Prometheus expects, ending with +Inf"""
+        pairs, running = [], 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            pairs.append((f"{bound:g}", running))
+        pairs.append(("+Inf", self.count))
+        return pairs
+
+    def snapshot(self) -> Dict[str, Any]:
+        def ms(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value * 1000, 1)
+
+        return {
+            'count': self.count,
+            'sum_s': round(self.sum, 4),
+            'max_ms': ms(self.max),
+            'p50_ms': ms(self.quantile(0.5)),
+            'p95_ms': ms(self.quantile(0.95)),
+            'p99_ms': ms(self.quantile(0.99)),
+            'buckets': dict(self.cumulative()),
+        }
+
+
+class EndpointMetrics:
+    """Counters and latency for one endpoint"""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.coalesced = 0
+        self.statuses: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.sleep_s: Dict[str, float] = {}
+        self.latency = LatencyHistogram()
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'errors': dict(self.errors),
+            'statuses': dict(self.statuses),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'cache_hit_ratio': round(self.cache_hits / lookups, 4) if lookups else None,
+            'coalesced': self.coalesced,
+            'network_s': round(self.latency.sum, 4),
+            'sleep_s': {reason: round(seconds, 4) for reason, seconds in self.sleep_s.items()},
+            'latency': self.latency.snapshot(),
+        }
+
+
+class _Call:
+    """Handle yielded by RunMetrics.track(); set ``status`` to the API's answer"""
+
+    def __init__(self):
+        self.status: Optional[str] = None
+
+
+class RunMetrics:
+    """All endpoint metrics of one script run"""
+
+    def __init__(self, run: Optional[str] = None):
+        self.run = run or Path(sys.argv[0]).stem or "python"
+        self.started_at = time.time()
+        self.endpoints: Dict[str, EndpointMetrics] = {}
+        self._lock = threading.Lock()
+
+    def endpoint(self, name: str) -> EndpointMetrics:
+        if name not in self.endpoints:
+            self.endpoints[name] = EndpointMetrics()
+        return self.endpoints[name]
+
+    def request(self, endpoint: str, seconds: float, status: Optional[str] = None) -> None:
+        """One request that got an HTTP response; ``status`` is the API-level status (OK, ZERO_RESULTS...)"""
+        with self._lock:
+            metrics = self.endpoint(endpoint)
+            metrics.requests += 1
+            metrics.latency.observe(seconds)
+            status = status or "OK"
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def error(self, endpoint: str, reason: str, seconds: Optional[float] = None) -> None:
+        """One request that failed (timeout, http_503, ConnectionError...)"""
+        with self._lock:
+            metrics = self.endpoint(endpoint)
+            metrics.requests += 1
+            metrics.errors[reason] = metrics.errors.get(reason, 0) + 1
+            if seconds is not None:
+                metrics.latency.observe(seconds)
+
+    def retry(self, endpoint: str) -> None:
+        """Count a retry; the caller sleeps its backoff itself and reports it with slept(..., "backoff")"""
+        with self._lock:
+            self.endpoint(endpoint).retries += 1
+
+    def cache(self, endpoint: str, hit: bool) -> None:
+        with self._lock:
+            metrics = self.endpoint(endpoint)
+            if hit:
+                metrics.cache_hits += 1
+            else:
+                metrics.cache_misses += 1
+
+    def coalesced(self, endpoint: str) -> None:
+        with self._lock:
+            self.endpoint(endpoint).coalesced += 1
+
+    def slept(self, endpoint: str, seconds: float, reason: str) -> None:
+        """Record time spent waiting before a request (rate_limit, adaptive, backoff)"""
+        if seconds <= 0:
+            return
+        with self._lock:
+            sleep = self.endpoint(endpoint).sleep_s
+            sleep[reason] = sleep.get(reason, 0.0) + seconds
+
+    @contextmanager
+    def track(self, endpoint: str) -> Iterator[_Call]:
+        """Time one request made outside get_json; exceptions are recorded as errors and re-raised"""
+        call = _Call()
+        started = time.perf_counter()
+        try:
+            yield call
+        except Exception as e:
+            self.error(endpoint, type(e).__name__, time.perf_counter() - started)
+            raise
+        self.request(endpoint, time.perf_counter() - started, call.status)
+
+    # ------------------------------
+    # Output
+    # ------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'run': self.run,
+                'started_at': datetime.fromtimestamp(self.started_at).isoformat(),
+                'duration_s': round(time.time() - self.started_at, 3),
+                'endpoints': {name: metrics.snapshot() for name, metrics in sorted(self.endpoints.items())},
+            }
+
+    def to_prometheus(self) -> str:
+        return prometheus_text(self.snapshot())
+
+    def summary(self) -> List[str]:
+        return summary_lines(self.snapshot())
+
+    def write(self, directory: Optional[Path] = None, keep_runs: Optional[int] = None) -> Tuple[Path, Path]:
+        """Write <run>-<timestamp>.json and <run>.prom; returns both paths"""
+        directory = Path(directory) if directory else state_path(None, "metrics")
+        directory.mkdir(parents=True, exist_ok=True)
+        snapshot = self.snapshot()
+        stamp = datetime.fromtimestamp(self.started_at).strftime("%Y%m%d-%H%M%S")
+        json_path = directory / f"{self.run}-{stamp}.json"
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, indent=2)
+        # Write then rename so a scraper never reads a half-written file
+        prom_path = directory / f"{self.run}.prom"
+        tmp_path = prom_path.with_suffix(".prom.tmp")
+        tmp_path.write_text(prometheus_text(snapshot), encoding='utf-8')
+        tmp_path.replace(prom_path)
+
+        keep_runs = metrics_settings().get("keep_runs", 20) if keep_runs is None else keep_runs
+        if keep_runs > 0:
+            for old in run_files(self.run, directory)[:-keep_runs]:
+                old.unlink()
+        return json_path, prom_path
+
+
+def _label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(snapshot: Dict[str, Any]) -> str:
+    """Prometheus text exposition format for one run snapshot"""
+    families: Dict[str, Tuple[str, str, List[str]]] = {}
+
+    def sample(name: str, kind: str, help_text: str, value: float, suffix: str = "", **labels: Any) -> None:
+        name = f"{PROMETHEUS_PREFIX}_{name}"
+        label_text = ",".join(f'{key}="{_label(val)}"' for key, val in dict(run=snapshot['run'], **labels).items())
+        families.setdefault(name, (kind, help_text, []))[2].append(f"{name}{suffix}{{{label_text}}} {value:g}")
+
+    for endpoint, metrics in snapshot['endpoints'].items():
+        sample("requests_total", "counter", "HTTP requests sent", metrics['requests'], endpoint=endpoint)
+        for status, count in metrics['statuses'].items():
+            sample("responses_total", "counter", "Responses by API status", count, endpoint=endpoint, status=status)
+        for reason, count in metrics['errors'].items():
+            sample("errors_total", "counter", "Failed requests by reason", count, endpoint=endpoint, reason=reason)
+        sample("retries_total", "counter", "Requests retried by the caller", metrics['retries'], endpoint=endpoint)
+        for result, count in (("hit", metrics['cache_hits']), ("miss", metrics['cache_misses'])):
+            sample("cache_lookups_total", "counter", "Response cache lookups", count, endpoint=endpoint, result=result)
+        sample("coalesced_total", "counter", "Requests answered by in-run coalescing", metrics['coalesced'],
+               endpoint=endpoint)
+        for reason, seconds in metrics['sleep_s'].items():
+            sample("sleep_seconds_total", "counter", "Seconds spent waiting before requests", seconds,
+                   endpoint=endpoint, reason=reason)
+
+        latency = metrics['latency']
+        for le, count in latency['buckets'].items():
+            sample("request_duration_seconds", "histogram", "Request latency", count, "_bucket",
+                   endpoint=endpoint, le=le)
+        sample("request_duration_seconds", "histogram", "Request latency", latency['sum_s'], "_sum", endpoint=endpoint)
+        sample("request_duration_seconds", "histogram", "Request latency", latency['count'], "_count",
+               endpoint=endpoint)
+
+    sample("run_duration_seconds", "gauge", "Wall time of the run", snapshot['duration_s'])
+
+    lines = []
+    for name, (kind, help_text, samples) in families.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+def summary_lines(snapshot: Dict[str, Any]) -> List[str]:
+    """One line per endpoint: requests, latency quantiles, cache ratio, sleep vs network time"""
+    lines = []
+    for endpoint, metrics in snapshot['endpoints'].items():
+        latency = metrics['latency']
+        ratio = metrics['cache_hit_ratio']
+        line = f"{endpoint}: {metrics['requests']} sent"
+        if latency['count']:
+            line += f", p50 {latency['p50_ms']:g} ms, p95 {latency['p95_ms']:g} ms"
+        if ratio is not None:
+            line += f", cache {ratio:.0%} of {metrics['cache_hits'] + metrics['cache_misses']}"
+        if metrics['coalesced']:
+            line += f", {metrics['coalesced']} coalesced"
+        if metrics['retries']:
+            line += f", {metrics['retries']} retries"
+        errors = sum(metrics['errors'].values())
+        if errors:
+            line += f", {errors} errors"
+        line += f", {sum(metrics['sleep_s'].values()):.1f}s sleeping / {metrics['network_s']:.1f}s on the network"
+        lines.append(line)
+    return lines
+
+
+_shared_metrics: Optional[RunMetrics] = None
+
+
+def get_metrics() -> RunMetrics:
+    """Process-wide metrics; written to scripts/.cache/metrics when the process exits"""
+    global _shared_metrics
+    if _shared_metrics is None:
+        _shared_metrics = RunMetrics()
+        if metrics_settings().get("enabled", True):
+            atexit.register(_write_at_exit)
+    return _shared_metrics
+
+
+def _write_at_exit() -> None:
+    if _shared_metrics is None or not _shared_metrics.endpoints:
+        return
+    try:
+        json_path, _ = _shared_metrics.write()
+        print(f"📈 API metrics written to {json_path}")
+    except OSError as e:
+        print(f"⚠️  Could not write API metrics: {e}")
+
+
+# ------------------------------
+# CLI
+# ------------------------------
+
+def _run_name(path: Path) -> str:
+    # <run>-<YYYYmmdd>-<HHMMSS>.json; run names may contain dashes themselves
+    return path.stem.rsplit("-", 2)[0]
+
+
+def run_files(run: str, directory: Path) -> List[Path]:
+    """JSON snapshots of ``run``, oldest first"""
+    return [path for path in sorted(directory.glob(f"{run}-*.json")) if _run_name(path) == run]
+
+
+def latest_runs(directory: Path) -> Dict[str, Path]:
+    latest: Dict[str, Path] = {}
+    for path in sorted(directory.glob("*-*.json")):
+        latest[_run_name(path)] = path
+    return latest
+
+
+def diff_lines(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    lines = []
+    for endpoint in sorted(set(old['endpoints']) | set(new['endpoints'])):
+        before = old['endpoints'].get(endpoint)
+        after = new['endpoints'].get(endpoint)
+        if before is None or after is None:
+            lines.append(f"{endpoint}: only in the {'new' if before is None else 'old'} run")
+            continue
+        parts = [f"requests {before['requests']} -> {after['requests']}"]
+        for quantile in ("p50_ms", "p95_ms"):
+            a, b = before['latency'][quantile], after['latency'][quantile]
+            if a is not None and b is not None:
+                parts.append(f"{quantile[:3]} {a:g} -> {b:g} ms")
+        a, b = before['cache_hit_ratio'], after['cache_hit_ratio']
+        if a is not None and b is not None:
+            parts.append(f"cache {a:.0%} -> {b:.0%}")
+        parts.append(f"retries {before['retries']} -> {after['retries']}")
+        lines.append(f"{endpoint}: " + ", ".join(parts))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the API metrics recorded by script runs")
+    parser.add_argument("run", nargs="?", help="Script name (e.g. verify_coordinates_google); default: all")
+    parser.add_argument("--diff", action="store_true", help="Compare the latest run with the one before it")
+    parser.add_argument("--prometheus", action="store_true", help="Print the latest run in Prometheus format")
+    args = parser.parse_args()
+
+    directory = state_path(None, "metrics")
+    if args.run:
+        files = run_files(args.run, directory)
+        runs = {args.run: files[-1]} if files else {}
+    else:
+        runs = latest_runs(directory) if directory.exists() else {}
+    if not runs:
+        print(f"No metrics recorded in {directory}")
+        return
+
+    for run, path in sorted(runs.items()):
+        with open(path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        if args.prometheus:
+            print(prometheus_text(snapshot), end="")
+            continue
+        print(f"📈 {run} ({snapshot['started_at']}, {snapshot['duration_s']:.1f}s)")
+        if args.diff:
+            files = run_files(run, directory)
+            if len(files) < 2:
+                print("  (no earlier run to compare with)")
+                continue
+            with open(files[-2], 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+            print(f"  vs {previous['started_at']}:")
+            for line in diff_lines(previous, snapshot):
+                print(f"  {line}")
+        else:
+            for line in summary_lines(snapshot):
+                print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
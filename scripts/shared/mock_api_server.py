@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Google Places, Geocoding and Nominatim endpoints
+
+Implements the endpoints the scripts call:
+    /maps/api/place/textsearch/json
+    /maps/api/place/findplacefromtext/json
+    /maps/api/place/details/json
+    /maps/api/geocode/json
+    /nominatim/search
+
+Replay mode (default) answers from recorded fixtures; requests without a fixture
+get a deterministic synthetic answer (or ZERO_RESULTS with --fallback zero).
+Record mode forwards each request to the real API and stores the response
+(without the API key) in the fixture file. Latency, HTTP errors and
+OVER_QUERY_LIMIT answers can be injected to exercise retry and pacing code.
+
+Point any script at it with GOOGLE_MAPS_BASE_URL / NOMINATIM_BASE_URL, or with
+--base-url on scripts that take arguments:
+
+    python shared/mock_api_server.py --port 8765 --latency 50 --oql-rate 0.02
+    GOOGLE_MAPS_BASE_URL=http://127.0.0.1:8765 \\
+    NOMINATIM_BASE_URL=http://127.0.0.1:8765/nominatim python maintenance/verify_coordinates_google.py
+
+    python shared/mock_api_server.py --record     # capture real responses into fixtures
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from aiohttp import ClientSession, ClientTimeout, web
+
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from shared.endpoints import GOOGLE_MAPS_ORIGIN, NOMINATIM_ORIGIN
+from shared.places_cache import request_key
+
+DEFAULT_FIXTURES = Path(__file__).resolve().parent.parent / "data" / "api_fixtures.jsonl"
+
+# Synthetic places are scattered over New York State
+NY_BBOX = (40.5, -79.8, 45.0, -71.9)  # south, west, north, east
+
+PLACE_ENDPOINTS = ("textsearch", "findplacefromtext", "details")
+
+
+def stable_seed(key: str) -> int:
+    return int(hashlib.sha1(key.encode("utf-8")).hexdigest()[:12], 16)
+
+
+def synthetic_place(seed_key: str, name: Optional[str] = None, place_id: Optional[str] = None) -> Dict[str, Any]:
+    rng = random.Random(stable_seed(seed_key))
+    south, west, north, east = NY_BBOX
+    place_id = place_id or "mock_" + hashlib.sha1(seed_key.encode("utf-8")).hexdigest()[:20]
+    return {
+        "place_id": place_id,
+        "name": name or f"Place {place_id[-6:]}",
+        "formatted_address": f"{rng.randint(1, 9999)} Main St, NY, USA",
+        "geometry": {"location": {"lat": round(rng.uniform(south, north), 7), "lng": round(rng.uniform(west, east), 7)}},
+        "business_status": "OPERATIONAL",
+        "types": ["point_of_interest", "establishment"],
+    }
+
+
+def synthetic_response(endpoint: str, params: Dict[str, str]) -> Any:
+    """Deterministic plausible answer for a request with no recorded fixture"""
+    if endpoint == "details":
+        return {"status": "OK", "result": synthetic_place(params.get("place_id", ""), place_id=params.get("place_id"))}
+    if endpoint == "textsearch":
+        query = params.get("query", "")
+        return {"status": "OK", "results": [synthetic_place(query, name=query.split(",")[0])]}
+    if endpoint == "findplacefromtext":
+        text = params.get("input", "")
+        return {"status": "OK", "candidates": [synthetic_place(text, name=text.split(",")[0])]}
+    if endpoint == "geocode":
+        address = params.get("address", "")
+        place = synthetic_place(address)
+        place["formatted_address"] = address or place["formatted_address"]
+        return {"status": "OK", "results": [place]}
+    if endpoint == "nominatim":
+        place = synthetic_place(params.get("q", ""))
+        location = place["geometry"]["location"]
+        return [{"lat": str(location["lat"]), "lon": str(location["lng"]), "display_name": params.get("q", "")}]
+    return {"status": "INVALID_REQUEST"}
+
+
+def empty_response(endpoint: str) -> Any:
+    if endpoint == "nominatim":
+        return []
+    if endpoint == "details":
+        return {"status": "NOT_FOUND"}
+    return {"status": "ZERO_RESULTS", "results": [], "candidates": []}
+
+
+class MockApiServer:
+    """aiohttp application serving fixtures, synthetic answers and injected faults"""
+
+    def __init__(self, fixtures_path: Path = DEFAULT_FIXTURES, record: bool = False, fallback: str = "synthetic",
+                 latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0, oql_rate: float = 0,
+                 seed: Optional[int] = None):
+        self.fixtures_path = Path(fixtures_path)
+        self.record = record
+        self.fallback = fallback
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.oql_rate = oql_rate
+        self.rng = random.Random(seed)
+        self.fixtures: Dict[str, Any] = {}
+        self.stats: Dict[str, int] = {"requests": 0, "replayed": 0, "synthetic": 0, "recorded": 0,
+                                      "errors_injected": 0, "oql_injected": 0}
+        self.by_endpoint: Dict[str, int] = {}
+        self._upstream: Optional[ClientSession] = None
+        self._load_fixtures()
+
+    def _load_fixtures(self) -> None:
+        if not self.fixtures_path.exists():
+            return
+        with open(self.fixtures_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                self.fixtures[request_key(entry["endpoint"], entry["params"])] = entry["response"]
+
+    def _save_fixture(self, endpoint: str, params: Dict[str, str], response: Any) -> None:
+        self.fixtures_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.fixtures_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"endpoint": endpoint, "params": params, "response": response}, ensure_ascii=False) + "\n")
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/maps/api/place/{endpoint}/json", self.handle_place)
+        app.router.add_get("/maps/api/geocode/json", self.handle_geocode)
+        app.router.add_get("/nominatim/search", self.handle_nominatim)
+        app.router.add_get("/__stats", self.handle_stats)
+        app.on_cleanup.append(self._close_upstream)
+        return app
+
+    async def _close_upstream(self, app: web.Application) -> None:
+        if self._upstream is not None:
+            await self._upstream.close()
+
+    async def handle_place(self, request: web.Request) -> web.StreamResponse:
+        endpoint = request.match_info["endpoint"]
+        if endpoint not in PLACE_ENDPOINTS:
+            return web.json_response({"status": "INVALID_REQUEST"}, status=404)
+        return await self.respond(request, endpoint, f"{GOOGLE_MAPS_ORIGIN}/maps/api/place/{endpoint}/json")
+
+    async def handle_geocode(self, request: web.Request) -> web.StreamResponse:
+        return await self.respond(request, "geocode", f"{GOOGLE_MAPS_ORIGIN}/maps/api/geocode/json")
+
+    async def handle_nominatim(self, request: web.Request) -> web.StreamResponse:
+        return await self.respond(request, "nominatim", f"{NOMINATIM_ORIGIN}/search")
+
+    async def handle_stats(self, request: web.Request) -> web.StreamResponse:
+        return web.json_response({**self.stats, "by_endpoint": self.by_endpoint})
+
+    async def respond(self, request: web.Request, endpoint: str, upstream_url: str) -> web.StreamResponse:
+        self.stats["requests"] += 1
+        self.by_endpoint[endpoint] = self.by_endpoint.get(endpoint, 0) + 1
+
+        if self.latency_ms or self.jitter_ms:
+            delay = self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)
+            await asyncio.sleep(max(0.0, delay) / 1000)
+
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.stats["errors_injected"] += 1
+            return web.json_response({"error": "injected failure"}, status=500)
+        if self.oql_rate and endpoint != "nominatim" and self.rng.random() < self.oql_rate:
+            self.stats["oql_injected"] += 1
+            return web.json_response({"status": "OVER_QUERY_LIMIT", "results": [], "candidates": []})
+
+        params = dict(request.query)
+        stored_params = {k: v for k, v in params.items() if k != "key"}
+        key = request_key(endpoint, stored_params)
+
+        if self.record:
+            body = await self.fetch_upstream(request, upstream_url, params)
+            if body is None:
+                return web.json_response({"error": "upstream request failed"}, status=502)
+            self.fixtures[key] = body
+            self._save_fixture(endpoint, stored_params, body)
+            self.stats["recorded"] += 1
+            return web.json_response(body)
+
+        if key in self.fixtures:
+            self.stats["replayed"] += 1
+            return web.json_response(self.fixtures[key])
+
+        self.stats["synthetic"] += 1
+        if self.fallback == "synthetic":
+            return web.json_response(synthetic_response(endpoint, stored_params))
+        return web.json_response(empty_response(endpoint))
+
+    async def fetch_upstream(self, request: web.Request, url: str, params: Dict[str, str]) -> Any:
+        if self._upstream is None:
+            self._upstream = ClientSession(timeout=ClientTimeout(total=30))
+        headers = {"User-Agent": request.headers.get("User-Agent", "scenic-ny-map-mock/1.0")}
+        try:
+            async with self._upstream.get(url, params=params, headers=headers) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+        except Exception as e:
+            print(f"⚠️  Upstream {url} failed: {e}")
+            return None
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local mock of the Google Places/Geocoding and Nominatim APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURES, help="JSON-lines fixture file")
+    parser.add_argument("--record", action="store_true", help="Forward to the real APIs and record the responses")
+    parser.add_argument("--fallback", choices=["synthetic", "zero"], default="synthetic",
+                        help="Answer for requests without a fixture (default: synthetic)")
+    parser.add_argument("--latency", type=float, default=0, help="Added latency per request in ms")
+    parser.add_argument("--jitter", type=float, default=0, help="Random +/- latency jitter in ms")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--oql-rate", type=float, default=0, help="Fraction of requests answered OVER_QUERY_LIMIT")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for latency/fault injection")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    server = MockApiServer(
+        fixtures_path=args.fixtures, record=args.record, fallback=args.fallback,
+        latency_ms=args.latency, jitter_ms=args.jitter, error_rate=args.error_rate,
+        oql_rate=args.oql_rate, seed=args.seed,
+    )
+    mode = "record" if args.record else f"replay ({len(server.fixtures)} fixtures, fallback: {args.fallback})"
+    print(f"🧪 Mock API server on http://{args.host}:{args.port} — {mode}")
+    print(f"   GOOGLE_MAPS_BASE_URL=http://{args.host}:{args.port} "
+          f"NOMINATIM_BASE_URL=http://{args.host}:{args.port}/nominatim")
+    web.run_app(server.app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
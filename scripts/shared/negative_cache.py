@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Negative cache for lookups that found nothing (ZERO_RESULTS / NOT_FOUND)
+
+The response cache only keeps successful answers, so a record Google cannot
+resolve used to be searched again on every run. Here such answers are remembered
+per request (endpoint, normalized query or place_id, and the location, bias
+and radius it was searched with), and the lookup is
+skipped until its retry time. Each further miss doubles the retry interval
+(retry_days, then x backoff_factor, capped at max_retry_days); a successful
+answer for the same query clears the entry.
+
+Callers that know which record a lookup is for pass a fingerprint of its name,
+location and place_query: an entry recorded under another fingerprint is
+dropped, so editing the record makes it eligible again immediately.
+
+Entries live in a ``negative`` table next to the response cache.
+
+Usage:
+    python shared/negative_cache.py            # list entries
+    python shared/negative_cache.py --clear    # forget every entry
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from shared.address_normalizer import normalize_query
+from shared.endpoints import state_path
+from shared.places_cache import DAY_SECONDS, DEFAULT_CACHE_PATH, QUERY_PARAMS, cache_settings, request_key
+
+# Answers that mean "nothing to find" rather than "try again later"
+NEGATIVE_STATUSES = ("ZERO_RESULTS", "NOT_FOUND")
+
+RECORD_FIELDS = ("name", "location", "place_query")
+
+# Parameters that shape a response but not whether anything is found
+RESPONSE_PARAMS = ("fields",)
+
+
+def record_fingerprint(record: Dict[str, Any], fields: Iterable[str] = RECORD_FIELDS) -> str:
+    """Short hash of the record fields a lookup is built from"""
+    values = "\x1f".join(normalize_query(record.get(field) or "") for field in fields)
+    return hashlib.sha1(values.encode("utf-8")).hexdigest()[:16]
+
+
+def negative_key(endpoint: str, params: Dict[str, Any]) -> Optional[str]:
+    """
+    request_key of the lookup without its field list, so the same text searched around another town
+    is its own entry; None for requests without a subject (query or place_id)
+    """
+    if not any(params.get(p) for p in (*QUERY_PARAMS, "place_id")):
+        return None
+    return request_key(endpoint, {k: v for k, v in params.items() if k not in RESPONSE_PARAMS})
+
+
+def is_negative(data: Any) -> bool:
+    """A definitive "nothing here" answer: Google ZERO_RESULTS/NOT_FOUND or an empty Nominatim list"""
+    if isinstance(data, dict):
+        return data.get("status") in NEGATIVE_STATUSES
+    return isinstance(data, list) and not data
+
+
+def negative_response(endpoint: str, status: str) -> Any:
+    """Stand-in for the remembered answer, shaped like the endpoint's real response"""
+    if endpoint == "nominatim":
+        return []
+    return {"status": status, "results": [], "candidates": [], "negative_cache": True}
+
+
+class NegativeCache:
+    """Remembered misses with exponentially growing retry intervals"""
+
+    def __init__(self, db_path: Path = DEFAULT_CACHE_PATH, retry_days: float = 7, backoff_factor: float = 2,
+                 max_retry_days: float = 180, enabled: bool = True):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.retry_days = retry_days
+        self.backoff_factor = backoff_factor
+        self.max_retry_days = max_retry_days
+        self.enabled = enabled
+        self.stats = {"skipped": 0, "recorded": 0, "cleared": 0, "invalidated": 0}
+
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS negative ("
+            " key TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " fingerprint TEXT,"
+            " attempts INTEGER NOT NULL,"
+            " first_seen REAL NOT NULL,"
+            " last_seen REAL NOT NULL,"
+            " retry_at REAL NOT NULL)"
+        )
+        # Keys held in memory so successful lookups only touch the database when they clear an entry
+        self._keys: Set[str] = {row[0] for row in self._conn.execute("SELECT key FROM negative")}
+
+    def retry_interval(self, attempts: int) -> float:
+        """Days until the next attempt after ``attempts`` consecutive misses"""
+        return min(self.max_retry_days, self.retry_days * self.backoff_factor ** max(0, attempts - 1))
+
+    def check(self, endpoint: str, params: Dict[str, Any], fingerprint: Optional[str] = None,
+              peek: bool = False) -> Optional[str]:
+        """Remembered status (ZERO_RESULTS, NOT_FOUND...) if the lookup should be skipped, else None"""
+        key = negative_key(endpoint, params)
+        if not self.enabled or key is None or key not in self._keys:
+            return None
+        row = self._conn.execute(
+            "SELECT status, fingerprint, retry_at FROM negative WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self._keys.discard(key)
+            return None
+        status, stored_fingerprint, retry_at = row
+        if fingerprint and stored_fingerprint and fingerprint != stored_fingerprint:
+            # The record changed since it failed to resolve: give it a fresh chance
+            if not peek:
+                self._delete(key)
+                self.stats["invalidated"] += 1
+            return None
+        if retry_at <= time.time():
+            return None
+        if not peek:
+            self.stats["skipped"] += 1
+        return status
+
+    def remembered(self, endpoint: str, params: Dict[str, Any]) -> Optional[str]:
+        """Stored status for the lookup whether or not its retry time has passed (None if never missed)"""
+        key = negative_key(endpoint, params)
+        if key is None or key not in self._keys:
+            return None
+        row = self._conn.execute("SELECT status FROM negative WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def record(self, endpoint: str, params: Dict[str, Any], status: str, fingerprint: Optional[str] = None) -> None:
+        key = negative_key(endpoint, params)
+        if not self.enabled or key is None:
+            return
+        now = time.time()
+        row = self._conn.execute("SELECT attempts, first_seen, fingerprint FROM negative WHERE key = ?", (key,)).fetchone()
+        attempts, first_seen = (row[0] + 1, row[1]) if row and row[2] == fingerprint else (1, now)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO negative (key, status, fingerprint, attempts, first_seen, last_seen, retry_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, status, fingerprint, attempts, first_seen, now, now + self.retry_interval(attempts) * DAY_SECONDS),
+        )
+        self._keys.add(key)
+        self.stats["recorded"] += 1
+
+    def clear(self, endpoint: str, params: Dict[str, Any]) -> None:
+        """Forget a remembered miss once the lookup succeeds"""
+        key = negative_key(endpoint, params)
+        if key is not None and key in self._keys:
+            self._delete(key)
+            self.stats["cleared"] += 1
+
+    def _delete(self, key: str) -> None:
+        self._conn.execute("DELETE FROM negative WHERE key = ?", (key,))
+        self._keys.discard(key)
+
+    def entries(self) -> Iterable[tuple]:
+        return self._conn.execute(
+            "SELECT key, status, attempts, first_seen, retry_at FROM negative ORDER BY retry_at"
+        ).fetchall()
+
+    def clear_all(self) -> int:
+        count = self._conn.execute("DELETE FROM negative").rowcount
+        self._keys.clear()
+        return count
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_shared_negative: Optional[NegativeCache] = None
+
+
+def get_negative_cache() -> NegativeCache:
+    """Process-wide negative cache (common.json api.google_maps.response_cache.negative)"""
+    global _shared_negative
+    if _shared_negative is None:
+        settings = cache_settings()
+        negative = settings.get("negative", {})
+        _shared_negative = NegativeCache(
+            db_path=state_path(settings.get("path"), DEFAULT_CACHE_PATH.name),
+            retry_days=negative.get("retry_days", 7),
+            backoff_factor=negative.get("backoff_factor", 2),
+            max_retry_days=negative.get("max_retry_days", 180),
+            enabled=negative.get("enabled", True),
+        )
+    return _shared_negative
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the negative lookup cache")
+    parser.add_argument("--clear", action="store_true", help="Forget every remembered miss")
+    args = parser.parse_args()
+
+    cache = get_negative_cache()
+    if args.clear:
+        print(f"🧹 Cleared {cache.clear_all()} entries")
+        return
+    entries = cache.entries()
+    print(f"🚫 Negative cache ({cache.db_path}): {len(entries)} entries")
+    for key, status, attempts, first_seen, retry_at in entries:
+        since = datetime.fromtimestamp(first_seen).date().isoformat()
+        retry = datetime.fromtimestamp(retry_at).date().isoformat()
+        print(f"  {key}: {status} x{attempts} since {since}, retry after {retry}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Bulk refresh of stale or obsolete place IDs
+
+Google retires and re-issues place IDs over time; a Details call against a
+retired ID answers NOT_FOUND, and every verification or status run used to pay
+for that answer again. This module finds the IDs worth re-checking across all
+registered datasets and refreshes them with the cheapest requests there are:
+
+1. Place Details with fields=place_id only. Google answers this "ID refresh"
+   without charge; the result's place_id is the current ID (it differs from
+   the one we sent when Google has migrated the place).
+2. For IDs Details no longer knows (NOT_FOUND / INVALID_REQUEST), Find Place
+   from Text with fields=place_id only (the free ID-only SKU), biased to a
+   circle of the dataset's match radius around the record. A single candidate
+   replaces the old ID; none or several leave the record for enrichment.
+
+A place_id is a candidate when the negative cache remembers Details failing
+for it, when its record was never refreshed, or when the last refresh
+(``place_id_refreshed_at``) is older than the maximum age. Outcomes are
+applied per dataset file with one load and one atomic write, like the
+coordinate correction patches.
+"""
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .datasets import DATASETS, DatasetDocument, walk_records
+from .negative_cache import get_negative_cache
+
+REFRESH_FIELDS = "place_id"
+REFRESHED_FIELD = "place_id_refreshed_at"
+DEFAULT_MAX_AGE_DAYS = 365
+
+# Details answers meaning the ID itself is no longer valid
+OBSOLETE_STATUSES = ("NOT_FOUND", "INVALID_REQUEST")
+
+# Why a place_id was picked, and what the refresh found
+REASONS = ("failed", "unchecked", "stale")
+OUTCOMES = ("current", "changed", "replaced", "unresolved", "ambiguous", "error")
+
+
+def maps_url(place_id: str) -> str:
+    return f"https://www.google.com/maps/place/?q=place_id:{place_id}"
+
+
+def _parse_iso(value: Any) -> Optional[datetime]:
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def refresh_reason(record: Dict[str, Any], max_age_days: float, failed: bool) -> Optional[str]:
+    """Why the record's place_id is due for a refresh, or None if it is not"""
+    if failed:
+        return "failed"
+    refreshed_at = _parse_iso(record.get(REFRESHED_FIELD)) if record.get(REFRESHED_FIELD) else None
+    if refreshed_at is None:
+        return "unchecked"
+    if datetime.now(timezone.utc) - refreshed_at > timedelta(days=max_age_days):
+        return "stale"
+    return None
+
+
+def find_query(record: Dict[str, Any]) -> str:
+    """Find Place input for a record whose ID is gone: its place_query, else name plus location"""
+    if record.get('place_query'):
+        return record['place_query']
+    parts = [record.get('name') or '', record.get('location') or record.get('address') or '']
+    return " ".join(part for part in parts if part).strip()
+
+
+def collect_targets(data_dir: Optional[Path] = None, max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+                    failed_only: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    place_id -> {"reason", "query", "lat", "lng", "radius_m", "keys"} for every ID due for a refresh.
+    A place_id shared by several records is refreshed once; the first record supplies the fallback query.
+    """
+    negative = get_negative_cache()
+    targets: Dict[str, Dict[str, Any]] = {}
+    for handle in walk_records(data_dir=data_dir, write_back=False):
+        place_id = handle.get('place_id')
+        if not isinstance(place_id, str) or not place_id:
+            continue
+        target = targets.get(place_id)
+        if target is not None:
+            target['keys'].append(handle.key)
+            continue
+        failed = negative.remembered('details', {'place_id': place_id}) in OBSOLETE_STATUSES
+        reason = refresh_reason(handle.record, max_age_days, failed)
+        if reason is None or (failed_only and reason != "failed"):
+            continue
+        targets[place_id] = {
+            'reason': reason,
+            'query': find_query(handle.record),
+            'lat': handle.lat,
+            'lng': handle.lng,
+            'radius_m': handle.dataset.match_radius_m,
+            'keys': [handle.key],
+        }
+    return targets
+
+
+async def refresh_place_id(client, place_id: str, target: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+    """(outcome, current place_id) for one ID through an open AsyncPlacesClient"""
+    data = await client.get_json('details', {'place_id': place_id, 'fields': REFRESH_FIELDS})
+    if data is None:
+        return "error", None
+    if data.get('status') == 'OK':
+        current = (data.get('result') or {}).get('place_id') or place_id
+        return ("current" if current == place_id else "changed"), current
+    if data.get('status') not in OBSOLETE_STATUSES:
+        return "error", None
+    if not target.get('query'):
+        return "unresolved", None
+
+    params = {'input': target['query'], 'inputtype': 'textquery', 'fields': REFRESH_FIELDS}
+    if target.get('lat') is not None and target.get('lng') is not None:
+        params['locationbias'] = f"circle:{target['radius_m']:.0f}@{target['lat']},{target['lng']}"
+    data = await client.get_json('findplacefromtext', params)
+    if data is None:
+        return "error", None
+    candidates = [c.get('place_id') for c in data.get('candidates') or [] if c.get('place_id')]
+    if data.get('status') not in ('OK', 'ZERO_RESULTS'):
+        return "error", None
+    if not candidates:
+        return "unresolved", None
+    if len(set(candidates)) > 1:
+        return "ambiguous", None
+    return "replaced", candidates[0]
+
+
+class RefreshResult:
+    """Outcomes of one refresh run plus the records and files it rewrote"""
+
+    def __init__(self):
+        self.outcomes: Dict[str, Tuple[str, Optional[str]]] = {}
+        self.records_updated = 0
+        self.files_written: List[Path] = []
+
+    def add(self, place_id: str, outcome: str, current: Optional[str]) -> None:
+        self.outcomes[place_id] = (outcome, current)
+
+    def count(self, outcome: str) -> int:
+        return sum(1 for o, _ in self.outcomes.values() if o == outcome)
+
+    def summary(self) -> str:
+        counts = ", ".join(f"{self.count(outcome)} {outcome}" for outcome in OUTCOMES)
+        return (f"{len(self.outcomes)} place IDs: {counts}; {self.records_updated} records updated, "
+                f"{len(self.files_written)} files written")
+
+
+def apply_refresh(result: RefreshResult, data_dir: Optional[Path] = None, dry_run: bool = False,
+                  clear_unresolved: bool = False, emit: Callable[[str], None] = print) -> RefreshResult:
+    """
+    Rewrite the refreshed IDs into every record that references them, one pass and one write per file.
+    Current IDs only get their refresh stamp. With ``clear_unresolved``, records whose ID is gone and
+    could not be replaced lose place_id/google_maps_url (kept as obsolete_place_id) so the enrichers
+    search for them again; otherwise they are left as they are.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    for dataset in DATASETS:
+        document = DatasetDocument.load(dataset, data_dir)
+        if document is None:
+            continue
+        for handle in document.records():
+            place_id = handle.get('place_id')
+            if place_id not in result.outcomes:
+                continue
+            outcome, current = result.outcomes[place_id]
+            if outcome in ("changed", "replaced"):
+                fields = {'place_id': current, 'google_maps_url': maps_url(current), REFRESHED_FIELD: now}
+                emit(f"  {handle.key}: {place_id} -> {current} ({outcome})")
+            elif outcome == "current":
+                fields = {REFRESHED_FIELD: now}
+            elif outcome in ("unresolved", "ambiguous") and clear_unresolved:
+                fields = {'place_id': None, 'google_maps_url': None, 'obsolete_place_id': place_id}
+                emit(f"  {handle.key}: {place_id} cleared ({outcome}), will be re-matched by enrichment")
+            else:
+                continue
+            if dry_run:
+                result.records_updated += 1
+            elif handle.update(**fields):
+                result.records_updated += 1
+        if document.dirty and not dry_run:
+            document.save()
+            result.files_written.append(document.path)
+    return result
@@ -0,0 +1,77 @@
+"""
+Resolution of a Text Search match into the fields the enrichers store
+
+The enrichers used to follow every Text Search match with a Place Details call
+for its coordinates, name and address, although a Text Search result already
+carries geometry, name and formatted_address. In "single_call" mode those
+fields are taken straight from the search result and Details is only called
+for whichever of them the result lacks; "details" mode keeps the old two-call
+behaviour (Details values win). Each resolution is counted by the path it
+took so runs can report how often the fallback was needed.
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+RESOLUTION_MODES = ("single_call", "details")
+
+PLACE_FIELDS = ("lat", "lng", "name", "address")
+
+# Paths a resolution can take, in report order
+PATHS = ("search", "details_fallback", "details", "details_failed")
+
+
+def search_fields(result: Dict[str, Any]) -> Dict[str, Any]:
+    """PLACE_FIELDS present in a Text Search (or Details) result"""
+    location = (result.get("geometry") or {}).get("location") or {}
+    fields = {
+        "lat": location.get("lat"),
+        "lng": location.get("lng"),
+        "name": result.get("name"),
+        "address": result.get("formatted_address"),
+    }
+    return {field: value for field, value in fields.items() if value not in (None, "")}
+
+
+class PlaceResolver:
+    """Fills in a matched place's fields with as few Details calls as the mode allows"""
+
+    def __init__(self, mode: str = "single_call"):
+        if mode not in RESOLUTION_MODES:
+            raise ValueError(f"Unknown resolution mode {mode!r}; expected one of {', '.join(RESOLUTION_MODES)}")
+        self.mode = mode
+        self.paths = {path: 0 for path in PATHS}
+
+    def needs_details(self, result: Dict[str, Any]) -> bool:
+        """Whether resolving ``result`` calls Details"""
+        return self.mode == "details" or len(search_fields(result)) < len(PLACE_FIELDS)
+
+    def resolve(self, result: Dict[str, Any], fetch_details: Callable[[str], Optional[Dict[str, Any]]],
+                fallback: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+        """
+        (fields, path) for a matched search ``result``.
+        ``fetch_details(place_id)`` returns a dict with PLACE_FIELDS or None; ``fallback``
+        supplies the record's own values for anything neither response provides.
+        """
+        fields = search_fields(result) if self.mode == "single_call" else {}
+        if not self.needs_details(result):
+            path = "search"
+        else:
+            details = fetch_details(result["place_id"])
+            if details is None:
+                path = "details_failed"
+            else:
+                path = "details" if self.mode == "details" else "details_fallback"
+                fields.update({field: value for field, value in details.items()
+                               if field in PLACE_FIELDS and field not in fields and value not in (None, "")})
+        self.paths[path] += 1
+        return {**fallback, **fields}, path
+
+    @property
+    def details_calls(self) -> int:
+        return self.paths["details_fallback"] + self.paths["details"] + self.paths["details_failed"]
+
+    def summary(self) -> str:
+        resolved = sum(self.paths.values())
+        return (f"{resolved} resolved ({self.mode}): {self.paths['search']} from Text Search alone, "
+                f"{self.paths['details_fallback']} with Details fallback, {self.paths['details']} via Details, "
+                f"{self.paths['details_failed']} Details failures; {self.details_calls} Details calls")
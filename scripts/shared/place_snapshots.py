@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Place snapshots: one Place Details fetch per place_id serving every tool
+
+Coordinate verification needs geometry, the restaurant status check needs
+business_status and the enrichers need name/formatted_address. Instead of each
+tool asking Details for its own narrow field list, all of them request the
+union mask below. The response lands in the shared PlacesCache, and any later
+Details lookup for the same place (whatever its field list) is answered from
+there until the TTL expires. All of these fields are Basic Data, so the wider
+mask does not change the per-call price.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .datasets import walk_records
+from .google_api import PLACES_BASE_URL, get_json
+from .places_cache import get_places_cache, ttl_for
+
+SNAPSHOT_FIELDS = "place_id,geometry,name,formatted_address,business_status"
+DETAILS_URL = f"{PLACES_BASE_URL}/details/json"
+
+
+def snapshot_params(place_id: str) -> Dict[str, str]:
+    return {'place_id': place_id, 'fields': SNAPSHOT_FIELDS}
+
+
+def snapshot_from_result(place_id: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a Details ``result`` into the snapshot record the tools consume"""
+    location = (result.get('geometry') or {}).get('location') or {}
+    return {
+        'place_id': result.get('place_id', place_id),
+        'lat': location.get('lat'),
+        'lng': location.get('lng'),
+        'name': result.get('name', ''),
+        'formatted_address': result.get('formatted_address', ''),
+        'business_status': result.get('business_status'),
+    }
+
+
+def read_snapshot(place_id: str, ttl_days: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Stored snapshot for ``place_id`` without touching the API (None if missing or older than the TTL)"""
+    ttl = ttl_for('details') if ttl_days is None else ttl_days
+    data = get_places_cache().get_place(place_id, SNAPSHOT_FIELDS, ttl_days=ttl)
+    if data and data.get('status') == 'OK':
+        return snapshot_from_result(place_id, data.get('result', {}))
+    return None
+
+
+def get_snapshot(api_key: str, place_id: str, ttl_days: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Snapshot for ``place_id``, fetched with the union field mask when no fresh one is stored.
+    Returns None when Details does not answer OK; transport and quota errors propagate.
+    """
+    data = get_json(DETAILS_URL, {**snapshot_params(place_id), 'key': api_key}, cache_ttl_days=ttl_days)
+    if data.get('status') == 'OK':
+        return snapshot_from_result(place_id, data.get('result', {}))
+    return None
+
+
+async def fetch_snapshot(client, place_id: str) -> Optional[Dict[str, Any]]:
+    """Async variant of get_snapshot() for an open AsyncPlacesClient"""
+    result = await client.place_details(place_id, fields=SNAPSHOT_FIELDS)
+    if result is None:
+        return None
+    return snapshot_from_result(place_id, result)
+
+
+def collect_place_ids(data_dir: Optional[Path] = None) -> Dict[str, int]:
+    """Unique place_ids across every registered dataset, with how many records reference each"""
+    counts: Dict[str, int] = {}
+    for handle in walk_records(data_dir=data_dir, write_back=False):
+        place_id = handle.get('place_id')
+        if isinstance(place_id, str) and place_id:
+            counts[place_id] = counts.get(place_id, 0) + 1
+    return counts
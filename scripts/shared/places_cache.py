@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+SQLite-backed response cache for Google Places / Geocoding / Nominatim calls
+
+Replaces the per-script .places_cache.json. Entries are indexed three ways:
+- by request key (endpoint + sorted params, API key excluded) for exact read-through
+- by place_id, so a Details call can be served by any cached Details response
+  for the same place whose field list covers the requested fields
+- by query text (query / input / address / q parameter): geocoding addresses in
+  the canonical form of shared/address_normalizer.py, place-name searches only
+  case-, punctuation- and whitespace-insensitive
+
+Writes are buffered and committed in batches; least-recently-used entries are
+evicted once the cache exceeds its entry or size limit.
+
+Usage:
+    python shared/places_cache.py            # show cache statistics
+    python shared/places_cache.py --purge 90 # drop entries older than 90 days
+"""
+
+import argparse
+import atexit
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+# Add the scripts directory to the path so we can import from config
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.loader import load_common_config
+from shared.address_normalizer import normalize_address, normalize_query
+from shared.endpoints import STATE_DIR, state_path
+
+DEFAULT_CACHE_PATH = STATE_DIR / "places_cache.sqlite"
+
+# Parameters that carry the free-text query for each endpoint
+QUERY_PARAMS = ("query", "input", "address", "q")
+# The one that is always a postal address (Geocoding API)
+ADDRESS_PARAM = "address"
+
+DAY_SECONDS = 86400
+
+
+def query_form(param: str, value: Any) -> str:
+    """
+    Key form of a free-text parameter: a geocoding address is normalized as an address, so
+    "348 Sunside Road, NY 12423" and "348 Sunside Rd NY" share an entry; a place-name search
+    only ignores case, punctuation and spacing, since its ZIP or "North" may be all that tells two places apart
+    """
+    return normalize_address(value) if param == ADDRESS_PARAM else normalize_query(value)
+
+
+def request_key(endpoint: str, params: Dict[str, Any]) -> str:
+    """Stable cache key for an endpoint + params, ignoring the API key; free-text parameters in their query_form"""
+    items = sorted((k, query_form(k, v) if k in QUERY_PARAMS else str(v)) for k, v in params.items() if k != "key")
+    return endpoint + "?" + json.dumps(items, ensure_ascii=False, separators=(",", ":"))
+
+
+def field_set(fields: Optional[str]) -> Optional[frozenset]:
+    if not fields:
+        return None
+    return frozenset(f.strip() for f in fields.split(",") if f.strip())
+
+
+class PlacesCache:
+    """Indexed on-disk response cache with TTLs, batched commits and LRU eviction"""
+
+    def __init__(self, db_path: Path = DEFAULT_CACHE_PATH, max_entries: int = 100000,
+                 max_mb: float = 256, commit_every: int = 50, commit_interval: float = 5.0):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+
+        self._pending: Dict[str, tuple] = {}
+        self._touched: Dict[str, float] = {}
+        self._last_flush = time.time()
+
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evicted": 0}
+
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " endpoint TEXT NOT NULL,"
+            " place_id TEXT,"
+            " query TEXT,"
+            " fields TEXT,"
+            " payload TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL,"
+            " size INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_place_id ON responses (place_id, endpoint)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_query ON responses (query, endpoint)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+
+    # ------------------------------
+    # Reads
+    # ------------------------------
+
+    def _fresh_since(self, ttl_days: Optional[float]) -> float:
+        return 0.0 if ttl_days is None else time.time() - ttl_days * DAY_SECONDS
+
+    def _hit(self, key: str, payload: str, peek: bool = False) -> Any:
+        if not peek:
+            self.stats["hits"] += 1
+            self._touched[key] = time.time()
+        return json.loads(payload)
+
+    def get(self, endpoint: str, params: Dict[str, Any], ttl_days: Optional[float] = None, peek: bool = False) -> Any:
+        """
+        Exact read-through lookup; for Details also accepts any cached superset of the requested fields.
+        ``peek`` looks without counting a hit/miss or refreshing the entry's LRU position.
+        """
+        key = request_key(endpoint, params)
+        since = self._fresh_since(ttl_days)
+
+        pending = self._pending.get(key)
+        if pending and pending[6] >= since:
+            return self._hit(key, pending[5], peek)
+
+        row = self._conn.execute(
+            "SELECT payload FROM responses WHERE key = ? AND fetched_at >= ?", (key, since)
+        ).fetchone()
+        if row:
+            return self._hit(key, row[0], peek)
+
+        if endpoint == "details" and params.get("place_id"):
+            payload = self.get_place(params["place_id"], params.get("fields"), ttl_days, peek)
+            if payload is not None:
+                return payload
+
+        if not peek:
+            self.stats["misses"] += 1
+        return None
+
+    def get_place(self, place_id: str, fields: Optional[str] = None, ttl_days: Optional[float] = None,
+                  peek: bool = False) -> Any:
+        """Freshest cached Details response for ``place_id`` whose field list covers ``fields``"""
+        wanted = field_set(fields)
+        since = self._fresh_since(ttl_days)
+        candidates = [(row[6], row[0], row[4], row[5]) for row in self._pending.values()
+                      if row[1] == "details" and row[2] == place_id and row[6] >= since]
+        candidates += self._conn.execute(
+            "SELECT fetched_at, key, fields, payload FROM responses"
+            " WHERE place_id = ? AND endpoint = 'details' AND fetched_at >= ?",
+            (place_id, since),
+        ).fetchall()
+        for _, key, cached_fields, payload in sorted(candidates, reverse=True):
+            have = field_set(cached_fields)
+            # A Details call without a field list returns every field
+            if have is None or (wanted is not None and wanted <= have):
+                return self._hit(key, payload, peek)
+        return None
+
+    def get_by_query(self, endpoint: str, query: str, ttl_days: Optional[float] = None,
+                     param: str = "query") -> Any:
+        """Freshest cached response for ``endpoint`` whose query text (sent as ``param``) has the same query_form"""
+        since = self._fresh_since(ttl_days)
+        row = self._conn.execute(
+            "SELECT key, payload FROM responses WHERE query = ? AND endpoint = ? AND fetched_at >= ?"
+            " ORDER BY fetched_at DESC LIMIT 1",
+            (query_form(param, query), endpoint, since),
+        ).fetchone()
+        if row:
+            return self._hit(row[0], row[1])
+        return None
+
+    # ------------------------------
+    # Writes
+    # ------------------------------
+
+    def put(self, endpoint: str, params: Dict[str, Any], payload: Any, fetched_at: Optional[float] = None) -> None:
+        key = request_key(endpoint, params)
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        query = next((query_form(p, params[p]) for p in QUERY_PARAMS if params.get(p)), None)
+        now = time.time()
+        self._pending[key] = (
+            key, endpoint, params.get("place_id"), query, params.get("fields"),
+            body, fetched_at or now, now, len(body),
+        )
+        self.stats["writes"] += 1
+        if len(self._pending) >= self.commit_every or now - self._last_flush >= self.commit_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Commit buffered writes and access times in one short transaction"""
+        if not self._pending and not self._touched:
+            return
+        rows = list(self._pending.values())
+        touched = [(ts, key) for key, ts in self._touched.items() if key not in self._pending]
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO responses"
+                " (key, endpoint, place_id, query, fields, payload, fetched_at, accessed_at, size)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.executemany("UPDATE responses SET accessed_at = ? WHERE key = ?", touched)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._pending.clear()
+        self._touched.clear()
+        self._last_flush = time.time()
+        self.evict()
+
+    def evict(self) -> int:
+        """Drop least-recently-used entries until the cache is within its limits"""
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        removed = 0
+        while count > self.max_entries or total > self.max_bytes:
+            batch = max(1, count - self.max_entries, count // 10)
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN"
+                " (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                (batch,),
+            )
+            removed += batch
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        self.stats["evicted"] += removed
+        return removed
+
+    def purge_older_than(self, days: float) -> int:
+        self.flush()
+        cur = self._conn.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - days * DAY_SECONDS,))
+        return cur.rowcount
+
+    def import_legacy_json(self, path: Path) -> int:
+        """
+        Import a legacy .places_cache.json ({place_id: {lat, lng, name, formatted_address, fetched_at}})
+        as Details responses, preserving the original fetch times.
+        """
+        from datetime import datetime
+
+        with open(path, "r", encoding="utf-8") as f:
+            legacy = json.load(f)
+        imported = 0
+        for place_id, entry in legacy.items():
+            try:
+                fetched_at = datetime.fromisoformat(entry["fetched_at"].replace("Z", "+00:00")).timestamp()
+                payload = {
+                    "status": "OK",
+                    "result": {
+                        "geometry": {"location": {"lat": entry["lat"], "lng": entry["lng"]}},
+                        "name": entry.get("name", ""),
+                        "formatted_address": entry.get("formatted_address", ""),
+                    },
+                }
+            except (KeyError, TypeError, ValueError, AttributeError):
+                continue
+            params = {"place_id": place_id, "fields": "geometry,name,formatted_address"}
+            self.put("details", params, payload, fetched_at=fetched_at)
+            imported += 1
+        self.flush()
+        return imported
+
+    def summary(self) -> Dict[str, Any]:
+        self.flush()
+        rows = self._conn.execute(
+            "SELECT endpoint, COUNT(*), COALESCE(SUM(size), 0), MIN(fetched_at) FROM responses GROUP BY endpoint"
+        ).fetchall()
+        return {endpoint: {"entries": n, "bytes": size, "oldest": oldest} for endpoint, n, size, oldest in rows}
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+
+_shared_cache: Optional[PlacesCache] = None
+_settings: Optional[Dict[str, Any]] = None
+
+
+def cache_settings() -> Dict[str, Any]:
+    """common.json api.google_maps.response_cache, loaded once per process"""
+    global _settings
+    if _settings is None:
+        _settings = load_common_config().get("api", {}).get("google_maps", {}).get("response_cache", {})
+    return _settings
+
+
+def get_places_cache() -> PlacesCache:
+    """Process-wide cache configured from common.json (api.google_maps.response_cache)"""
+    global _shared_cache
+    if _shared_cache is None:
+        settings = cache_settings()
+        _shared_cache = PlacesCache(
+            db_path=state_path(settings.get("path"), DEFAULT_CACHE_PATH.name),
+            max_entries=settings.get("max_entries", 100000),
+            max_mb=settings.get("max_mb", 256),
+            commit_every=settings.get("commit_every", 50),
+        )
+        atexit.register(_shared_cache.flush)
+    return _shared_cache
+
+
+def ttl_for(endpoint: str) -> Optional[float]:
+    """Configured TTL in days for an endpoint (cache_ttl_days unless overridden per endpoint)"""
+    settings = cache_settings()
+    return settings.get("ttl_days", {}).get(endpoint, settings.get("cache_ttl_days", 30))
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    parser = argparse.ArgumentParser(description="Inspect or purge the shared Places response cache")
+    parser.add_argument("--purge", type=float, metavar="DAYS", help="Delete entries fetched more than DAYS ago")
+    args = parser.parse_args(argv)
+
+    cache = get_places_cache()
+    if args.purge is not None:
+        print(f"🧹 Purged {cache.purge_older_than(args.purge)} entries older than {args.purge:g} days")
+    print(f"🗄️  Places cache ({cache.db_path})")
+    for endpoint, info in sorted(cache.summary().items()):
+        print(f"  {endpoint}: {info['entries']} entries, {info['bytes'] / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Async Google Places client shared by the maintenance scripts
+
+- One aiohttp session per run, so every request reuses pooled keep-alive connections
+- Adaptive (AIMD) concurrency up to ``concurrency`` plus request-start pacing under the configured QPS
+- Draws from the cross-process SharedRateLimiter so parallel scripts share one budget
+- Reads through the shared PlacesCache; cache hits never touch the network, nor do
+  lookups the negative cache remembers as ZERO_RESULTS / NOT_FOUND
+- Coalesces identical in-flight and completed requests within the run
+- Tracks request counts and wall time so callers can report throughput, and records
+  per-endpoint latency, statuses and waits in shared/metrics.py
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from .adaptive import AdaptiveGate, concurrency_controller
+from .coalescer import RequestCoalescer
+from .endpoints import resolve_url
+from .google_api import OVER_QUERY_LIMIT_BACKOFF, PLACES_BASE_URL, is_cacheable, response_status
+from .metrics import get_metrics
+from .negative_cache import get_negative_cache, is_negative, negative_response
+from .places_cache import PlacesCache, get_places_cache, ttl_for
+from .rate_limiter import SharedRateLimiter, get_rate_limiter
+
+
+class AsyncPlacesClient:
+    """Google Places client that fans requests out over one pooled session"""
+
+    def __init__(self, api_key: str, concurrency: int = 8, qps: float = 10.0,
+                 timeout: float = 10, base_url: str = PLACES_BASE_URL,
+                 rate_limiter: Optional[SharedRateLimiter] = None,
+                 cache: Optional[PlacesCache] = None, cache_ttl_days: Optional[float] = None,
+                 coalescer: Optional[RequestCoalescer] = None, api: str = 'places'):
+        self.api_key = api_key
+        # Rate-limiter bucket; 'geocoding' with base_url=GOOGLE_API_BASE_URL serves the Geocoding API
+        self.api = api
+        self.base_url = resolve_url(base_url).rstrip("/")
+        self.concurrency = max(1, int(concurrency))
+        self.qps = float(qps)
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.cache = cache or get_places_cache()
+        self.cache_ttl_days = cache_ttl_days
+        self.coalescer = coalescer or RequestCoalescer()
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        # In-flight limit starts below ``concurrency`` and adapts to OVER_QUERY_LIMIT/5xx/timeouts
+        self._gate = AdaptiveGate(concurrency_controller(self.concurrency))
+        self._pace_lock = asyncio.Lock()
+        self._next_slot = 0.0
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+
+        self.stats = {
+            'requests': 0,
+            'errors': 0,
+            'cache_hits': 0,
+        }
+
+    async def __aenter__(self) -> "AsyncPlacesClient":
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        self._started_at = time.perf_counter()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self._finished_at = time.perf_counter()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self.cache.flush()
+
+    async def _pace(self) -> float:
+        """Space request starts so the client never exceeds ``qps``; returns the seconds waited"""
+        if self.qps <= 0:
+            return 0.0
+        interval = 1.0 / self.qps
+        async with self._pace_lock:
+            now = time.perf_counter()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+            return wait
+        return 0.0
+
+    async def get_json(self, endpoint: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """GET ``{base_url}/{endpoint}/json`` and return the decoded body, or None on transport errors"""
+        if self._session is None:
+            raise RuntimeError("AsyncPlacesClient must be used as an async context manager")
+
+        return await self.coalescer.call_async(endpoint, params, lambda: self._fetch_json(endpoint, params))
+
+    async def _fetch_json(self, endpoint: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        metrics = get_metrics()
+        ttl = ttl_for(endpoint) if self.cache_ttl_days is None else self.cache_ttl_days
+        if ttl:
+            cached = self.cache.get(endpoint, params, ttl_days=ttl)
+            if cached is None:
+                status = get_negative_cache().check(endpoint, params)
+                if status is not None:
+                    cached = negative_response(endpoint, status)
+            metrics.cache(endpoint, hit=cached is not None)
+            if cached is not None:
+                self.stats['cache_hits'] += 1
+                return cached
+
+        query = dict(params)
+        query['key'] = self.api_key
+        url = f"{self.base_url}/{endpoint}/json"
+
+        controller = self._gate.controller
+        gate_started = time.perf_counter()
+        async with self._gate:
+            metrics.slept(endpoint, time.perf_counter() - gate_started, "concurrency")
+            metrics.slept(endpoint, await self._pace(), "adaptive")
+            metrics.slept(endpoint, await self.rate_limiter.acquire_async(self.api), "rate_limit")
+            self.stats['requests'] += 1
+            started = time.perf_counter()
+            try:
+                async with self._session.get(url, params=query) as response:
+                    response.raise_for_status()
+                    data = await response.json(content_type=None)
+                metrics.request(endpoint, time.perf_counter() - started, response_status(data))
+                if isinstance(data, dict) and data.get('status') == 'OVER_QUERY_LIMIT':
+                    self.rate_limiter.penalize(self.api, OVER_QUERY_LIMIT_BACKOFF)
+                    controller.record_congestion('over_query_limit')
+                    return data
+                controller.record_success(time.perf_counter() - started)
+                if is_cacheable(data):
+                    self.cache.put(endpoint, params, data)
+                    get_negative_cache().clear(endpoint, params)
+                elif is_negative(data):
+                    get_negative_cache().record(endpoint, params, response_status(data))
+                return data
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                reason = type(e).__name__
+                if isinstance(e, asyncio.TimeoutError):
+                    reason = 'timeout'
+                    controller.record_congestion(reason)
+                elif isinstance(e, aiohttp.ClientResponseError) and (e.status >= 500 or e.status == 429):
+                    reason = f'http_{e.status}'
+                    controller.record_congestion(reason)
+                metrics.error(endpoint, reason, time.perf_counter() - started)
+                self.stats['errors'] += 1
+                print(f"Error calling Places {endpoint}: {e}")
+                return None
+
+    async def place_details(self, place_id: str,
+                            fields: str = 'geometry,name,formatted_address') -> Optional[Dict[str, Any]]:
+        """
+        Fetch Place Details for ``place_id``.
+        Returns the ``result`` object or None if the API did not return OK.
+        """
+        data = await self.get_json('details', {'place_id': place_id, 'fields': fields})
+        if data is None:
+            return None
+        if data.get('status') == 'OK' and 'result' in data:
+            return data['result']
+        print(f"⚠️  API returned status: {data.get('status', 'UNKNOWN')} for {place_id}")
+        return None
+
+    @property
+    def elapsed(self) -> float:
+        """Wall-clock seconds since the session was opened"""
+        if self._started_at is None:
+            return 0.0
+        end = self._finished_at if self._finished_at is not None else time.perf_counter()
+        return end - self._started_at
+
+    @property
+    def adaptive(self) -> Dict[str, Any]:
+        """Current in-flight limit and AIMD counters"""
+        return self._gate.controller.snapshot()
+
+    def throughput(self) -> float:
+        """Requests per second over the life of the session"""
+        elapsed = self.elapsed
+        return self.stats['requests'] / elapsed if elapsed > 0 else 0.0
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Cross-process token-bucket rate limiter and daily call ledger for external APIs
+
+State lives in a small SQLite database under scripts/.cache so that every
+script (and every concurrently running process) draws from the same buckets.
+Each call to acquire() takes one token and increments the per-API ledger for
+the current UTC day; once a configured daily quota is reached, acquire()
+raises QuotaExceededError instead of sending more requests.
+
+Usage:
+    python shared/rate_limiter.py            # show today's ledger
+    python shared/rate_limiter.py --days 7   # show the last week
+"""
+
+import argparse
+import asyncio
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+# Add the scripts directory to the path so we can import from config
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.loader import load_common_config
+from shared.endpoints import STATE_DIR, state_path
+
+DEFAULT_DB_PATH = STATE_DIR / "api_state.sqlite"
+
+# Fallbacks used when common.json has no shared_rate_limit section
+DEFAULT_RATES = {
+    "places": {"qps": 10, "burst": 10},
+    "geocoding": {"qps": 10, "burst": 10},
+    "nominatim": {"qps": 0.9, "burst": 1},
+}
+
+
+class QuotaExceededError(RuntimeError):
+    """Raised when an API's configured daily call quota has been used up"""
+
+
+def utc_day() -> str:
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+class SharedRateLimiter:
+    """Token buckets and a daily ledger persisted in SQLite, shared by all processes"""
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH, rates: Optional[Dict[str, Dict[str, float]]] = None,
+                 daily_quotas: Optional[Dict[str, int]] = None):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.rates = rates or DEFAULT_RATES
+        self.daily_quotas = daily_quotas or {}
+        self.waited = 0.0  # seconds this process spent waiting for tokens
+
+        # Autocommit mode; transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " api TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ledger ("
+            " day TEXT NOT NULL, api TEXT NOT NULL, calls INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (day, api))"
+        )
+
+    def _rate(self, api: str):
+        rate = self.rates.get(api) or DEFAULT_RATES.get(api) or {"qps": 10, "burst": 10}
+        qps = float(rate.get("qps", 10))
+        burst = float(rate.get("burst", max(1.0, qps)))
+        return qps, burst
+
+    def _try_acquire(self, api: str) -> float:
+        """
+        Take one token for ``api`` if available.
+        Returns 0 when a token was taken, otherwise the seconds to wait before retrying.
+        """
+        qps, burst = self._rate(api)
+        day = utc_day()
+        now = time.time()
+
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            quota = self.daily_quotas.get(api)
+            if quota:
+                row = self._conn.execute(
+                    "SELECT calls FROM ledger WHERE day = ? AND api = ?", (day, api)
+                ).fetchone()
+                if row and row[0] >= quota:
+                    raise QuotaExceededError(f"Daily quota of {quota} {api} calls reached for {day}")
+
+            row = self._conn.execute(
+                "SELECT tokens, updated_at FROM buckets WHERE api = ?", (api,)
+            ).fetchone()
+            tokens, updated_at = row if row else (burst, now)
+
+            if qps > 0:
+                tokens = min(burst, tokens + max(0.0, now - updated_at) * qps)
+            else:
+                tokens = burst
+
+            if tokens < 1.0:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (api, tokens, updated_at) VALUES (?, ?, ?)",
+                    (api, tokens, now),
+                )
+                self._conn.execute("COMMIT")
+                return (1.0 - tokens) / qps
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO buckets (api, tokens, updated_at) VALUES (?, ?, ?)",
+                (api, tokens - 1.0, now),
+            )
+            self._conn.execute(
+                "INSERT INTO ledger (day, api, calls) VALUES (?, ?, 1) "
+                "ON CONFLICT(day, api) DO UPDATE SET calls = calls + 1",
+                (day, api),
+            )
+            self._conn.execute("COMMIT")
+            return 0.0
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def acquire(self, api: str) -> float:
+        """Block until a token for ``api`` is available; returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(api)
+            if wait <= 0:
+                self.waited += waited
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, api: str) -> float:
+        """Async variant of acquire() that yields to the event loop while waiting"""
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(api)
+            if wait <= 0:
+                self.waited += waited
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def penalize(self, api: str, seconds: float) -> None:
+        """
+        Drain the bucket so that every process backs off for roughly ``seconds``.
+        Used when the API answers OVER_QUERY_LIMIT despite our pacing.
+        """
+        qps, _ = self._rate(api)
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO buckets (api, tokens, updated_at) VALUES (?, ?, ?)",
+                (api, -seconds * qps, time.time()),
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def usage(self, day: Optional[str] = None) -> Dict[str, int]:
+        """Calls recorded per API for ``day`` (defaults to today, UTC)"""
+        rows = self._conn.execute(
+            "SELECT api, calls FROM ledger WHERE day = ? ORDER BY api", (day or utc_day(),)
+        ).fetchall()
+        return {api: calls for api, calls in rows}
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_shared_limiter: Optional[SharedRateLimiter] = None
+
+
+def get_rate_limiter() -> SharedRateLimiter:
+    """Process-wide limiter configured from common.json (api.google_maps.shared_rate_limit)"""
+    global _shared_limiter
+    if _shared_limiter is None:
+        settings = load_common_config().get("api", {}).get("google_maps", {}).get("shared_rate_limit", {})
+        _shared_limiter = SharedRateLimiter(
+            db_path=state_path(settings.get("state_file"), DEFAULT_DB_PATH.name),
+            rates={**DEFAULT_RATES, **settings.get("rates", {})},
+            daily_quotas=settings.get("daily_quota", {}),
+        )
+    return _shared_limiter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the shared API call ledger")
+    parser.add_argument("--days", type=int, default=1, help="Number of days to show (default: today only)")
+    args = parser.parse_args()
+
+    limiter = get_rate_limiter()
+    today = datetime.now(timezone.utc).date()
+    print(f"📒 API call ledger ({limiter.db_path})")
+    for offset in range(args.days):
+        day = (today - timedelta(days=offset)).isoformat()
+        usage = limiter.usage(day)
+        summary = ", ".join(
+            f"{api}: {calls}" + (f"/{limiter.daily_quotas[api]}" if limiter.daily_quotas.get(api) else "")
+            for api, calls in usage.items()
+        )
+        print(f"  {day}: {summary or 'no calls'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Staleness-priority scheduling for periodic re-checks under a daily budget
+
+Instead of re-checking every record the moment it crosses a fixed age (which
+turns a batch imported together into a burst every interval), each record gets
+a priority: its age as a fraction of the check interval, multiplied by a weight
+for how likely it is to have changed (e.g. a restaurant that was recently
+CLOSED_TEMPORARILY). Each day only the highest-priority records are checked, up
+to a daily budget that defaults to "everything once per interval" plus every
+record that was never checked, so API load stays flat, new records (or a whole
+dataset on its first run) are checked straight away, and the most valuable
+checks go first. Records may be checked early
+(from ``early_fraction`` of their weighted interval) when the budget has room.
+
+The budget is counted from the records themselves: a record whose check
+timestamp falls on the current UTC day has used one unit, so several runs in a
+day share it without extra state.
+"""
+
+import math
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+# Staleness assumed for a record that has never been checked
+NEVER_CHECKED_STALENESS = 2.0
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """ISO8601 timestamp as an aware UTC datetime (naive values are taken as UTC)"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class Schedule:
+    """Outcome of one scheduling pass"""
+
+    def __init__(self, selected: List[Dict[str, Any]], due: int, eligible: int, budget: int, spent_today: int):
+        self.selected = selected
+        self.due = due
+        self.eligible = eligible
+        self.budget = budget
+        self.spent_today = spent_today
+
+    @property
+    def deferred(self) -> int:
+        """Due records left for later days"""
+        return max(0, self.due - len(self.selected))
+
+    def summary(self) -> str:
+        return (f"{len(self.selected)} selected of {self.eligible} eligible ({self.due} due, {self.deferred} deferred), "
+                f"budget {self.budget}/day with {self.spent_today} already used today")
+
+
+class StalenessScheduler:
+    """Ranks records by weighted staleness and picks today's share of the check budget"""
+
+    def __init__(self, interval_days: float, daily_budget: int = 0, early_fraction: float = 0.5,
+                 weight: Optional[Callable[[Dict[str, Any]], float]] = None,
+                 checked_field: str = "status_last_checked", now: Optional[datetime] = None):
+        self.interval_days = interval_days
+        self.daily_budget = daily_budget
+        self.early_fraction = early_fraction
+        self.weight = weight or (lambda record: 1.0)
+        self.checked_field = checked_field
+        self.now = now or datetime.now(timezone.utc)
+
+    def age_days(self, record: Dict[str, Any]) -> Optional[float]:
+        checked = parse_timestamp(record.get(self.checked_field))
+        if checked is None:
+            return None
+        return max(0.0, (self.now - checked).total_seconds() / 86400)
+
+    def score(self, record: Dict[str, Any]) -> float:
+        """Weighted staleness: 1.0 means due now, above 1.0 overdue"""
+        age = self.age_days(record)
+        staleness = NEVER_CHECKED_STALENESS if age is None else age / self.interval_days
+        return staleness * self.weight(record)
+
+    def budget(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Checks allowed per day: configured, or enough to cover every checked record once per
+        interval plus an allowance for every record that was never checked
+        """
+        if self.daily_budget > 0:
+            return self.daily_budget
+        never_checked = sum(1 for record in records if self.age_days(record) is None)
+        return math.ceil((len(records) - never_checked) / self.interval_days) + never_checked
+
+    def checked_today(self, records: List[Dict[str, Any]]) -> int:
+        today = self.now.date()
+        return sum(1 for record in records
+                   if (checked := parse_timestamp(record.get(self.checked_field))) and checked.date() == today)
+
+    def schedule(self, records: List[Dict[str, Any]], budget: Optional[int] = None) -> Schedule:
+        """Highest-priority records that fit in what is left of today's budget"""
+        budget = self.budget(records) if budget is None else budget
+        spent = self.checked_today(records)
+        scored = [(self.score(record), index, record) for index, record in enumerate(records)]
+        eligible = sorted((item for item in scored if item[0] >= self.early_fraction), key=lambda item: (-item[0], item[1]))
+        due = sum(1 for score, _, _ in eligible if score >= 1.0)
+        selected = [record for _, _, record in eligible[:max(0, budget - spent)]]
+        return Schedule(selected, due, len(eligible), budget, spent)
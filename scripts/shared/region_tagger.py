@@ -0,0 +1,242 @@
+"""
+Offline region and scenic-area tagging by point-in-polygon
+
+Region membership used to come from the research prompt (events) or from hand
+edits (the scenicArea text on cities and points of interest). Here every
+record with coordinates, in every registered dataset, is tested against two
+sets of polygons in one batch:
+
+- the ten REDC economic development regions in
+  nys_regions_redc_simplified_200m_disjoint.geojson (disjoint, so at most one
+  per record), tagged as ``region_id``
+- the scenicAreas outlines in map-data.json (they may nest, so a record can
+  sit in several), tagged as ``scenic_area_ids``
+
+With shapely 2 installed, the polygons are prepared geometries in an STRtree:
+one bulk query finds the candidate polygons of every point by bounding box,
+and one vectorized contains_xy call settles them. Without shapely the same
+pass runs as a NumPy even-odd ray cast per polygon, restricted to the points
+inside its bounding box. Both backends return the same pairs.
+
+Ids are the scenicAreas ``id`` values and a slug of each region name
+("Capital Region" -> "capital_region"). The hand-written scenicArea text is
+left alone.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .datasets import DATA_DIR, DATASETS, DatasetDocument, RecordHandle, get_dataset
+
+try:
+    import shapely
+    from shapely import STRtree
+except ImportError:  # optional: the NumPy ray cast gives the same answers, just without the tree
+    shapely = None
+
+REGIONS_FILE = "nys_regions_redc_simplified_200m_disjoint.geojson"
+REGION_FIELD = "region_id"
+SCENIC_AREA_FIELD = "scenic_area_ids"
+KINDS = ("region", "scenic_area")
+
+# Edges tested against the points of one polygon at a time, to bound the crossing matrix
+EDGE_CHUNK = 512
+
+
+def slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.casefold()).strip("_")
+
+
+class Area:
+    """One polygon (or multipolygon) with its id; rings are (lng, lat) arrays"""
+
+    def __init__(self, area_id: str, name: str, kind: str, polygons: List[List[np.ndarray]]):
+        self.id = area_id
+        self.name = name
+        self.kind = kind
+        # Each polygon is [exterior, *holes]
+        self.polygons = polygons
+        points = np.vstack([ring for polygon in polygons for ring in polygon])
+        self.bbox = (points[:, 0].min(), points[:, 1].min(), points[:, 0].max(), points[:, 1].max())
+
+    def geometry(self):
+        """The shapely (Multi)Polygon"""
+        parts = [shapely.Polygon(polygon[0], polygon[1:]) for polygon in self.polygons]
+        return parts[0] if len(parts) == 1 else shapely.MultiPolygon(parts)
+
+    def contains(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Even-odd test of every point against every ring (holes included) in NumPy"""
+        inside = np.zeros(len(xs), dtype=bool)
+        for polygon in self.polygons:
+            for ring in polygon:
+                x1, y1 = ring[:-1, 0], ring[:-1, 1]
+                x2, y2 = ring[1:, 0], ring[1:, 1]
+                for start in range(0, len(x1), EDGE_CHUNK):
+                    edge = slice(start, start + EDGE_CHUNK)
+                    a_x, a_y, b_x, b_y = (v[edge, None] for v in (x1, y1, x2, y2))
+                    straddles = (a_y > ys) != (b_y > ys)
+                    with np.errstate(divide="ignore", invalid="ignore"):
+                        crossing_x = a_x + (ys - a_y) * (b_x - a_x) / (b_y - a_y)
+                    crossings = straddles & (xs < crossing_x)
+                    inside ^= (np.count_nonzero(crossings, axis=0) % 2).astype(bool)
+        return inside
+
+
+def _ring(coordinates: Sequence[Sequence[float]], lat_first: bool = False) -> np.ndarray:
+    ring = np.asarray(coordinates, dtype=float)[:, :2]
+    if lat_first:
+        ring = ring[:, ::-1]
+    if not np.array_equal(ring[0], ring[-1]):
+        ring = np.vstack([ring, ring[:1]])
+    return ring
+
+
+def load_regions(path: Path) -> List[Area]:
+    """REDC regions from the GeoJSON FeatureCollection (lng/lat order)"""
+    with open(path, "r", encoding="utf-8") as f:
+        collection = json.load(f)
+    areas = []
+    for feature in collection.get("features", []):
+        geometry = feature.get("geometry") or {}
+        polygons = geometry.get("coordinates") or []
+        if geometry.get("type") == "Polygon":
+            polygons = [polygons]
+        elif geometry.get("type") != "MultiPolygon":
+            continue
+        name = feature.get("properties", {}).get("name", "")
+        areas.append(Area(slug(name), name, "region", [[_ring(ring) for ring in polygon] for polygon in polygons]))
+    return areas
+
+
+def load_scenic_areas(map_data: Dict[str, Any]) -> List[Area]:
+    """scenicAreas outlines from map-data.json ([lat, lng] pairs)"""
+    areas = []
+    for scenic in map_data.get("scenicAreas", []):
+        if len(scenic.get("coordinates") or []) < 3:
+            continue
+        areas.append(Area(scenic.get("id") or slug(scenic["name"]), scenic.get("name", ""), "scenic_area",
+                          [[_ring(scenic["coordinates"], lat_first=True)]]))
+    return areas
+
+
+class AreaIndex:
+    """Polygons of one kind, queried for many points at once"""
+
+    def __init__(self, areas: List[Area]):
+        self.areas = areas
+        self.tree = None
+        if shapely is not None and areas:
+            self.geometries = np.array([area.geometry() for area in areas], dtype=object)
+            shapely.prepare(self.geometries)
+            self.tree = STRtree(self.geometries)
+
+    @property
+    def backend(self) -> str:
+        return "shapely STRtree" if self.tree is not None else "numpy ray cast"
+
+    def locate(self, lats: np.ndarray, lngs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(point index, area index) for every point inside an area"""
+        if not self.areas or not len(lats):
+            return np.empty(0, dtype=int), np.empty(0, dtype=int)
+        if self.tree is not None:
+            point_idx, area_idx = self.tree.query(shapely.points(lngs, lats))
+            inside = shapely.contains_xy(self.geometries[area_idx], lngs[point_idx], lats[point_idx])
+            return point_idx[inside], area_idx[inside]
+
+        point_parts, area_parts = [], []
+        for index, area in enumerate(self.areas):
+            min_x, min_y, max_x, max_y = area.bbox
+            candidates = np.flatnonzero((lngs >= min_x) & (lngs <= max_x) & (lats >= min_y) & (lats <= max_y))
+            if not len(candidates):
+                continue
+            hits = candidates[area.contains(lngs[candidates], lats[candidates])]
+            point_parts.append(hits)
+            area_parts.append(np.full(len(hits), index))
+        if not point_parts:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int)
+        return np.concatenate(point_parts), np.concatenate(area_parts)
+
+
+class TagResult:
+    """What a tagging pass found: per-area counts by record type and the records and files it changed"""
+
+    def __init__(self, areas: Dict[str, List[Area]], backend: str):
+        self.areas = areas
+        self.backend = backend
+        # kind -> area id -> record type -> records (region and scenic area ids may coincide)
+        self.counts: Dict[str, Dict[str, Dict[str, int]]] = {kind: {area.id: {} for area in areas[kind]}
+                                                             for kind in KINDS}
+        self.tagged = 0
+        self.untagged: Dict[str, int] = {}
+        self.records_updated = 0
+        self.files_written: List[Path] = []
+
+    def count(self, kind: str, area_id: str, record_type: str) -> None:
+        per_type = self.counts[kind][area_id]
+        per_type[record_type] = per_type.get(record_type, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        report: Dict[str, Any] = {
+            kind: [{"id": area.id, "name": area.name, "counts": self.counts[kind][area.id]} for area in self.areas[kind]]
+            for kind in KINDS
+        }
+        report["outside_every_region"] = self.untagged
+        return report
+
+
+def tag_records(data_dir: Optional[Path] = None, regions_file: str = REGIONS_FILE,
+                dry_run: bool = False) -> TagResult:
+    """
+    Tag every record with coordinates with its region_id and scenic_area_ids in one batched pass,
+    then write each changed dataset back with one atomic write (none with ``dry_run``).
+    """
+    data_dir = Path(data_dir or DATA_DIR)
+    map_data = DatasetDocument.load(get_dataset("cities"), data_dir)
+    areas = {
+        "region": load_regions(data_dir / regions_file),
+        "scenic_area": load_scenic_areas(map_data.data if map_data else {}),
+    }
+    indexes = {kind: AreaIndex(areas[kind]) for kind in KINDS}
+    result = TagResult(areas, indexes["region"].backend)
+
+    documents: List[DatasetDocument] = []
+    handles: List[RecordHandle] = []
+    for dataset in DATASETS:
+        # map-data.json is loaded once, so its cities are saved with the scenicAreas it was read with
+        document = map_data if dataset.name == "cities" else DatasetDocument.load(dataset, data_dir)
+        if document is None:
+            continue
+        documents.append(document)
+        handles.extend(handle for handle in document.records() if handle.coordinates is not None)
+
+    lats = np.array([handle.lat for handle in handles], dtype=float)
+    lngs = np.array([handle.lng for handle in handles], dtype=float)
+    found: Dict[str, List[List[str]]] = {kind: [[] for _ in handles] for kind in KINDS}
+    for kind in KINDS:
+        for point, area in zip(*indexes[kind].locate(lats, lngs)):
+            found[kind][point].append(areas[kind][area].id)
+
+    for handle, regions, scenic_areas in zip(handles, found["region"], found["scenic_area"]):
+        record_type = handle.dataset.record_type
+        for kind, area_ids in (("region", regions), ("scenic_area", scenic_areas)):
+            for area_id in area_ids:
+                result.count(kind, area_id, record_type)
+        if regions:
+            result.tagged += 1
+        else:
+            result.untagged[record_type] = result.untagged.get(record_type, 0) + 1
+        fields = {REGION_FIELD: regions[0] if regions else None, SCENIC_AREA_FIELD: sorted(scenic_areas)}
+        # Records outside every area only get the fields once they had a tag to clear
+        fields = {field: value for field, value in fields.items() if value or handle.get(field)}
+        if fields and handle.update(**fields):
+            result.records_updated += 1
+
+    for document in documents:
+        if document.dirty and not dry_run:
+            document.save()
+            result.files_written.append(document.path)
+    return result
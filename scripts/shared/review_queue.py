@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Review queue for place matches the candidate scorer was not sure about
+
+When a search's best candidate is below the confidence threshold, or too close
+to the runner-up, the enrichers and place ID assigners leave the record alone
+and queue it here with its top candidates and their signal scores. Entries are
+keyed by the record's stable dataset key, so a re-run replaces the entry
+rather than adding another one; a rejected entry stays rejected while the
+search keeps returning the same candidates.
+
+The queue lives in scripts/data/match_review_queue.json. Accepting a candidate
+writes its place_id (and Maps URL/address) into the record of a registered
+dataset and drops the entry.
+
+Usage:
+    python shared/review_queue.py                                  # list pending matches
+    python shared/review_queue.py --accept "waterfalls:Some Falls" [--choice 2]
+    python shared/review_queue.py --reject "waterfalls:Some Falls"
+"""
+
+import argparse
+import atexit
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from shared.checkpoint import atomic_write_json
+from shared.datasets import DATASETS, DatasetDocument, dataset_for_file, get_dataset, record_key
+from shared.endpoints import SCRIPTS_DIR, STATE_DIR, overrides_active
+
+DEFAULT_QUEUE_PATH = SCRIPTS_DIR / "data" / "match_review_queue.json"
+
+PENDING, REJECTED = "pending", "rejected"
+
+
+def dataset_of_key(key: str) -> Optional[str]:
+    """Registered dataset a record key belongs to, if any"""
+    prefix = key.split(":", 1)[0]
+    return prefix if any(dataset.name == prefix for dataset in DATASETS) else None
+
+
+def review_key_for(path: Any, record: Dict[str, Any]) -> str:
+    """Queue key of a record read from ``path``: its dataset key, or "<file>:<name>" outside the registry"""
+    dataset = dataset_for_file(path)
+    if dataset is not None:
+        return record_key(dataset, record)
+    return f"{Path(path).name}:{record.get('name', 'Unknown')}"
+
+
+def queue_path() -> Path:
+    """The review queue, or a throwaway copy under .cache/mock while a mock API is in use"""
+    if overrides_active():
+        return STATE_DIR / "mock" / DEFAULT_QUEUE_PATH.name
+    return DEFAULT_QUEUE_PATH
+
+
+class ReviewQueue:
+    """Pending low-confidence matches, persisted as one JSON document"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or queue_path())
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f).get("entries", {})
+
+    def add(self, key: str, name: str, query: str, decision) -> bool:
+        """
+        Queue ``decision`` (a candidate_scorer.MatchDecision) for the record ``key``
+        (datasets.record_key for registered datasets, "<file>:<name>" otherwise).
+        Returns False when the same candidates were already rejected.
+        """
+        candidates = [scored.to_dict() for scored in decision.ranked]
+        existing = self.entries.get(key)
+        if existing and existing.get("status") == REJECTED and \
+                [c["place_id"] for c in existing["candidates"]] == [c["place_id"] for c in candidates]:
+            return False
+        self.entries[key] = {
+            "key": key,
+            "dataset": dataset_of_key(key),
+            "name": name,
+            "query": query,
+            "reason": decision.reason,
+            "status": PENDING,
+            "queued_at": datetime.now(timezone.utc).isoformat(),
+            "candidates": candidates,
+        }
+        self.dirty = True
+        return True
+
+    def discard(self, key: str) -> None:
+        """Forget an entry, e.g. once a later run matched the record confidently"""
+        if self.entries.pop(key, None) is not None:
+            self.dirty = True
+
+    def pending(self) -> List[Dict[str, Any]]:
+        return [entry for entry in self.entries.values() if entry.get("status") == PENDING]
+
+    def reject(self, key: str) -> None:
+        self.entries[key]["status"] = REJECTED
+        self.dirty = True
+
+    def accept(self, key: str, choice: int = 1) -> Dict[str, Any]:
+        """
+        Write candidate ``choice`` (1-based) into the record and drop the entry.
+        Only records of registered datasets can be updated in place.
+        """
+        entry = self.entries[key]
+        if not entry.get("dataset"):
+            raise ValueError(f"{key}: not in a registered dataset; set its place_id by hand")
+        candidate = entry["candidates"][choice - 1]
+        document = DatasetDocument.load(get_dataset(entry["dataset"]))
+        if document is None:
+            raise ValueError(f"{key}: {entry['dataset']} data file not found")
+        handle = next((handle for handle in document.records() if handle.key == key), None)
+        if handle is None:
+            raise ValueError(f"{key}: record no longer exists")
+        fields = {
+            "place_id": candidate["place_id"],
+            "google_maps_url": f"https://www.google.com/maps/place/?q=place_id:{candidate['place_id']}",
+        }
+        if candidate.get("formatted_address"):
+            fields["formatted_address"] = candidate["formatted_address"]
+        handle.update(**fields)
+        document.save()
+        self.discard(key)
+        return candidate
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        atomic_write_json(self.path, {"entries": self.entries})
+        self.dirty = False
+
+
+_shared_queue: Optional[ReviewQueue] = None
+
+
+def get_review_queue() -> ReviewQueue:
+    """Process-wide queue, saved when the process exits"""
+    global _shared_queue
+    if _shared_queue is None:
+        _shared_queue = ReviewQueue()
+        atexit.register(_shared_queue.save)
+    return _shared_queue
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Review low-confidence place matches")
+    parser.add_argument("--accept", metavar="KEY", help="Write a candidate into the record and drop the entry")
+    parser.add_argument("--choice", type=int, default=1, help="Candidate number to accept (default: 1)")
+    parser.add_argument("--reject", metavar="KEY", help="Reject every candidate of an entry")
+    args = parser.parse_args()
+
+    queue = ReviewQueue()
+    key = args.accept or args.reject
+    if key and key not in queue.entries:
+        print(f"❌ No review entry for {key!r}")
+        sys.exit(1)
+    if args.accept:
+        try:
+            candidate = queue.accept(args.accept, args.choice)
+        except (ValueError, IndexError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        queue.save()
+        print(f"✅ {args.accept} -> {candidate['place_id']} ({candidate['name']})")
+        return
+    if args.reject:
+        queue.reject(args.reject)
+        queue.save()
+        print(f"🚫 Rejected the candidates for {args.reject}")
+        return
+
+    pending = queue.pending()
+    print(f"🔎 {len(pending)} matches awaiting review ({queue.path})")
+    for entry in pending:
+        print(f"\n  {entry['key']}  [{entry['reason']}]")
+        print(f"    query: {entry['query']}")
+        for number, candidate in enumerate(entry["candidates"], 1):
+            signals = ", ".join(f"{name} {value:.2f}" for name, value in candidate["signals"].items() if value is not None)
+            distance = f", {candidate['distance_m']}m" if candidate.get("distance_m") is not None else ""
+            print(f"    {number}. {candidate['confidence']:.2f}  {candidate['name']} - "
+                  f"{candidate.get('formatted_address') or ''}{distance}  ({signals})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Verification ledger for incremental coordinate re-verification
+
+Remembers, per record key (dataset:name), when a record was last checked
+against Google and a hash of the lat/lng/place_id it had at that time. A record
+only needs re-checking once its verification is older than the TTL or its
+content hash has changed. A record Google placed further away than its dataset's
+threshold stays due until its coordinates change (i.e. the correction is
+applied), so every run's patch still carries it. Records that were never
+checked here fall back to the
+google_verified_at / google_verified_lat / google_verified_lng fields written
+by the enrichers.
+"""
+
+import hashlib
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .endpoints import STATE_DIR, state_path
+
+DEFAULT_LEDGER_PATH = STATE_DIR / "verification_ledger.sqlite"
+
+DAY_SECONDS = 86400
+
+# Queue order: changed records first, then open discrepancies, never-verified, expired (oldest first)
+CHANGED, DISCREPANT, NEW, EXPIRED, FRESH = "changed", "discrepant", "new", "expired", "fresh"
+PRIORITY = {CHANGED: 0, DISCREPANT: 1, NEW: 2, EXPIRED: 3, FRESH: 4}
+
+
+def record_hash(place_id: str, lat: float, lng: float) -> str:
+    """Content hash of the fields a verification depends on (coordinates rounded to ~10 cm)"""
+    raw = f"{place_id}|{float(lat):.6f}|{float(lng):.6f}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class VerificationLedger:
+    """SQLite-backed record of the last verification of each place"""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path) if db_path else state_path(None, DEFAULT_LEDGER_PATH.name)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS verifications ("
+            " record_key TEXT PRIMARY KEY,"
+            " record_type TEXT NOT NULL,"
+            " place_id TEXT NOT NULL,"
+            " record_hash TEXT NOT NULL,"
+            " verified_at REAL NOT NULL,"
+            " google_lat REAL,"
+            " google_lng REAL,"
+            " distance_m REAL,"
+            " discrepant INTEGER NOT NULL DEFAULT 0)"
+        )
+
+    def last(self, record_key: str) -> Optional[Tuple[str, float, int]]:
+        """(record_hash, verified_at, discrepant) of the record's last verification, or None"""
+        return self._conn.execute(
+            "SELECT record_hash, verified_at, discrepant FROM verifications WHERE record_key = ?",
+            (record_key,),
+        ).fetchone()
+
+    def classify(self, record_key: str, record: Dict[str, Any], ttl_days: float,
+                 tolerance_m: float, distance_fn) -> Tuple[str, float]:
+        """
+        Return (status, verified_at) for a record with place_id/lat/lng.
+        verified_at is 0 when the record has never been verified.
+        """
+        place_id, lat, lng = record["place_id"], record["lat"], record["lng"]
+        cutoff = time.time() - ttl_days * DAY_SECONDS
+
+        row = self.last(record_key)
+        if row:
+            stored_hash, verified_at, discrepant = row
+            if stored_hash != record_hash(place_id, lat, lng):
+                return CHANGED, verified_at
+            if discrepant:
+                # Google disagreed and the correction has not been applied yet
+                return DISCREPANT, verified_at
+            return (FRESH if verified_at >= cutoff else EXPIRED), verified_at
+
+        # No ledger entry: trust an enrichment stamp if the record still sits where Google put it
+        verified_at = parse_timestamp(record.get("google_verified_at"))
+        g_lat, g_lng = record.get("google_verified_lat"), record.get("google_verified_lng")
+        if verified_at is None or g_lat is None or g_lng is None:
+            return NEW, 0.0
+        if distance_fn(lat, lng, g_lat, g_lng) > tolerance_m:
+            return CHANGED, verified_at
+        return (FRESH if verified_at >= cutoff else EXPIRED), verified_at
+
+    def record(self, record_key: str, record_type: str, place_id: str, lat: float, lng: float,
+               google_lat: float, google_lng: float, distance_m: float, discrepant: bool = False) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO verifications"
+            " (record_key, record_type, place_id, record_hash, verified_at, google_lat, google_lng, distance_m,"
+            " discrepant) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (record_key, record_type, place_id, record_hash(place_id, lat, lng), time.time(),
+             google_lat, google_lng, distance_m, int(discrepant)),
+        )
+
+    def commit(self) -> None:
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.commit()
+        self._conn.close()
@@ -7,6 +7,8 @@ import os
 import requests
 import json
 
+from shared.metrics import get_metrics
+
 def test_api_connection(api_key: str):
     """Test the Google Places API connection with a simple query."""
     
@@ -24,10 +26,11 @@ def test_api_connection(api_key: str):
         print(f"Testing API connection with query: '{test_query}'")
         print("Making request...")
         
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
+        with get_metrics().track('textsearch') as call:
+            response = requests.get(url, params=params, timeout=10)
+            response.raise_for_status()
+            data = response.json()
+            call.status = data.get('status')
         
         print(f"Response status: {data.get('status')}")
         
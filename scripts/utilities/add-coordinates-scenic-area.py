@@ -1,12 +1,17 @@
 import json
-import math
+import os
+import sys
 import time
 import requests
-from urllib.parse import urlencode
 from shapely.geometry import shape, mapping, MultiPolygon, Polygon
 from shapely.ops import unary_union
 from shapely.validation import make_valid
 
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.metrics import get_metrics
+
 ARCGIS_PORTAL_ITEM = "bb2dfa2ccec0462ebe40e4efd8e2252f"  # NY State Parks Property (OPRHP)
 PORTAL_ITEM_URL = f"https://www.arcgis.com/sharing/rest/content/items/{ARCGIS_PORTAL_ITEM}?f=pjson"
 PORTAL_DATA_URL = f"https://www.arcgis.com/sharing/rest/content/items/{ARCGIS_PORTAL_ITEM}/data?f=pjson"
@@ -44,9 +49,10 @@ TARGETS = [
 ]
 
 def fetch_json(url, params=None):
-    r = requests.get(url, params=params, timeout=60)
-    r.raise_for_status()
-    return r.json()
+    with get_metrics().track('arcgis'):
+        r = requests.get(url, params=params, timeout=60)
+        r.raise_for_status()
+        return r.json()
 
 def portal_item_to_layer_url():
     # Resolve the FeatureServer URL from the ArcGIS item
@@ -13,6 +13,8 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 # Import shared configuration loader
 from config.loader import load_script_config, setup_logging, validate_environment, get_api_key
+from shared.endpoints import resolve_url
+from shared.metrics import get_metrics
 
 def main():
     # Load configuration using centralized system
@@ -47,9 +49,12 @@ def main():
     
     print(f"Testing geocoding API with: {test_address}")
     try:
-        response = requests.get(geocoding_endpoint, params=params, timeout=timeout)
-        response.raise_for_status()
-        data = response.json()
+        # Deliberately bypasses the shared cache/limiter so the key itself is exercised
+        with get_metrics().track('geocode') as call:
+            response = requests.get(resolve_url(geocoding_endpoint), params=params, timeout=timeout)
+            response.raise_for_status()
+            data = response.json()
+            call.status = data.get('status')
         
         print(f"Status: {data['status']}")
         if data['status'] == 'OK':
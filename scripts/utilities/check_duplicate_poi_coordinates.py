@@ -10,13 +10,19 @@ Usage:
 """
 
 import json
+import sys
 from pathlib import Path
 from collections import defaultdict
 
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from shared.datasets import DATA_DIR
+from shared.geodesy import pairs_within
+
 def check_duplicate_coordinates():
     """Check for POIs with duplicate or very close coordinates"""
-    data_dir = Path(__file__).parent.parent / "public" / "data"
-    poi_path = data_dir / "points_of_interest.json"
+    poi_path = DATA_DIR / "points_of_interest.json"
     
     print("Checking for POIs with duplicate or close coordinates")
     print("=" * 60)
@@ -65,32 +71,15 @@ def check_duplicate_coordinates():
     print("Checking for POIs within ~100 meters of each other...")
     print("-" * 60)
     
-    close_pairs = []
-    poi_list = list(pois)
-    
-    for i, poi1 in enumerate(poi_list):
-        for j, poi2 in enumerate(poi_list[i+1:], i+1):
-            lat1, lng1 = poi1.get('lat'), poi1.get('lng')
-            lat2, lng2 = poi2.get('lat'), poi2.get('lng')
-            
-            if all(x is not None for x in [lat1, lng1, lat2, lng2]):
-                # Calculate approximate distance in meters
-                # Using simple approximation: 1 degree ≈ 111,000 meters
-                lat_diff = abs(lat1 - lat2) * 111000
-                lng_diff = abs(lng1 - lng2) * 111000 * 0.7  # Adjust for longitude
-                distance = (lat_diff**2 + lng_diff**2)**0.5
-                
-                if distance < 100:  # Within 100 meters
-                    close_pairs.append({
-                        'distance': distance,
-                        'poi1': poi1,
-                        'poi2': poi2
-                    })
+    located = [poi for poi in pois if poi.get('lat') is not None and poi.get('lng') is not None]
+    # Great-circle distances for every nearby pair at once (within 100 meters)
+    close_pairs = [
+        {'distance': distance, 'poi1': located[i], 'poi2': located[j]}
+        for i, j, distance in pairs_within([poi['lat'] for poi in located], [poi['lng'] for poi in located], 100)
+    ]
     
     if close_pairs:
-        # Sort by distance
-        close_pairs.sort(key=lambda x: x['distance'])
-        
+        # Already sorted by distance
         for pair in close_pairs:
             distance = pair['distance']
             poi1 = pair['poi1']
@@ -9,7 +9,6 @@ Enrich brewery data with Google Maps Place IDs
 import json
 import os
 import sys
-import time
 import requests
 from typing import List, Dict, Any, Optional
 from pathlib import Path
@@ -19,6 +18,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 # Import shared configuration loader
 from config.loader import load_script_config, setup_logging, validate_environment, get_api_key
+from shared.google_api import get_json
 
 def load_json_file(filepath) -> List[Dict[str, Any]]:
     """Load JSON data from file"""
@@ -52,9 +52,7 @@ def get_google_place_id(query: str, api_key: str, config: Dict) -> Optional[Dict
             'type': 'establishment'
         }
         
-        response = requests.get(url, params=params, timeout=timeout)
-        response.raise_for_status()
-        data = response.json()
+        data = get_json(url, params, timeout=timeout)
         
         if data['status'] == 'OK' and data['results']:
             result = data['results'][0]  # Take first result
@@ -119,9 +117,6 @@ def enrich_brewery_place_ids(breweries: List[Dict[str, Any]], api_key: str, conf
         else:
             error_count += 1
             print(f"[FAILED] {name}")
-        
-        # Rate limiting - be nice to Google's API
-        time.sleep(0.1)  # 100ms delay between requests
     
     print(f"\n[ENRICHMENT SUMMARY]")
     print(f"Total breweries: {len(breweries)}")
@@ -4,12 +4,16 @@ Enrich peach farms with Google Place IDs
 """
 
 import json
-import requests
-import time
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 import os
 
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from shared.google_api import get_json
+
 # Load environment variables
 load_dotenv(Path(__file__).parent.parent.parent / '.env')
 
@@ -24,8 +28,7 @@ def get_place_id(query, api_key):
             'key': api_key
         }
         
-        response = requests.get(url, params=params)
-        data = response.json()
+        data = get_json(url, params)
         
         if data['status'] == 'OK' and data['candidates']:
             candidate = data['candidates'][0]
@@ -85,9 +88,6 @@ def main():
             updated_count += 1
         else:
             print(f"  ❌ No place ID found")
-        
-        # Rate limiting
-        time.sleep(0.1)
     
     # Save updated data
     with open(peaches_file, 'w', encoding='utf-8') as f:
@@ -5,12 +5,16 @@ This script will update place_id, google_maps_url, and place_query fields.
 """
 
 import json
-import time
-import requests
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 import os
 
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from shared.google_api import get_json
+
 def load_env_file():
     """Load environment variables from .env file."""
     project_root = Path(__file__).parent.parent.parent
@@ -64,9 +68,7 @@ def search_place_by_name_and_location(api_key, name, address, lat, lng):
     }
     
     try:
-        response = requests.get(base_url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = get_json(base_url, params, timeout=10)
         
         if data.get('status') == 'OK' and data.get('candidates'):
             candidate = data['candidates'][0]
@@ -121,9 +123,6 @@ def enrich_strawberry_farms(api_key, farms_data):
         else:
             print(f"  [FAILED] Could not find place for {name}")
             skipped_count += 1
-        
-        # Rate limiting - be nice to the API
-        time.sleep(0.1)
     
     print(f"\n=== Enrichment Summary ===")
     print(f"Total farms: {len(farms_data)}")
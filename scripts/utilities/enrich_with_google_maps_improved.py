@@ -9,54 +9,67 @@ This script addresses the issues with the previous enrichment:
 
 Usage:
     python enrich_with_google_maps_improved.py
+    python enrich_with_google_maps_improved.py --plan    # projected calls, cost and time only
+    python enrich_with_google_maps_improved.py --resolution details    # always confirm matches with Place Details
 
 Requirements:
-    pip install requests python-dotenv
+    pip install requests python-dotenv numpy
 """
 
+import argparse
 import json
 import os
+import sys
 import requests
-import time
-import math
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.adaptive import format_rates
+from shared.call_planner import CallPlan
+from shared.candidate_scorer import get_candidate_scorer
+from shared.coalescer import get_coalescer
+from shared.datasets import DATA_DIR
+from shared.geodesy import haversine_m
+from shared.google_api import PLACES_BASE_URL, get_json
+from shared.place_resolution import RESOLUTION_MODES, PlaceResolver
+from shared.places_cache import cache_settings, get_places_cache
+from shared.rate_limiter import QuotaExceededError
+from shared.review_queue import get_review_queue, review_key_for
+
 # Load environment variables from .env file
 load_dotenv()
 
 class ImprovedGoogleMapsEnricher:
-    def __init__(self):
+    def __init__(self, resolution_mode='single_call'):
         self.api_key = os.getenv('GOOGLE_MAPS_API_KEY')
         if not self.api_key:
             raise ValueError("GOOGLE_MAPS_API_KEY environment variable not set")
         
-        self.base_url = "https://maps.googleapis.com/maps/api/place"
-        self.rate_limit_delay = 0.1  # 100ms between requests
+        self.base_url = PLACES_BASE_URL
         self.used_place_ids = set()  # Track used place IDs to prevent duplicates
-        # Cache/verification policy
-        self.cache_path = Path(__file__).parent / ".places_cache.json"
-        self.cache_ttl_days = 30
-        self.verify_ttl_days = 180
+        # Cache/verification policy (common.json api.google_maps.response_cache)
+        settings = cache_settings()
+        self.cache = get_places_cache()
+        self.cache_ttl_days = settings.get('ttl_days', {}).get('details', settings.get('cache_ttl_days', 30))
+        self.verify_ttl_days = settings.get('verify_ttl_days', 180)
         self.distance_threshold_meters = 30
-        self.cache = self._load_cache()
-
-    def _load_cache(self):
-        try:
-            if self.cache_path.exists():
-                with open(self.cache_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception:
-            pass
-        return {}
+        self.resolver = PlaceResolver(resolution_mode)
+        self._migrate_legacy_cache(Path(__file__).parent / ".places_cache.json")
 
-    def _save_cache(self):
+    def _migrate_legacy_cache(self, legacy_path):
+        """One-time import of the old per-script JSON cache into the shared SQLite cache"""
+        if not legacy_path.exists():
+            return
         try:
-            with open(self.cache_path, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, indent=2, ensure_ascii=False)
+            imported = self.cache.import_legacy_json(legacy_path)
+            legacy_path.rename(legacy_path.with_name(legacy_path.name + '.migrated'))
+            print(f"Imported {imported} entries from {legacy_path.name} into {self.cache.db_path.name}")
         except Exception as e:
-            print(f"    [WARN] Failed to save cache: {e}")
+            print(f"    [WARN] Failed to migrate legacy cache: {e}")
 
     def _iso_now(self):
         return datetime.now(timezone.utc).isoformat()
@@ -67,56 +80,45 @@ class ImprovedGoogleMapsEnricher:
         except Exception:
             return None
         
+    def _verified_recently(self, item):
+        verified_at = item.get('google_verified_at')
+        if verified_at:
+            dt = self._parse_iso(verified_at)
+            if dt and datetime.now(timezone.utc) - dt < timedelta(days=self.verify_ttl_days):
+                return True
+        return False
+
+    def details_params(self, place_id):
+        return {
+            'place_id': place_id,
+            'fields': 'geometry,name,formatted_address',
+            'key': self.api_key
+        }
+        
     def get_place_details(self, place_id):
         """Get detailed information about a place using its place ID"""
         try:
-            # Cache check
-            cache_entry = self.cache.get(place_id)
-            if cache_entry:
-                fetched_at = self._parse_iso(cache_entry.get('fetched_at', ''))
-                if fetched_at and datetime.now(timezone.utc) - fetched_at < timedelta(days=self.cache_ttl_days):
-                    return {
-                        'lat': cache_entry['lat'],
-                        'lng': cache_entry['lng'],
-                        'name': cache_entry.get('name', ''),
-                        'address': cache_entry.get('formatted_address', '')
-                    }
-
             url = f"{self.base_url}/details/json"
-            params = {
-                'place_id': place_id,
-                'fields': 'geometry,name,formatted_address',
-                'key': self.api_key
-            }
-            
-            response = requests.get(url, params=params)
-            response.raise_for_status()
+            params = self.details_params(place_id)
             
-            data = response.json()
+            # Served from the shared cache when fetched within cache_ttl_days
+            data = get_json(url, params, cache_ttl_days=self.cache_ttl_days)
             
             if data['status'] == 'OK':
                 result = data['result']
                 location = result['geometry']['location']
-                details = {
+                return {
                     'lat': location['lat'],
                     'lng': location['lng'],
-                    'name': result['name'],
+                    'name': result.get('name', ''),
                     'address': result.get('formatted_address', '')
                 }
-                # Update cache
-                self.cache[place_id] = {
-                    'lat': details['lat'],
-                    'lng': details['lng'],
-                    'name': details['name'],
-                    'formatted_address': details['address'],
-                    'fetched_at': self._iso_now()
-                }
-                self._save_cache()
-                return details
             else:
                 print(f"    [ERROR] Place details failed: {data.get('status', 'Unknown error')}")
                 return None
                 
+        except QuotaExceededError:
+            raise
         except requests.exceptions.RequestException as e:
             print(f"    [ERROR] API error getting place details: {e}")
             return None
@@ -124,80 +126,68 @@ class ImprovedGoogleMapsEnricher:
             print(f"    [ERROR] Unexpected error getting place details: {e}")
             return None
     
-    def calculate_distance(self, lat1, lng1, lat2, lng2):
-        """Calculate distance between two coordinates in meters"""
-        R = 6371000  # Earth's radius in meters
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        delta_lat = math.radians(lat2 - lat1)
-        delta_lng = math.radians(lng2 - lng1)
-        
-        a = (math.sin(delta_lat/2) * math.sin(delta_lat/2) + 
-             math.cos(lat1_rad) * math.cos(lat2_rad) * 
-             math.sin(delta_lng/2) * math.sin(delta_lng/2))
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        
-        return R * c
+    def text_search_params(self, name, lat, lng, location_context="", state="NY", country="USA",
+                           is_city=False, custom_query=None):
+        """Text Search parameters for a record (custom query, or a query built from name and context)"""
+        # Use custom query if provided, otherwise construct one
+        if custom_query:
+            query = custom_query
+        elif is_city:
+            # For cities, use "City Name, NY" format
+            query = f"{name}, {state}"
+        else:
+            # For other locations, include context
+            query = f"{name}"
+            if location_context:
+                query += f" {location_context}"
+            query += f", {state}, {country}"
+        return {
+            'query': query,
+            'location': f"{lat},{lng}",
+            'radius': 2000,  # 2km radius for better results
+            'key': self.api_key
+        }
+    
+    def best_match(self, results, lat, lng, is_city=False, name=None, location_context="", address=None):
+        """Results within the allowed distance scored on distance, name, types and address: (MatchDecision, max distance)"""
+        # For cities, be more lenient with distance (up to 10km)
+        # For other locations, be stricter (up to 3km)
+        max_distance = 10000 if is_city else 3000
+        decision = get_candidate_scorer().decide(
+            results, name=name, lat=lat, lng=lng, address=address, max_distance_m=max_distance,
+            record_type='city' if is_city else location_context,
+        )
+        return decision, max_distance
     
-    def find_place_id(self, name, lat, lng, location_context="", state="NY", country="USA", is_city=False, custom_query=None):
+    def find_place_id(self, name, lat, lng, location_context="", state="NY", country="USA", is_city=False, custom_query=None,
+                      address=None, review_key=None):
         """
-        Find Google Maps place ID with improved accuracy
+        Find Google Maps place ID with improved accuracy.
+        A match the scorer is unsure about goes to the review queue under ``review_key``.
         """
         try:
-            # Use custom query if provided, otherwise construct one
+            params = self.text_search_params(name, lat, lng, location_context, state, country,
+                                             is_city=is_city, custom_query=custom_query)
             if custom_query:
-                query = custom_query
-                print(f"    Using custom query: '{query}'")
+                print(f"    Using custom query: '{params['query']}'")
             else:
-                # Create more specific search query
-                if is_city:
-                    # For cities, use "City Name, NY" format
-                    query = f"{name}, {state}"
-                else:
-                    # For other locations, include context
-                    query = f"{name}"
-                    if location_context:
-                        query += f" {location_context}"
-                    query += f", {state}, {country}"
-                
-                print(f"    Searching: '{query}'")
+                print(f"    Searching: '{params['query']}'")
             
             # Use Places Text Search API
             url = f"{self.base_url}/textsearch/json"
-            params = {
-                'query': query,
-                'location': f"{lat},{lng}",
-                'radius': 2000,  # 2km radius for better results
-                'key': self.api_key
-            }
-            
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = get_json(url, params)
             
             if data['status'] == 'OK' and data['results']:
-                # Find the best match by validating coordinates
-                best_match = None
-                min_distance = float('inf')
+                # Rank the candidates; only a confident, clear winner is written
+                decision, max_distance = self.best_match(data['results'], lat, lng, is_city,
+                                                         name, location_context, address)
                 
-                for result in data['results']:
-                    result_lat = result['geometry']['location']['lat']
-                    result_lng = result['geometry']['location']['lng']
-                    
-                    # Calculate distance from our target coordinates
-                    distance = self.calculate_distance(lat, lng, result_lat, result_lng)
-                    
-                    # For cities, be more lenient with distance (up to 10km)
-                    # For other locations, be stricter (up to 3km)
-                    max_distance = 10000 if is_city else 3000
-                    
-                    if distance < max_distance and distance < min_distance:
-                        min_distance = distance
-                        best_match = result
-                
-                if best_match:
+                if decision.accepted:
+                    best_match = decision.best.result
                     place_id = best_match['place_id']
+                    min_distance = decision.best.distance_m
+                    if review_key:
+                        get_review_queue().discard(review_key)
                     
                     # Check for duplicates
                     if place_id in self.used_place_ids:
@@ -206,27 +196,21 @@ class ImprovedGoogleMapsEnricher:
                         return None
                     
                     self.used_place_ids.add(place_id)
-                    print(f"    [OK] Found place ID: {place_id} ({min_distance:.0f}m away)")
+                    print(f"    [OK] Found place ID: {place_id} ({min_distance:.0f}m away, {decision.reason})")
                     
-                    # Get authoritative coordinates from place details
-                    place_details = self.get_place_details(place_id)
-                    if place_details:
-                        print(f"    [UPDATE] Coordinates: {lat:.6f},{lng:.6f} -> {place_details['lat']:.6f},{place_details['lng']:.6f}")
-                        return {
-                            'place_id': place_id,
-                            'lat': place_details['lat'],
-                            'lng': place_details['lng'],
-                            'name': place_details['name'],
-                            'address': place_details['address']
-                        }
-                    else:
-                        return {
-                            'place_id': place_id,
-                            'lat': lat,  # Keep original if details fail
-                            'lng': lng,
-                            'name': name,
-                            'address': ''
-                        }
+                    # Authoritative fields from the search result, Details only where it is lacking
+                    # (original values are kept if Details fails)
+                    place, path = self.resolver.resolve(best_match, self.get_place_details,
+                                                        {'lat': lat, 'lng': lng, 'name': name, 'address': ''})
+                    if path != 'details_failed':
+                        print(f"    [UPDATE] Coordinates: {lat:.6f},{lng:.6f} -> {place['lat']:.6f},{place['lng']:.6f}")
+                    return {'place_id': place_id, **place}
+                elif decision.best:
+                    if review_key:
+                        get_review_queue().add(review_key, name, params['query'], decision)
+                    print(f"    [REVIEW] Unsure match ({decision.reason}), queued for review: "
+                          f"{decision.best.result.get('name')} ({decision.best.distance_m:.0f}m away)")
+                    return None
                 else:
                     print(f"    [ERROR] No suitable match found within {max_distance/1000:.1f}km")
                     return None
@@ -234,6 +218,8 @@ class ImprovedGoogleMapsEnricher:
                 print(f"    [ERROR] No place found: {data.get('status', 'Unknown error')}")
                 return None
                 
+        except QuotaExceededError:
+            raise
         except requests.exceptions.RequestException as e:
             print(f"    [ERROR] API error: {e}")
             return None
@@ -271,12 +257,7 @@ class ImprovedGoogleMapsEnricher:
             place_id = item.get('place_id')
             if place_id:
                 # TTL check for verification
-                verified_at = item.get('google_verified_at')
-                verified_recent = False
-                if verified_at:
-                    dt = self._parse_iso(verified_at)
-                    if dt and datetime.now(timezone.utc) - dt < timedelta(days=self.verify_ttl_days):
-                        verified_recent = True
+                verified_recent = self._verified_recently(item)
 
                 lat = item.get('lat')
                 lng = item.get('lng')
@@ -284,13 +265,17 @@ class ImprovedGoogleMapsEnricher:
                     print("    ✔ Verified recently, skipping")
                     skipped_count += 1
                 else:
-                    details = self.get_place_details(place_id)
+                    try:
+                        details = self.get_place_details(place_id)
+                    except QuotaExceededError as e:
+                        print(f"    [STOP] {e} - saving progress")
+                        break
                     if details:
                         do_update_coords = False
                         if lat is None or lng is None:
                             do_update_coords = True
                         else:
-                            drift = self.calculate_distance(lat, lng, details['lat'], details['lng'])
+                            drift = haversine_m(lat, lng, details['lat'], details['lng'])
                             if drift > self.distance_threshold_meters:
                                 do_update_coords = True
                                 print(f"    [DRIFT] {drift:.1f}m > {self.distance_threshold_meters}m -> updating coords")
@@ -309,7 +294,6 @@ class ImprovedGoogleMapsEnricher:
                     else:
                         print("    [WARN] Failed to fetch details for existing place_id")
                         skipped_count += 1
-                time.sleep(self.rate_limit_delay)
                 continue
 
             # No place_id -> attempt to find one (existing behavior)
@@ -320,15 +304,21 @@ class ImprovedGoogleMapsEnricher:
                 skipped_count += 1
                 continue
             custom_query = item.get('place_query')
-            result = self.find_place_id(
-                name,
-                lat,
-                lng,
-                location_context,
-                state,
-                is_city=is_city,
-                custom_query=custom_query
-            )
+            try:
+                result = self.find_place_id(
+                    name,
+                    lat,
+                    lng,
+                    location_context,
+                    state,
+                    is_city=is_city,
+                    custom_query=custom_query,
+                    address=item.get('address') or item.get('location'),
+                    review_key=review_key_for(file_path, item)
+                )
+            except QuotaExceededError as e:
+                print(f"    [STOP] {e} - saving progress")
+                break
             if result:
                 item['place_id'] = result['place_id']
                 item['google_maps_url'] = self.create_google_maps_url(result['place_id'])
@@ -345,9 +335,6 @@ class ImprovedGoogleMapsEnricher:
             else:
                 print(f"    [ERROR] No place ID found")
                 skipped_count += 1
-            
-            # Rate limiting
-            time.sleep(self.rate_limit_delay)
         
         # Save enriched data
         with open(file_path, 'w', encoding='utf-8') as f:
@@ -398,15 +385,20 @@ class ImprovedGoogleMapsEnricher:
             custom_query = city.get('place_query')
             
             # Find place ID with city-specific search
-            result = self.find_place_id(
-                name, 
-                lat, 
-                lng, 
-                "",  # No additional context for cities
-                "NY",
-                is_city=True,  # Use city-specific search
-                custom_query=custom_query
-            )
+            try:
+                result = self.find_place_id(
+                    name, 
+                    lat, 
+                    lng, 
+                    "",  # No additional context for cities
+                    "NY",
+                    is_city=True,  # Use city-specific search
+                    custom_query=custom_query,
+                    review_key=review_key_for(file_path, city)
+                )
+            except QuotaExceededError as e:
+                print(f"    [STOP] {e} - saving progress")
+                break
             
             if result:
                 # Update with place ID and Google Maps URL
@@ -423,9 +415,6 @@ class ImprovedGoogleMapsEnricher:
             else:
                 print(f"    [ERROR] No place ID found")
                 skipped_count += 1
-            
-            # Rate limiting
-            time.sleep(self.rate_limit_delay)
         
         # Save enriched data
         with open(file_path, 'w', encoding='utf-8') as f:
@@ -435,6 +424,93 @@ class ImprovedGoogleMapsEnricher:
         print(f"  [UPDATE] Updated coordinates for {updated_coords_count} cities")
         print(f"  [WARN] Skipped {skipped_count} cities")
     
+    def targets(self):
+        """(file path, search context, is_city) for each list dataset this script enriches"""
+        datasets = [
+            ("waterfalls.json", "waterfall", False),
+            ("breweries.json", "brewery", False),
+            ("restaurants.json", "restaurant", False),
+            # Consolidated PYO farms dataset
+            ("pyo-fruit-farms.json", "farm", False),
+            # Enabled additional datasets
+            ("points_of_interest.json", "poi", False),
+            ("children.json", "children", False),
+            # Note: our-airbnbs.json intentionally excluded per request
+        ]
+        return [(DATA_DIR / filename, context, is_city) for filename, context, is_city in datasets]
+    
+    def plan_find_place(self, plan, name, lat, lng, location_context="", state="NY", is_city=False, custom_query=None,
+                        address=None):
+        """Plan the requests find_place_id would make for one record, without sending them"""
+        params = self.text_search_params(name, lat, lng, location_context, state,
+                                         is_city=is_city, custom_query=custom_query)
+        data = plan.lookup('textsearch', params)
+        if data is None:
+            # Whether Details follows depends on a Text Search answer we do not have yet;
+            # in single-call mode it only does when that answer lacks a field, which is rare
+            if self.resolver.mode == 'details':
+                plan.conditional('details')
+            return
+        if data.get('status') == 'OK' and data.get('results'):
+            decision, _ = self.best_match(data['results'], lat, lng, is_city, name, location_context, address)
+            best_match = decision.best.result if decision.accepted else None
+            if best_match and best_match['place_id'] not in self.used_place_ids:
+                self.used_place_ids.add(best_match['place_id'])
+                if self.resolver.needs_details(best_match):
+                    plan.lookup('details', self.details_params(best_match['place_id']), ttl_days=self.cache_ttl_days)
+    
+    def plan_dataset(self, plan, file_path, location_context="", state="NY", is_city=False):
+        """Mirror of enrich_dataset: re-verify stale place_ids, search for missing ones"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            return
+        plan.start_dataset(file_path.name)
+        for item in data:
+            lat, lng = item.get('lat'), item.get('lng')
+            place_id = item.get('place_id')
+            if place_id:
+                if self._verified_recently(item) and lat is not None and lng is not None:
+                    plan.record(False)
+                else:
+                    plan.record(True)
+                    plan.lookup('details', self.details_params(place_id), ttl_days=self.cache_ttl_days)
+                continue
+            if lat is None or lng is None:
+                plan.record(False)
+                continue
+            plan.record(True)
+            self.plan_find_place(plan, item.get('name', 'Unknown'), lat, lng, location_context, state,
+                                 is_city=is_city, custom_query=item.get('place_query'),
+                                 address=item.get('address') or item.get('location'))
+    
+    def plan_cities(self, plan, file_path):
+        """Mirror of enrich_cities_from_map_data"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            cities = json.load(f).get('cities', [])
+        plan.start_dataset(file_path.name)
+        for city in cities:
+            coords = city.get('coordinates')
+            already_enriched = city.get('place_id') is not None and 'google_maps_url' in city
+            if already_enriched or not coords or len(coords) != 2:
+                plan.record(False)
+                continue
+            plan.record(True)
+            self.plan_find_place(plan, city.get('name', 'Unknown'), coords[0], coords[1], "", "NY",
+                                 is_city=True, custom_query=city.get('place_query'))
+    
+    def plan_run(self):
+        """Work out the API calls, cost and time a full run would take, without calling the API"""
+        plan = CallPlan(cache=self.cache)
+        for file_path, context, is_city in self.targets():
+            if file_path.exists():
+                self.plan_dataset(plan, file_path, context, is_city=is_city)
+        map_data_path = DATA_DIR / "map-data.json"
+        if map_data_path.exists():
+            self.plan_cities(plan, map_data_path)
+        plan.report()
+        return plan
+    
     def run(self):
         """
         Run the improved enrichment process for all datasets
@@ -449,33 +525,15 @@ class ImprovedGoogleMapsEnricher:
         print("- More lenient distance matching for cities")
         print("=" * 60)
         
-        # Define data directory (repo root -> public/data). This file lives in scripts/utilities/
-        # So repo root is parents[2]
-        data_dir = Path(__file__).resolve().parents[2] / "public" / "data"
-        
-        # List of datasets to enrich
-        datasets = [
-            ("waterfalls.json", "waterfall", False),
-            ("breweries.json", "brewery", False),
-            ("restaurants.json", "restaurant", False),
-            # Consolidated PYO farms dataset
-            ("pyo-fruit-farms.json", "farm", False),
-            # Enabled additional datasets
-            ("points_of_interest.json", "poi", False),
-            ("children.json", "children", False),
-            # Note: our-airbnbs.json intentionally excluded per request
-        ]
-        
         # Enrich individual datasets
-        for filename, context, is_city in datasets:
-            file_path = data_dir / filename
+        for file_path, context, is_city in self.targets():
             if file_path.exists():
                 self.enrich_dataset(file_path, context, is_city=is_city)
             else:
                 print(f"  File not found: {file_path}")
         
         # Enrich cities from map-data.json
-        map_data_path = data_dir / "map-data.json"
+        map_data_path = DATA_DIR / "map-data.json"
         if map_data_path.exists():
             self.enrich_cities_from_map_data(map_data_path)
         else:
@@ -483,15 +541,31 @@ class ImprovedGoogleMapsEnricher:
         
         print(f"\n[OK] Enrichment complete!")
         print(f"[INFO] Used {len(self.used_place_ids)} unique place IDs")
+        print(f"[INFO] Place resolution: {self.resolver.summary()}")
+        print(f"[INFO] Matches awaiting review: {len(get_review_queue().pending())} (python shared/review_queue.py)")
+        self.cache.flush()
+        print(f"[INFO] Places cache: {self.cache.stats['hits']} hits, {self.cache.stats['misses']} misses")
+        print(f"[INFO] Coalescing: {get_coalescer().summary()}")
+        print(f"[INFO] Adaptive request rate: {format_rates()}")
         print("\nNext steps:")
         print("1. Run the duplicate checker to verify no duplicates remain")
         print("2. Test the Google Maps links in the application")
         print("3. Verify coordinates are more accurate")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Improved Google Maps Place ID Enrichment')
+    parser.add_argument('--plan', action='store_true',
+                        help='Only estimate the API calls, cost and time of a run (sends no requests)')
+    parser.add_argument('--resolution', choices=RESOLUTION_MODES, default='single_call',
+                        help='single_call: take coordinates/name/address from Text Search, calling Details only '
+                             'for missing fields; details: always call Details')
+    args = parser.parse_args()
     try:
-        enricher = ImprovedGoogleMapsEnricher()
-        enricher.run()
+        enricher = ImprovedGoogleMapsEnricher(resolution_mode=args.resolution)
+        if args.plan:
+            enricher.plan_run()
+        else:
+            enricher.run()
     except ValueError as e:
         print(f"[ERROR] Error: {e}")
         print("\nPlease set your Google Maps API key:")
@@ -4,12 +4,19 @@ Geocode Airbnb addresses using Google Places API
 """
 
 import json
+import sys
 import os
-import time
-import requests
 from pathlib import Path
 from dotenv import load_dotenv
 
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from shared.geocoding import get_geocoding_service
+
+# Airbnbs keep a Google place_id, so Nominatim is not part of this chain
+GOOGLE_CHAIN = ("gazetteer", "google")
+
 def load_airbnbs():
     """Load the airbnbs data from JSON file"""
     data_file = Path(__file__).parent.parent.parent / 'public' / 'data' / 'our-airbnbs.json'
@@ -23,44 +30,24 @@ def save_airbnbs(airbnbs):
         json.dump(airbnbs, f, indent=2, ensure_ascii=False)
 
 def geocode_address(api_key, name, address):
-    """Geocode a single address using Google Geocoding API"""
-    try:
-        # Combine name and address for better geocoding
-        full_address = f"{name}, {address}"
-        print(f"Geocoding: {full_address}")
-        
-        # Use Google Geocoding API
-        url = "https://maps.googleapis.com/maps/api/geocode/json"
-        params = {
-            'address': full_address,
-            'key': api_key
-        }
-        
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        
-        if data['status'] == 'OK' and data['results']:
-            result = data['results'][0]
-            location = result['geometry']['location']
-            place_id = result.get('place_id')
-            
-            print(f"  Found: {location['lat']}, {location['lng']}")
-            print(f"  Place ID: {place_id}")
-            
-            return {
-                'lat': location['lat'],
-                'lng': location['lng'],
-                'place_id': place_id,
-                'geocoded_address': result['formatted_address']
-            }
-        else:
-            print(f"  No results found for: {full_address} (Status: {data['status']})")
-            return None
-            
-    except Exception as e:
-        print(f"  Error geocoding {full_address}: {e}")
+    """Geocode a single address through the shared geocoding service (our gazetteer, then Google)"""
+    # Combine name and address for better geocoding
+    full_address = f"{name}, {address}"
+    print(f"Geocoding: {full_address}")
+    
+    result = get_geocoding_service(GOOGLE_CHAIN, api_key=api_key).geocode(full_address, venue=name)
+    if result is None:
+        print(f"  No results found for: {full_address}")
         return None
+    
+    print(f"  Found: {result.lat}, {result.lng} (via {result.backend})")
+    print(f"  Place ID: {result.place_id}")
+    return {
+        'lat': result.lat,
+        'lng': result.lng,
+        'place_id': result.place_id,
+        'geocoded_address': result.formatted_address
+    }
 
 def main():
     # Load environment variables
@@ -109,9 +96,6 @@ def main():
             print(f"  Updated successfully")
         else:
             print(f"  Failed to geocode")
-        
-        # Rate limiting - Google Geocoding API has limits
-        time.sleep(0.1)  # 100ms delay between requests
     
     # Save updated data
     save_airbnbs(airbnbs)
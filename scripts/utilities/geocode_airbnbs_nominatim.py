@@ -4,10 +4,17 @@ Geocode Airbnb addresses using Nominatim (OpenStreetMap) - free service
 """
 
 import json
-import time
-import requests
+import sys
 from pathlib import Path
 
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from shared.geocoding import get_geocoding_service
+
+# Our own verified places first, so a known venue never reaches Nominatim
+NOMINATIM_CHAIN = ("gazetteer", "nominatim")
+
 def load_airbnbs():
     """Load the airbnbs data from JSON file"""
     data_file = Path(__file__).parent.parent.parent / 'public' / 'data' / 'our-airbnbs.json'
@@ -21,51 +28,24 @@ def save_airbnbs(airbnbs):
         json.dump(airbnbs, f, indent=2, ensure_ascii=False)
 
 def geocode_with_nominatim(name, address):
-    """Geocode using Nominatim (OpenStreetMap)"""
-    try:
-        # Combine name and address for better geocoding
-        full_address = f"{name}, {address}, New York, USA"
-        print(f"Geocoding: {full_address}")
-        
-        # Use Nominatim API
-        url = "https://nominatim.openstreetmap.org/search"
-        params = {
-            'q': full_address,
-            'format': 'json',
-            'limit': 1,
-            'countrycodes': 'us',
-            'state': 'NY'
-        }
-        
-        headers = {
-            'User-Agent': 'ScenicNYMap/1.0 (contact@example.com)'  # Required by Nominatim
-        }
-        
-        response = requests.get(url, params=params, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        
-        if data and len(data) > 0:
-            result = data[0]
-            lat = float(result['lat'])
-            lng = float(result['lon'])
-            
-            print(f"  Found: {lat}, {lng}")
-            print(f"  Display name: {result.get('display_name', 'N/A')}")
-            
-            return {
-                'lat': lat,
-                'lng': lng,
-                'place_id': result.get('place_id'),
-                'geocoded_address': result.get('display_name', full_address)
-            }
-        else:
-            print(f"  No results found for: {full_address}")
-            return None
-            
-    except Exception as e:
-        print(f"  Error geocoding {full_address}: {e}")
+    """Geocode using Nominatim (OpenStreetMap) through the shared geocoding service"""
+    # Combine name and address for better geocoding
+    full_address = f"{name}, {address}, New York, USA"
+    print(f"Geocoding: {full_address}")
+    
+    result = get_geocoding_service(NOMINATIM_CHAIN).geocode(full_address, venue=name)
+    if result is None:
+        print(f"  No results found for: {full_address}")
         return None
+    
+    print(f"  Found: {result.lat}, {result.lng}")
+    print(f"  Display name: {result.formatted_address or 'N/A'}")
+    return {
+        'lat': result.lat,
+        'lng': result.lng,
+        'place_id': result.place_id,
+        'geocoded_address': result.formatted_address or full_address
+    }
 
 def main():
     # Load airbnbs data
@@ -107,9 +87,6 @@ def main():
             print(f"  Updated successfully")
         else:
             print(f"  Failed to geocode")
-        
-        # Rate limiting - Nominatim requires 1 second between requests
-        time.sleep(1.1)
     
     # Save updated data
     save_airbnbs(airbnbs)
@@ -7,7 +7,6 @@ Adds lat/lng coordinates to each event for map display
 import json
 import os
 import sys
-import time
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
@@ -16,61 +15,33 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 # Import shared configuration loader
 from config.loader import load_script_config, setup_logging, validate_environment, get_api_key
+from shared.geocoding import get_geocoding_service
 
 # Configuration will be loaded in main()
 
-def geocode_address(address: str, api_key: str, config: Dict) -> Optional[Tuple[float, float]]:
+def geocode_address(address: str, api_key: str, config: Dict,
+                    venue: Optional[str] = None) -> Optional[Tuple[float, float]]:
     """
-    Geocode an address using Google Maps Geocoding API
+    Geocode an address through the shared geocoding service
+    (local gazetteer, then Google, then Nominatim; results cached across scripts)
     
     Args:
         address: The address to geocode
         api_key: Google Maps API key
-        config: Configuration dictionary
+        config: Configuration dictionary (unused; backends are configured in config/geocoding.json)
+        venue: Name of the event's venue, which the local gazetteer can match by name
         
     Returns:
         Tuple of (latitude, longitude) or None if geocoding failed
     """
-    import requests
-    
-    # Get configuration values
-    geocoding_config = config.get("geocoding", {})
-    timeout = geocoding_config.get("timeout", 20)
-    geocoding_endpoint = config.get("api", {}).get("google_maps", {}).get("geocoding_endpoint", 
-                                                                          "https://maps.googleapis.com/maps/api/geocode/json")
-    
-    params = {
-        'address': address,
-        'key': api_key,
-        'region': 'us'
-    }
-    
-    try:
-        print(f"Geocoding: {address}")
-        response = requests.get(geocoding_endpoint, params=params, timeout=timeout)
-        response.raise_for_status()
-        data = response.json()
-        
-        if data.get('status') == 'OK' and data.get('results'):
-            result = data['results'][0]
-            location = result['geometry']['location']
-            lat = float(location['lat'])
-            lng = float(location['lng'])
-            formatted_address = result.get('formatted_address', 'Unknown')
-            print(f"  → Found: {formatted_address}")
-            print(f"  → Coordinates: {lat}, {lng}")
-            return (lat, lng)
-        else:
-            print(f"  → Geocoding failed: {data.get('status', 'Unknown error')}")
-            if 'error_message' in data:
-                print(f"  → Error: {data['error_message']}")
-            return None
-    except requests.exceptions.RequestException as e:
-        print(f"  → Request error: {e}")
-        return None
-    except Exception as e:
-        print(f"  → Unexpected error: {e}")
+    print(f"Geocoding: {address}")
+    result = get_geocoding_service(api_key=api_key).geocode(address, venue=venue)
+    if result is None:
+        print(f"  → Geocoding failed: no backend found {address!r}")
         return None
+    print(f"  → Found: {result.formatted_address or 'Unknown'} (via {result.backend})")
+    print(f"  → Coordinates: {result.lat}, {result.lng}")
+    return (result.lat, result.lng)
 
 def geocode_events(events_data: Dict, api_key: str, config: Dict) -> Dict:
     """
@@ -87,11 +58,7 @@ def geocode_events(events_data: Dict, api_key: str, config: Dict) -> Dict:
     updated_events = events_data.copy()
     updated_events['events'] = []
     
-    # Get rate limiting configuration
-    geocoding_config = config.get("geocoding", {})
-    base_delay = geocoding_config.get("rate_limit_delay", 0.15)
-    progressive_delays = geocoding_config.get("progressive_delays", {})
-    
+    # Repeat addresses are answered by the geocoding service's cache; pacing by the shared rate limiter
     for i, event in enumerate(events_data['events']):
         print(f"\nProcessing event {i+1}/{len(events_data['events'])}: {event['name']}")
         
@@ -99,7 +66,7 @@ def geocode_events(events_data: Dict, api_key: str, config: Dict) -> Dict:
         updated_event = event.copy()
         
         # Geocode the address
-        coords = geocode_address(event['address'], api_key, config)
+        coords = geocode_address(event['address'], api_key, config, venue=event.get('location_name'))
         
         if coords:
             updated_event['lat'] = coords[0]
@@ -111,15 +78,6 @@ def geocode_events(events_data: Dict, api_key: str, config: Dict) -> Dict:
             print(f"  ❌ Failed to geocode")
         
         updated_events['events'].append(updated_event)
-        
-        # Progressive rate limiting based on configuration
-        delay = base_delay
-        if i >= 10 and "after_10" in progressive_delays:
-            delay = progressive_delays["after_10"]
-        elif i >= 5 and "after_5" in progressive_delays:
-            delay = progressive_delays["after_5"]
-        
-        time.sleep(delay)
     
     return updated_events
 
@@ -179,6 +137,7 @@ def main():
     print(f"\n📊 Geocoding Results:")
     print(f"  ✅ Successful: {successful}/{total}")
     print(f"  ❌ Failed: {total - successful}/{total}")
+    print(f"  🗺️  Answered by: {get_geocoding_service().summary()}")
     
     # Save updated events
     try:
@@ -1,45 +1,32 @@
 #!/usr/bin/env python3
 import json
-import time
 import sys
-from urllib.parse import urlencode
-from urllib.request import Request, urlopen
+from pathlib import Path
 
-USER_AGENT = "scenic-ny-map/1.0 (+https://example.com)"
-BASE_URL = "https://nominatim.openstreetmap.org/search?"
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from shared.geocoding import get_geocoding_service
 
 INPUT_FILE = "scripts/orchards.json"
 OUTPUT_FILE = "public/data/orchards_geocoded.json"
 
 
 def geocode(query: str):
-    params = {
-        "q": query,
-        "format": "jsonv2",
-        "limit": 1,
-        "addressdetails": 1
-        # Optionally: 'countrycodes': 'us'
-    }
-    url = BASE_URL + urlencode(params)
-    req = Request(url, headers={"User-Agent": USER_AGENT})
-    with urlopen(req) as resp:
-        data = resp.read()
-    try:
-        results = json.loads(data)
-        if results:
-            best = results[0]
-            return {
-                "lat": float(best.get("lat")),
-                "lon": float(best.get("lon")),
-                "display_name": best.get("display_name"),
-                "class": best.get("class"),
-                "type": best.get("type"),
-                "importance": best.get("importance")
-            }
-        return None
-    except Exception as e:
-        print(f"Error parsing response for {query}: {e}", file=sys.stderr)
+    # Our gazetteer, then Nominatim through the shared geocoding service: paced by the limiter's
+    # nominatim bucket (usage policy: <= 1 req/s) and cached with every other script's geocodes
+    result = get_geocoding_service(("gazetteer", "nominatim")).geocode(query)
+    if result is None:
         return None
+    osm_class, osm_type = (result.types + [None, None])[:2]
+    return {
+        "lat": result.lat,
+        "lon": result.lng,
+        "display_name": result.formatted_address,
+        "class": osm_class,
+        "type": osm_type,
+        "importance": result.importance
+    }
 
 
 def main():
@@ -53,7 +40,6 @@ def main():
         query = f"{o['name']}, {o['town']}, {o['state']}"
         print(f"[{idx}/{len(orchards)}] Geocoding: {query}")
         info = geocode(query)
-        time.sleep(1.2)  # politeness per Nominatim usage policy
         out = {
             **o,
             "geocoded": info
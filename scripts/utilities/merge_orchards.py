@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
 import json
-import os
+import sys
 from pathlib import Path
 
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from shared.address_normalizer import normalize_address
+
 ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = ROOT / "public" / "data"
 PRIMARY = DATA_DIR / "orchards_points.json"
@@ -27,7 +32,8 @@ def load_array(path: Path):
 
 
 def key_for(item: dict) -> tuple:
-    name = (item.get("name") or "").strip().lower()
+    # "Smith's Four Corners Orchard" and "Smiths 4 Corners Orchard" are one farm
+    name = normalize_address(item.get("name"))
     lat = item.get("lat") or item.get("latitude") or item.get("coords", [None, None])[0]
     lng = item.get("lng") or item.get("longitude") or item.get("coords", [None, None])[1]
     return (name, round(float(lat), 6) if lat is not None else None, round(float(lng), 6) if lng is not None else None)
@@ -10,12 +10,16 @@ Usage:
 """
 
 import json
+import sys
 import os
-import requests
-import time
 from pathlib import Path
 from dotenv import load_dotenv
 
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from shared.google_api import get_json
+
 # Load environment variables
 load_dotenv()
 
@@ -29,9 +33,7 @@ def get_place_details(place_id, api_key):
     }
     
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = get_json(url, params)
         
         if data['status'] == 'OK':
             return data['result']
@@ -53,9 +55,7 @@ def find_place_id(query, api_key):
     }
     
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = get_json(url, params)
         
         if data['status'] == 'OK' and data['candidates']:
             return data['candidates'][0]['place_id']
@@ -155,9 +155,6 @@ def re_enrich_cities():
             print(f"  [ERROR] Could not find place ID for {name}")
         
         print()
-        
-        # Rate limiting
-        time.sleep(0.1)
     
     if updated_count > 0:
         # Save the updated data
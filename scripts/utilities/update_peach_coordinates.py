@@ -4,8 +4,6 @@ Update peach farm GPS coordinates using Google Place IDs
 """
 
 import json
-import requests
-import time
 import sys
 from pathlib import Path
 
@@ -14,6 +12,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 # Import shared configuration loader
 from config.loader import load_script_config, setup_logging, validate_environment, get_api_key
+from shared.google_api import get_json
 
 def get_place_details(place_id, api_key, config):
     """Get detailed place information including coordinates"""
@@ -28,8 +27,7 @@ def get_place_details(place_id, api_key, config):
             'key': api_key
         }
         
-        response = requests.get(url, params=params, timeout=timeout)
-        data = response.json()
+        data = get_json(url, params, timeout=timeout)
         
         if data['status'] == 'OK' and 'result' in data:
             result = data['result']
@@ -108,9 +106,6 @@ def main():
             updated_count += 1
         else:
             print(f"  ❌ Could not get coordinates")
-        
-        # Rate limiting
-        time.sleep(0.1)
     
     # Save updated data
     with open(peaches_file, 'w', encoding='utf-8') as f:
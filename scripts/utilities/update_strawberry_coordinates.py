@@ -5,12 +5,16 @@ This script will update lat/lng coordinates using the place_id from Google Place
 """
 
 import json
-import time
-import requests
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 import os
 
+# Add the scripts directory to the path so we can import shared modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from shared.google_api import get_json
+
 def load_env_file():
     """Load environment variables from .env file."""
     project_root = Path(__file__).parent.parent.parent
@@ -59,9 +63,7 @@ def get_place_details(api_key, place_id):
     }
     
     try:
-        response = requests.get(base_url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = get_json(base_url, params, timeout=10)
         
         if data.get('status') == 'OK' and data.get('result'):
             result = data['result']
@@ -134,9 +136,6 @@ def update_strawberry_coordinates(api_key, farms_data):
         else:
             print(f"  [FAILED] Could not get coordinates for {name}")
             skipped_count += 1
-        
-        # Rate limiting - be nice to the API
-        time.sleep(0.1)
     
     print(f"\n=== Coordinate Update Summary ===")
     print(f"Total farms: {len(farms_data)}")